@@ -1,5 +1,5 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -21,6 +21,7 @@ from authlib.integrations.starlette_client import OAuth, OAuthError
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request as GoogleRequest
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 import json
 import base64
@@ -30,22 +31,29 @@ import requests
 import re
 import subprocess
 import threading
-from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable
 import html
 import hashlib
 import time
+import math
 from urllib.parse import urlencode, urlparse, urljoin
 from itsdangerous import URLSafeSerializer, BadSignature
 import socket
 import ipaddress
 from cryptography.fernet import Fernet, InvalidToken as FernetInvalidToken
 from io import BytesIO
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont, ImageOps
 from zoneinfo import ZoneInfo
 try:
     from backend.storage import media_storage
-    from backend.services.background_jobs import BackgroundJobService
+    from backend.services.background_jobs import ACTIVE_JOB_STATUSES, TERMINAL_JOB_STATUSES, BackgroundJobService
+    from backend.services.job_durations import JobDurationStats, audio_duration_bucket
+    from backend.services.job_events import JobEventHub
+    from backend.services.render_cache import RenderOutputCache
+    from backend.services.singleflight import SingleFlight
     from backend.services.spotlight_service import SpotlightService
+    from backend.services.visualizer import VisualizerFrameRenderer, decode_audio_samples
     from backend.services import tag_metrics as tag_metrics_service  # noqa: F401
     from backend.models_spotlight import (
         ProducerProfile,
@@ -56,8 +64,13 @@ try:
     )
 except ImportError:
     from storage import media_storage
-    from services.background_jobs import BackgroundJobService
+    from services.background_jobs import ACTIVE_JOB_STATUSES, TERMINAL_JOB_STATUSES, BackgroundJobService
+    from services.job_durations import JobDurationStats, audio_duration_bucket
+    from services.job_events import JobEventHub
+    from services.render_cache import RenderOutputCache
+    from services.singleflight import SingleFlight
     from services.spotlight_service import SpotlightService
+    from services.visualizer import VisualizerFrameRenderer, decode_audio_samples
     from services import tag_metrics as tag_metrics_service
     from models_spotlight import (
         ProducerProfile,
@@ -115,9 +128,11 @@ TEXTBELT_API_KEY = os.environ.get('TEXTBELT_API_KEY')
 REMINDER_SERIALIZER = URLSafeSerializer(REMINDER_SECRET)
 MAX_AUDIO_UPLOAD_BYTES = 200 * 1024 * 1024
 MAX_IMAGE_UPLOAD_BYTES = 12 * 1024 * 1024
+THUMBNAIL_CHECK_IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
 AUTH_RATE_LIMIT_WINDOW_SECONDS = 300
 AUTH_RATE_LIMIT_ATTEMPTS = 10
 HEARTBEAT_INTERVAL_SECONDS = int(os.environ.get("JOB_HEARTBEAT_INTERVAL_SECONDS", "15"))
+FFMPEG_CANCEL_CHECK_SECONDS = 0.2
 JOB_WORKER_HEARTBEAT_DEAD_SECONDS = int(
     os.environ.get(
         "JOB_WORKER_HEARTBEAT_DEAD_SECONDS",
@@ -137,8 +152,12 @@ GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET', 'your_google_clien
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 _rate_limit_buckets: dict[str, list[float]] = {}
 _action_rate_limit_buckets: dict[str, list[float]] = {}
+_ops_snapshot: dict[str, Any] = {"controls": None, "jobs": None, "expires_at": 0.0}
+_ops_snapshot_lock = asyncio.Lock()
+_enrichment_flights = SingleFlight()
 
 
 def build_cors_origins() -> list[str]:
@@ -398,19 +417,78 @@ _llm_client = None
 _llm_config = None
 _upload_job_worker_task: asyncio.Task | None = None
 _job_watchdog_task: asyncio.Task | None = None
+_job_queue_watch_task: asyncio.Task | None = None
 _spotlight_refresh_task: asyncio.Task | None = None
-UPLOAD_JOB_POLL_INTERVAL_SECONDS = int(os.environ.get("UPLOAD_JOB_POLL_INTERVAL_SECONDS", "2"))
+_job_event_tasks: list[asyncio.Task] = []
+UPLOAD_JOB_POLL_INTERVAL_SECONDS = int(os.environ.get("UPLOAD_JOB_POLL_INTERVAL_SECONDS", "15"))
+# Grace period for in-flight jobs on shutdown; longer encodes are requeued at once.
+JOB_DRAIN_GRACE_SECONDS = float(os.environ.get("JOB_DRAIN_GRACE_SECONDS", "20"))
+# Set to false when jobs are consumed by `python -m backend.worker`.
+API_RUN_BACKGROUND_LOOPS = str(os.environ.get("API_RUN_BACKGROUND_LOOPS", "true")).strip().lower() not in {"0", "false", "no"}
+JOB_QUEUE_CHANGE_STREAM_ENABLED = str(os.environ.get("JOB_QUEUE_CHANGE_STREAM_ENABLED", "true")).strip().lower() not in {"0", "false", "no"}
 UPLOAD_JOB_STALE_AFTER_SECONDS = int(os.environ.get("UPLOAD_JOB_STALE_AFTER_SECONDS", "1800"))
 JOB_WATCHDOG_INTERVAL_SECONDS = int(os.environ.get("JOB_WATCHDOG_INTERVAL_SECONDS", "60"))
+# Finished jobs untouched this long move to upload_jobs_archive; 0 keeps them in place.
+JOB_ARCHIVE_AFTER_DAYS = float(os.environ.get("JOB_ARCHIVE_AFTER_DAYS", "14"))
+JOB_ARCHIVE_INTERVAL_SECONDS = int(os.environ.get("JOB_ARCHIVE_INTERVAL_SECONDS", "3600"))
+JOB_ARCHIVE_BATCH_SIZE = int(os.environ.get("JOB_ARCHIVE_BATCH_SIZE", "500"))
 JOB_STAGE_TIMEOUT_SECONDS = int(os.environ.get("JOB_STAGE_TIMEOUT_SECONDS", "300"))
 JOB_FFMPEG_STAGE_TIMEOUT_SECONDS = int(os.environ.get("JOB_FFMPEG_STAGE_TIMEOUT_SECONDS", "720"))
 JOB_GIF_TRANSCODE_STAGE_TIMEOUT_SECONDS = int(os.environ.get("JOB_GIF_TRANSCODE_STAGE_TIMEOUT_SECONDS", "360"))
 JOB_YOUTUBE_STAGE_TIMEOUT_SECONDS = int(os.environ.get("JOB_YOUTUBE_STAGE_TIMEOUT_SECONDS", "900"))
+# With enough samples, the watchdog uses p99 x multiplier of learned stage durations as the timeout.
+JOB_DURATION_MIN_SAMPLES = int(os.environ.get("JOB_DURATION_MIN_SAMPLES", "20"))
+JOB_LEARNED_TIMEOUT_MULTIPLIER = float(os.environ.get("JOB_LEARNED_TIMEOUT_MULTIPLIER", "3"))
+JOB_LEARNED_TIMEOUT_MIN_SECONDS = int(os.environ.get("JOB_LEARNED_TIMEOUT_MIN_SECONDS", "120"))
+JOB_LEARNED_TIMEOUT_MAX_SECONDS = int(os.environ.get("JOB_LEARNED_TIMEOUT_MAX_SECONDS", "3600"))
 YOUTUBE_CHUNK_TIMEOUT_SECONDS = int(os.environ.get("YOUTUBE_CHUNK_TIMEOUT_SECONDS", "120"))
+# Resumable upload chunk size (rounded to 256 KiB); 0 sends the whole file in one request.
+YOUTUBE_UPLOAD_CHUNK_SIZE_BYTES = int(os.environ.get("YOUTUBE_UPLOAD_CHUNK_SIZE_BYTES", str(16 * 1024 * 1024)))
+# Upload session progress is checkpointed at most this often.
+YOUTUBE_UPLOAD_CHECKPOINT_INTERVAL_SECONDS = float(os.environ.get("YOUTUBE_UPLOAD_CHECKPOINT_INTERVAL_SECONDS", "30"))
 UPLOAD_JOB_WORKER_ID = f"upload-worker-{uuid.uuid4().hex[:10]}"
+JOB_RENDER_SLOTS = int(os.environ.get("JOB_RENDER_SLOTS", "2"))
+JOB_LLM_SLOTS = int(os.environ.get("JOB_LLM_SLOTS", "16"))
+JOB_PREP_SLOTS = int(os.environ.get("JOB_PREP_SLOTS", "1"))
+JOB_WORKER_CONCURRENCY = int(
+    os.environ.get("JOB_WORKER_CONCURRENCY", str(JOB_RENDER_SLOTS + JOB_LLM_SLOTS + JOB_PREP_SLOTS))
+)
+# FFmpeg renders use the "render" slots and upload-time media preparation the "prep" slots.
+JOB_SLOT_GROUPS: dict[str, str] = {
+    "youtube_upload": "render",
+    "channel_analytics": "llm",
+    "thumbnail_check": "llm",
+    "beat_analysis": "llm",
+    "beat_fix": "llm",
+    "tag_generation": "llm",
+    "tag_join": "llm",
+    "visual_normalize": "prep",
+    "audio_prepare": "prep",
+}
+# Queued by uploads: lowest priority, uncounted, and capped per user.
+UPLOAD_PREP_JOB_TYPES = frozenset({"visual_normalize", "audio_prepare"})
+UPLOAD_PREP_MAX_ACTIVE_PER_USER = int(os.environ.get("UPLOAD_PREP_MAX_ACTIVE_PER_USER", "4"))
+JOB_FAIR_SHARE_ENABLED = str(os.environ.get("JOB_FAIR_SHARE_ENABLED", "true")).strip().lower() not in {"0", "false", "no"}
+# Share of queue claims each plan receives while several users are backlogged (free:plus:max).
+JOB_FAIR_SHARE_WEIGHTS: dict[str, float] = {
+    "free": float(os.environ.get("JOB_FAIR_SHARE_WEIGHT_FREE", "1")),
+    "plus": float(os.environ.get("JOB_FAIR_SHARE_WEIGHT_PLUS", "2")),
+    "max": float(os.environ.get("JOB_FAIR_SHARE_WEIGHT_MAX", "4")),
+}
+# Scheduled uploads (run_at) may render this far ahead when render slots are idle; 0 renders at run_at.
+JOB_PRERENDER_AHEAD_SECONDS = int(os.environ.get("JOB_PRERENDER_AHEAD_SECONDS", "21600"))
+YOUTUBE_SCHEDULE_MAX_AHEAD_DAYS = int(os.environ.get("YOUTUBE_SCHEDULE_MAX_AHEAD_DAYS", "30"))
 YOUTUBE_RENDER_TIMEOUT_SECONDS = int(os.environ.get("YOUTUBE_RENDER_TIMEOUT_SECONDS", "600"))
 YOUTUBE_RENDER_TIMEOUT_MAX_SECONDS = int(os.environ.get("YOUTUBE_RENDER_TIMEOUT_MAX_SECONDS", "900"))
 STATIC_STILL_ENCODE_FPS = 2
+# Static covers encode this many seconds once and loop them by stream copy; 0 encodes every frame.
+YOUTUBE_STILL_LOOP_SEGMENT_SECONDS = int(os.environ.get("YOUTUBE_STILL_LOOP_SEGMENT_SECONDS", "10"))
+# Visualizer renders at 30/60 fps are split into this many parallel FFmpeg segments; 0 or 1 disables.
+YOUTUBE_PARALLEL_RENDER_SEGMENTS = int(os.environ.get("YOUTUBE_PARALLEL_RENDER_SEGMENTS", "0"))
+YOUTUBE_PARALLEL_RENDER_MIN_SECONDS = int(os.environ.get("YOUTUBE_PARALLEL_RENDER_MIN_SECONDS", "120"))
+# "numpy" pipes visualizer frames computed in Python to FFmpeg; "ffmpeg" uses the showwaves filter.
+YOUTUBE_VISUALIZER_ENGINE = str(os.environ.get("YOUTUBE_VISUALIZER_ENGINE", "numpy")).strip().lower() or "numpy"
+YOUTUBE_VISUALIZER_LAYER_SCALE = max(1, int(os.environ.get("YOUTUBE_VISUALIZER_LAYER_SCALE", "2")))
 YOUTUBE_RENDER_PRESET = str(os.environ.get("YOUTUBE_RENDER_PRESET", "veryfast")).strip() or "veryfast"
 YOUTUBE_RENDER_CRF = str(os.environ.get("YOUTUBE_RENDER_CRF", "26")).strip() or "26"
 YOUTUBE_RENDER_MAX_HEIGHT = int(os.environ.get("YOUTUBE_RENDER_MAX_HEIGHT", "1080") or "1080")
@@ -445,9 +523,48 @@ GIF_TRANSCODE_CRF = str(os.environ.get("GIF_TRANSCODE_CRF", "28")).strip() or "2
 GIF_TRANSCODE_HEAVY_FRAME_THRESHOLD = int(os.environ.get("GIF_TRANSCODE_HEAVY_FRAME_THRESHOLD", "450"))
 GIF_TRANSCODE_HEAVY_BYTES_THRESHOLD = int(os.environ.get("GIF_TRANSCODE_HEAVY_BYTES_THRESHOLD", str(8 * 1024 * 1024)))
 GIF_CACHE_VERSION = 2
+# Animated visuals are normalized once at upload into a loop-ready H.264 clip.
+VISUAL_NORMALIZE_ON_UPLOAD = str(os.environ.get("VISUAL_NORMALIZE_ON_UPLOAD", "true")).strip().lower() not in {"0", "false", "no"}
+VISUAL_NORMALIZE_MAX_FPS = int(os.environ.get("VISUAL_NORMALIZE_MAX_FPS", "30"))
+# Render fps the upload-time clip is prepared for; Upload Studio switches to 30 fps for animated visuals.
+VISUAL_NORMALIZE_RENDER_FPS = 30
+# Audio uploads get a render-ready AAC sidecar (or passthrough) so renders stream-copy the audio.
+AUDIO_PREPARE_ON_UPLOAD = str(os.environ.get("AUDIO_PREPARE_ON_UPLOAD", "true")).strip().lower() not in {"0", "false", "no"}
+AUDIO_PREPARE_TIMEOUT_SECONDS = int(os.environ.get("AUDIO_PREPARE_TIMEOUT_SECONDS", "300"))
+YOUTUBE_AUDIO_BITRATE = str(os.environ.get("YOUTUBE_AUDIO_BITRATE", "192k")).strip() or "192k"
+AUDIO_PASSTHROUGH_CODECS = {"aac"}
+AUDIO_SIDECAR_VERSION = 1
+# Renders are cached by a hash of their inputs and settings; 0 disables the cache.
+YOUTUBE_RENDER_CACHE_MAX_BYTES = int(os.environ.get("YOUTUBE_RENDER_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024)))
+RENDER_CACHE_VERSION = 3
+# Payload keys that change the rendered video (the rest are YouTube metadata).
+YOUTUBE_RENDER_PAYLOAD_KEYS = (
+    "aspect_ratio",
+    "target_w",
+    "target_h",
+    "image_scale",
+    "image_scale_x",
+    "image_scale_y",
+    "image_pos_x",
+    "image_pos_y",
+    "image_rotation",
+    "background_color",
+    "background_mode",
+    "render_fps",
+    "visualizer",
+    "remove_watermark",
+)
 YOUTUBE_ENCODE_PROGRESS_INTERVAL_SECONDS = float(
     os.environ.get("YOUTUBE_ENCODE_PROGRESS_INTERVAL_SECONDS", "2")
 )
+# Progress-only job writes (encode ticks, upload chunks) are coalesced to at most one per interval.
+JOB_PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.environ.get("JOB_PROGRESS_FLUSH_INTERVAL_SECONDS", "3"))
+# SSE job streams share one in-process hub per process.
+JOB_EVENTS_RESYNC_INTERVAL_SECONDS = float(os.environ.get("JOB_EVENTS_RESYNC_INTERVAL_SECONDS", "10"))
+JOB_EVENTS_KEEPALIVE_SECONDS = float(os.environ.get("JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
+# EventSource cannot send headers, so job streams use a short-lived job-scoped token.
+JOB_EVENTS_TOKEN_TTL_SECONDS = int(os.environ.get("JOB_EVENTS_TOKEN_TTL_SECONDS", "120"))
+JOB_EVENTS_TOKEN_SCOPE = "job_events"
 JOB_PROGRESS_ENCODE_MIN = 41
 JOB_PROGRESS_ENCODE_MAX = 64
 JOB_PROGRESS_GIF_MIN = 42
@@ -465,6 +582,8 @@ OPS_DEFAULT_MAX_USER_ACTIVE_JOBS = int(os.environ.get("OPS_DEFAULT_MAX_USER_ACTI
 OPS_HEALTH_WARN_QUEUE_DEPTH = int(os.environ.get("OPS_HEALTH_WARN_QUEUE_DEPTH", "25"))
 OPS_HEALTH_FAIL_QUEUE_DEPTH = int(os.environ.get("OPS_HEALTH_FAIL_QUEUE_DEPTH", "80"))
 OPS_FAIL_OPEN_HEALTH_SECONDS = int(os.environ.get("OPS_FAIL_OPEN_HEALTH_SECONDS", "120"))
+# Ops controls and queue counters are cached in-process for this long.
+OPS_SNAPSHOT_TTL_SECONDS = float(os.environ.get("OPS_SNAPSHOT_TTL_SECONDS", "5"))
 
 
 async def track_llm_usage(user_id: str | None, usage_type: str, prompt_tokens: int, completion_tokens: int):
@@ -691,10 +810,12 @@ def _store_uploaded_image_bytes(
         "file_type": "image",
         "media_kind": media_kind,
         "content_type": (content_type or "").strip().lower() or None,
+        "detected_format": detected_ext,
         "file_path": storage_meta["file_path"],
         "storage_backend": storage_meta["storage_backend"],
         "storage_key": storage_meta["storage_key"],
         "file_size": storage_meta["file_size"],
+        "sha256": storage_meta.get("sha256"),
         "uploaded_at": datetime.now(timezone.utc).isoformat(),
     }
     return {"file_id": file_id, "filename": original_filename, "upload_doc": upload_doc}
@@ -719,6 +840,35 @@ def _sniff_visual_format_path(path: Path) -> str | None:
         return None
 
 
+def _upload_visual_format(upload_doc: dict, path: Path | None) -> str | None:
+    recorded = str(upload_doc.get("detected_format") or "").strip().lower()
+    if recorded:
+        return recorded
+    return _sniff_visual_format_path(path) if path is not None else None
+
+
+def _recorded_media_metadata(upload_doc: dict | None) -> dict[str, Any]:
+    metadata = (upload_doc or {}).get("media_metadata")
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _recorded_audio_duration_seconds(audio_upload: dict) -> float | None:
+    try:
+        duration = float(_recorded_media_metadata(audio_upload).get("duration") or 0)
+    except (TypeError, ValueError):
+        return None
+    return duration if duration > 0 else None
+
+
+def _recorded_image_dimensions(image_upload: dict) -> tuple[int | None, int | None] | None:
+    metadata = _recorded_media_metadata(image_upload)
+    try:
+        width, height = int(metadata.get("width") or 0), int(metadata.get("height") or 0)
+    except (TypeError, ValueError):
+        return None
+    return (width, height) if width > 0 and height > 0 else None
+
+
 def _is_gif_visual_upload(upload_doc: dict | None, path: Path | None = None) -> bool:
     if not upload_doc:
         return False
@@ -727,7 +877,7 @@ def _is_gif_visual_upload(upload_doc: dict | None, path: Path | None = None) ->
         return True
     if media_storage.get_suffix(upload_doc) == ".gif":
         return True
-    if path is not None and _sniff_visual_format_path(path) == ".gif":
+    if _upload_visual_format(upload_doc, path) == ".gif":
         return True
     return False
 
@@ -741,7 +891,7 @@ def _visual_kind_from_upload(upload_doc: dict | None, path: Path | None = None)
     explicit = str(upload_doc.get("media_kind") or "").strip().lower()
     path_suffix = media_storage.get_suffix(upload_doc)
     if path is not None:
-        sniffed = _sniff_visual_format_path(path)
+        sniffed = _upload_visual_format(upload_doc, path)
         if sniffed == ".gif":
             return "video"
         if sniffed in {".webm", ".mp4", ".mov", ".m4v"}:
@@ -760,10 +910,38 @@ def _resolve_gif_mux_fps(user_render_fps: int) -> int:
     return max(2, min(int(user_render_fps), GIF_TRANSCODE_MAX_FPS))
 
 
+def _resolve_normalized_video_fps(user_render_fps: int) -> int:
+    return max(2, min(int(user_render_fps), VISUAL_NORMALIZE_MAX_FPS))
+
+
 def _gif_cache_signature(*, source_sha256: str, cache_fps: int, max_height: int) -> str:
     return f"v{GIF_CACHE_VERSION}:{source_sha256}:{cache_fps}:{max_height}"
 
 
+def _derived_video_covers(
+    derived: dict[str, Any],
+    *,
+    signature: str,
+    source_sha256: str,
+    cache_fps: int,
+    max_height: int,
+) -> bool:
+    """True if the cached clip serves this render: same signature, or same source at a higher fps."""
+    if derived.get("cache_signature") == signature:
+        return True
+    try:
+        derived_fps = int(derived.get("fps") or 0)
+        derived_height = int(derived.get("max_height") or 0)
+    except (TypeError, ValueError):
+        return False
+    return (
+        derived.get("cache_version") == GIF_CACHE_VERSION
+        and derived.get("source_sha256") == source_sha256
+        and derived_height == max_height
+        and derived_fps >= cache_fps
+    )
+
+
 def _probe_gif_metadata(path: Path) -> dict[str, Any]:
     ffprobe_bin = _resolve_ffprobe_binary()
     command = [
@@ -773,7 +951,7 @@ def _probe_gif_metadata(path: Path) -> dict[str, Any]:
         "-select_streams",
         "v:0",
         "-show_entries",
-        "stream=width,height,nb_frames,duration,r_frame_rate",
+        "stream=codec_name,width,height,nb_frames,duration,r_frame_rate",
         "-of",
         "json",
         str(path),
@@ -812,23 +990,94 @@ def _probe_gif_metadata(path: Path) -> dict[str, Any]:
         "height": height,
         "nb_frames": nb_frames,
         "duration": duration,
+        "codec": str(stream.get("codec_name") or "") or None,
+    }
+
+
+def _probe_audio_metadata(path: Path) -> dict[str, Any]:
+    ffprobe_bin = _resolve_ffprobe_binary()
+    command = [
+        ffprobe_bin,
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "format=duration:stream=codec_name,sample_rate,channels",
+        "-of",
+        "json",
+        str(path),
+    ]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=15, check=False)
+    except subprocess.TimeoutExpired:
+        return {}
+    if completed.returncode != 0:
+        return {}
+    try:
+        payload = json.loads(completed.stdout or "{}")
+    except json.JSONDecodeError:
+        return {}
+    streams = payload.get("streams") or []
+    stream = streams[0] if isinstance(streams, list) and streams else {}
+    try:
+        duration = float((payload.get("format") or {}).get("duration") or 0)
+    except (TypeError, ValueError):
+        duration = 0.0
+    if duration <= 0:
+        return {}
+    try:
+        sample_rate = int(stream.get("sample_rate") or 0) or None
+        channels = int(stream.get("channels") or 0) or None
+    except (TypeError, ValueError):
+        sample_rate, channels = None, None
+    return {
+        "duration": duration,
+        "codec": str(stream.get("codec_name") or "") or None,
+        "sample_rate": sample_rate,
+        "channels": channels,
     }
 
 
+def _probe_upload_media_metadata(path: Path, *, file_type: str, visual_format: str | None = None) -> dict[str, Any]:
+    try:
+        if file_type == "audio":
+            return _probe_audio_metadata(path)
+        if visual_format in VIDEO_VISUAL_EXTENSIONS:
+            return _probe_gif_metadata(path)
+    except HTTPException:
+        return {}
+    width, height = _probe_image_dimensions(path)
+    return {"width": width, "height": height} if width and height else {}
+
+
+async def _attach_upload_media_metadata(upload_doc: dict, *, visual_format: str | None = None) -> None:
+    async with media_storage.local_path_for_processing(upload_doc) as path:
+        upload_doc["media_metadata"] = await asyncio.to_thread(
+            _probe_upload_media_metadata,
+            path,
+            file_type=str(upload_doc.get("file_type") or ""),
+            visual_format=visual_format,
+        )
+
+
 def _resolve_gif_transcode_settings(
     *,
     source_path: Path,
     user_render_fps: int,
+    gif_metadata: dict[str, Any] | None = None,
+    is_gif: bool = True,
 ) -> dict[str, int]:
-    cache_fps = _resolve_gif_mux_fps(user_render_fps)
+    cache_fps = _resolve_gif_mux_fps(user_render_fps) if is_gif else _resolve_normalized_video_fps(user_render_fps)
     max_height = GIF_TRANSCODE_MAX_HEIGHT
     try:
         file_size = source_path.stat().st_size
     except OSError:
         file_size = 0
-    meta = _probe_gif_metadata(source_path)
+    meta = gif_metadata if gif_metadata is not None else _probe_gif_metadata(source_path)
     nb_frames = int(meta.get("nb_frames") or 0)
-    heavy = (
+    # Heavy-input limits are for GIF decoding; uploaded videos are already compressed streams.
+    heavy = is_gif and (
         file_size >= GIF_TRANSCODE_HEAVY_BYTES_THRESHOLD
         or nb_frames >= GIF_TRANSCODE_HEAVY_FRAME_THRESHOLD
         or max(int(meta.get("width") or 0), int(meta.get("height") or 0)) > 960
@@ -855,17 +1104,44 @@ def _run_ffmpeg_command_with_progress(
     duration_seconds: float,
     on_progress: Callable[[float], None] | None = None,
     timeout: int,
+    cancel_event: threading.Event | None = None,
+    stdin_chunks: Iterable[bytes] | None = None,
 ) -> subprocess.CompletedProcess:
+    """Run FFmpeg reporting progress; kills it on timeout or as soon as cancel_event is set."""
     safe_duration = max(0.5, float(duration_seconds or 0.5))
     full_cmd = _insert_ffmpeg_progress_flags(command)
     proc = subprocess.Popen(
         full_cmd,
+        stdin=subprocess.PIPE if stdin_chunks is not None else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
         bufsize=1,
     )
     stderr_chunks: list[str] = []
+    stdin_errors: list[str] = []
+    stdin_thread: threading.Thread | None = None
+    if stdin_chunks is not None:
+        def _feed_stdin() -> None:
+            stdin_buffer = proc.stdin.buffer
+            try:
+                for chunk in stdin_chunks:
+                    try:
+                        stdin_buffer.write(chunk)
+                    except (BrokenPipeError, ValueError):
+                        # FFmpeg exited (failure, timeout or cancel); its own return code reports why.
+                        return
+            except Exception as exc:
+                stdin_errors.append(f"stdin frames failed: {exc}")
+                proc.kill()
+            finally:
+                try:
+                    stdin_buffer.close()
+                except Exception:
+                    pass
+
+        stdin_thread = threading.Thread(target=_feed_stdin, daemon=True)
+        stdin_thread.start()
 
     def _drain_stderr() -> None:
         if proc.stderr is not None:
@@ -873,6 +1149,17 @@ def _run_ffmpeg_command_with_progress(
 
     stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
     stderr_thread.start()
+    cancel_thread: threading.Thread | None = None
+    if cancel_event is not None:
+        def _kill_on_cancel() -> None:
+            while proc.poll() is None:
+                if cancel_event.wait(FFMPEG_CANCEL_CHECK_SECONDS):
+                    if proc.poll() is None:
+                        proc.kill()
+                    return
+
+        cancel_thread = threading.Thread(target=_kill_on_cancel, daemon=True)
+        cancel_thread.start()
     deadline = time.perf_counter() + timeout
     stdout_parts: list[str] = []
     out_time_us = 0
@@ -908,11 +1195,19 @@ def _run_ffmpeg_command_with_progress(
         raise
     finally:
         stderr_thread.join(timeout=5)
-
+        if cancel_thread is not None:
+            cancel_thread.join(timeout=FFMPEG_CANCEL_CHECK_SECONDS * 2)
+        if stdin_thread is not None:
+            stdin_thread.join(timeout=5)
+
+    if cancel_event is not None and cancel_event.is_set() and return_code != 0:
+        raise JobCancelledError("Job was cancelled while FFmpeg was running.")
+    if stdin_errors and return_code == 0:
+        return_code = 1
     if return_code == 0 and on_progress:
         on_progress(1.0)
 
-    stderr = "".join(stderr_chunks)
+    stderr = "".join(stderr_chunks + stdin_errors)
     return subprocess.CompletedProcess(full_cmd, return_code, "".join(stdout_parts), stderr)
 
 
@@ -984,10 +1279,11 @@ def _transcode_gif_to_h264_mp4(
     fps: int,
     duration_seconds: float | None = None,
     on_progress: Callable[[float], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    is_gif: bool = True,
 ) -> None:
     ffmpeg_bin = _resolve_ffmpeg_binary()
-    # Single playthrough of the GIF animation (ignore_loop 1). ignore_loop 0 honors Netscape
-    # loop=0 (infinite) and can make FFmpeg decode until timeout on heavy GIFs.
+    source_label = "GIF" if is_gif else "Video"
     vf = (
         f"scale='min({max_height},iw)':'min({max_height},ih)':"
         "force_original_aspect_ratio=decrease:flags=fast_bilinear,"
@@ -1002,8 +1298,11 @@ def _transcode_gif_to_h264_mp4(
         "error",
         "-threads",
         "0",
-        "-ignore_loop",
-        "1",
+    ]
+    if is_gif:
+        # Single playthrough; ignore_loop 0 can make FFmpeg decode heavy GIFs until timeout.
+        command.extend(["-ignore_loop", "1"])
+    command += [
         "-i",
         str(source_path),
         "-vf",
@@ -1020,7 +1319,8 @@ def _transcode_gif_to_h264_mp4(
         str(output_path),
     ]
     logging.info(
-        "GIF transcode starting source=%s output=%s max_height=%s fps=%s timeout=%ss",
+        "%s transcode starting source=%s output=%s max_height=%s fps=%s timeout=%ss",
+        source_label,
         str(source_path),
         str(output_path),
         max_height,
@@ -1035,11 +1335,13 @@ def _transcode_gif_to_h264_mp4(
             duration_seconds=estimate_seconds,
             on_progress=progress_cb,
             timeout=GIF_TRANSCODE_TIMEOUT_SECONDS,
+            cancel_event=cancel_event,
         )
     except subprocess.TimeoutExpired as exc:
         stderr_preview = (getattr(exc, "stderr", None) or getattr(exc, "stdout", None) or "").strip()
         logging.error(
-            "GIF transcode timed out after %ss source=%s stderr=%s",
+            "%s transcode timed out after %ss source=%s stderr=%s",
+            source_label,
             GIF_TRANSCODE_TIMEOUT_SECONDS,
             str(source_path),
             stderr_preview[:800],
@@ -1047,17 +1349,17 @@ def _transcode_gif_to_h264_mp4(
         raise HTTPException(
             status_code=500,
             detail=(
-                f"GIF conversion timed out after {GIF_TRANSCODE_TIMEOUT_SECONDS} seconds. "
-                "Try a smaller GIF, use 2 fps for a static-style upload, or shorten the animation."
+                f"{source_label} conversion timed out after {GIF_TRANSCODE_TIMEOUT_SECONDS} seconds. "
+                "Try a smaller file, use 2 fps for a static-style upload, or shorten the animation."
             ),
         )
     if completed.returncode != 0:
         raise HTTPException(
             status_code=500,
-            detail=f"GIF conversion failed: {(completed.stderr or completed.stdout or 'FFmpeg failed').strip()[:500]}",
+            detail=f"{source_label} conversion failed: {(completed.stderr or completed.stdout or 'FFmpeg failed').strip()[:500]}",
         )
     if not output_path.exists() or output_path.stat().st_size <= 0:
-        raise HTTPException(status_code=500, detail="GIF conversion produced an empty video.")
+        raise HTTPException(status_code=500, detail=f"{source_label} conversion produced an empty video.")
 
 
 async def _get_or_create_gif_mp4_cache(
@@ -1066,21 +1368,27 @@ async def _get_or_create_gif_mp4_cache(
     *,
     user_render_fps: int,
     on_gif_encode_progress: Callable[[float], None] | None = None,
-) -> tuple[Path, int]:
-    """Transcode animated GIF to a loopable H.264 MP4 once; cache path in Mongo + disk."""
+    cancel_event: threading.Event | None = None,
+    is_gif: bool = True,
+    cached_only: bool = False,
+) -> tuple[Path, int] | None:
+    """Transcode an animated GIF (or uploaded video) to a loopable H.264 MP4 once; cache path in Mongo + disk."""
     upload_id = str(image_upload.get("id") or "").strip()
     if not upload_id:
         raise HTTPException(status_code=400, detail="Missing image upload id.")
 
+    gif_metadata = _recorded_media_metadata(image_upload) or await asyncio.to_thread(_probe_gif_metadata, image_path)
     transcode_settings = await asyncio.to_thread(
         _resolve_gif_transcode_settings,
         source_path=image_path,
         user_render_fps=user_render_fps,
+        gif_metadata=gif_metadata,
+        is_gif=is_gif,
     )
     cache_fps = int(transcode_settings["cache_fps"])
     max_height = int(transcode_settings["max_height"])
 
-    source_sha256 = await asyncio.to_thread(_file_sha256_hex, image_path)
+    source_sha256 = await _upload_content_sha256(image_upload, image_path)
     signature = _gif_cache_signature(
         source_sha256=source_sha256,
         cache_fps=cache_fps,
@@ -1089,17 +1397,24 @@ async def _get_or_create_gif_mp4_cache(
     doc = await db.uploads.find_one({"id": upload_id}, {"_id": 0, "derived_video": 1})
     derived = (doc or {}).get("derived_video") if isinstance((doc or {}).get("derived_video"), dict) else {}
     storage_key = str(derived.get("storage_key") or _derived_gif_mp4_storage_key(upload_id))
-    if derived.get("cache_signature") == signature and hasattr(media_storage, "root_dir"):
+    if _derived_video_covers(
+        derived,
+        signature=signature,
+        source_sha256=source_sha256,
+        cache_fps=cache_fps,
+        max_height=max_height,
+    ) and hasattr(media_storage, "root_dir"):
         cached_path = media_storage.root_dir / storage_key
         if cached_path.exists() and cached_path.stat().st_size > 0:
             return cached_path, cache_fps
+    if cached_only:
+        return None
 
     if not hasattr(media_storage, "root_dir"):
         raise HTTPException(status_code=500, detail="GIF cache requires local media storage.")
     cache_path = media_storage.root_dir / storage_key
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    meta = _probe_gif_metadata(image_path)
-    gif_duration = float(meta.get("duration") or 0)
+    gif_duration = float(gif_metadata.get("duration") or 0)
     nb_frames = int(transcode_settings.get("nb_frames") or 0)
     if gif_duration <= 0 and nb_frames > 0 and cache_fps > 0:
         gif_duration = nb_frames / float(cache_fps)
@@ -1115,6 +1430,8 @@ async def _get_or_create_gif_mp4_cache(
             fps=cache_fps,
             duration_seconds=gif_duration,
             on_progress=on_gif_encode_progress,
+            cancel_event=cancel_event,
+            is_gif=is_gif,
         )
         shutil.move(str(temp_path), str(cache_path))
     except Exception:
@@ -1153,7 +1470,8 @@ async def _get_or_create_gif_mp4_cache(
         },
     )
     logging.info(
-        "GIF cache created for upload=%s path=%s size=%sB fps=%s max_height=%s",
+        "%s cache created for upload=%s path=%s size=%sB fps=%s max_height=%s",
+        "GIF" if is_gif else "Video",
         upload_id,
         str(cache_path),
         cache_path.stat().st_size if cache_path.exists() else 0,
@@ -1177,6 +1495,260 @@ def _append_ffmpeg_visual_input(
     command.extend(["-f", "image2", "-loop", "1", "-framerate", render_fps, "-i", str(visual_path)])
 
 
+def _youtube_audio_codec_args(*, copy_audio: bool) -> list[str]:
+    if copy_audio:
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac", "-b:a", YOUTUBE_AUDIO_BITRATE]
+
+
+def _derived_audio_storage_key(upload_id: str) -> str:
+    return f"{upload_id}.render-audio.m4a"
+
+
+def _audio_passthrough_compatible(metadata: dict[str, Any]) -> bool:
+    try:
+        channels = int(metadata.get("channels") or 0)
+    except (TypeError, ValueError):
+        channels = 0
+    return str(metadata.get("codec") or "").lower() in AUDIO_PASSTHROUGH_CODECS and channels in {1, 2}
+
+
+def _render_audio_source(audio_upload: dict, audio_path: Path) -> tuple[Path, str]:
+    derived = audio_upload.get("derived_audio") if isinstance(audio_upload.get("derived_audio"), dict) else {}
+    if derived.get("version") != AUDIO_SIDECAR_VERSION:
+        return audio_path, "encode"
+    if derived.get("mode") == "passthrough":
+        return audio_path, "passthrough"
+    storage_key = str(derived.get("storage_key") or "")
+    if (
+        derived.get("mode") == "sidecar"
+        and derived.get("bitrate") == YOUTUBE_AUDIO_BITRATE
+        and storage_key
+        and hasattr(media_storage, "root_dir")
+    ):
+        sidecar_path = media_storage.root_dir / storage_key
+        if sidecar_path.is_file() and sidecar_path.stat().st_size > 0:
+            return sidecar_path, "sidecar"
+    return audio_path, "encode"
+
+
+def _encode_audio_sidecar(
+    *,
+    source_path: Path,
+    output_path: Path,
+    duration_seconds: float,
+    cancel_event: threading.Event | None = None,
+) -> None:
+    ffmpeg_bin = _resolve_ffmpeg_binary()
+    command = [
+        ffmpeg_bin,
+        "-nostdin",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        str(source_path),
+        "-map",
+        "0:a:0",
+        "-vn",
+        *_youtube_audio_codec_args(copy_audio=False),
+        "-movflags",
+        "+faststart",
+        str(output_path),
+    ]
+    completed = _run_ffmpeg_command_with_progress(
+        command,
+        duration_seconds=max(1.0, float(duration_seconds or 0)),
+        timeout=AUDIO_PREPARE_TIMEOUT_SECONDS,
+        cancel_event=cancel_event,
+    )
+    if completed.returncode != 0:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Audio preparation failed: {(completed.stderr or completed.stdout or 'FFmpeg failed').strip()[:500]}",
+        )
+    if not output_path.exists() or output_path.stat().st_size <= 0:
+        raise HTTPException(status_code=500, detail="Audio preparation produced an empty file.")
+
+
+def _still_loop_segment_encode_args(*, mux_fps: int, segment_path: Path) -> list[str]:
+    frame_count = max(1, int(YOUTUBE_STILL_LOOP_SEGMENT_SECONDS * mux_fps))
+    return [
+        "-map",
+        "[vout]",
+        "-an",
+        "-c:v",
+        "libx264",
+        "-preset",
+        YOUTUBE_RENDER_PRESET,
+        "-crf",
+        YOUTUBE_RENDER_CRF,
+        "-pix_fmt",
+        "yuv420p",
+        "-tune",
+        "stillimage",
+        # One keyframe at the start and no B-frames, so each looped copy decodes on its own.
+        "-g",
+        str(frame_count),
+        "-keyint_min",
+        str(frame_count),
+        "-sc_threshold",
+        "0",
+        "-bf",
+        "0",
+        "-r",
+        str(mux_fps),
+        "-frames:v",
+        str(frame_count),
+        str(segment_path),
+    ]
+
+
+def _still_loop_mux_command(
+    ffmpeg_bin: str,
+    *,
+    segment_path: Path,
+    audio_path: Path,
+    output_path: Path,
+    duration_seconds: float,
+    copy_audio: bool = False,
+) -> list[str]:
+    return [
+        ffmpeg_bin,
+        "-nostdin",
+        "-y",
+        "-loglevel",
+        "error",
+        "-stream_loop",
+        "-1",
+        "-i",
+        str(segment_path),
+        "-i",
+        str(audio_path),
+        "-map",
+        "0:v",
+        "-map",
+        "1:a",
+        "-c:v",
+        "copy",
+        *_youtube_audio_codec_args(copy_audio=copy_audio),
+        "-movflags",
+        "+faststart",
+        "-t",
+        f"{duration_seconds:.3f}",
+        "-shortest",
+        str(output_path),
+    ]
+
+
+def _run_still_loop_render(
+    *,
+    segment_command: list[str],
+    mux_command: list[str],
+    duration_seconds: float,
+    on_progress: Callable[[float], None] | None = None,
+    timeout: int,
+    cancel_event: threading.Event | None = None,
+) -> subprocess.CompletedProcess:
+    started_at = time.perf_counter()
+    segment = _run_ffmpeg_command_with_progress(
+        segment_command,
+        duration_seconds=YOUTUBE_STILL_LOOP_SEGMENT_SECONDS,
+        timeout=timeout,
+        cancel_event=cancel_event,
+    )
+    if segment.returncode != 0:
+        return segment
+    remaining = max(1, int(timeout - (time.perf_counter() - started_at)))
+    return _run_ffmpeg_command_with_progress(
+        mux_command,
+        duration_seconds=duration_seconds,
+        on_progress=on_progress,
+        timeout=remaining,
+        cancel_event=cancel_event,
+    )
+
+
+def _parallel_render_segments(duration_seconds: float, fps: int, segment_count: int) -> list[tuple[float, int]]:
+    total_frames = max(1, math.ceil(float(duration_seconds) * fps))
+    segment_count = max(1, min(int(segment_count), total_frames))
+    frames_per_segment = math.ceil(total_frames / segment_count)
+    segments: list[tuple[float, int]] = []
+    start_frame = 0
+    while start_frame < total_frames:
+        frame_count = min(frames_per_segment, total_frames - start_frame)
+        segments.append((start_frame / float(fps), frame_count))
+        start_frame += frame_count
+    return segments
+
+
+def _run_segmented_render(
+    *,
+    segment_commands: list[list[str]],
+    segment_paths: list[Path],
+    concat_command: list[str],
+    concat_list_path: Path,
+    segment_stdin_chunks: list[Iterable[bytes]] | None = None,
+    duration_seconds: float,
+    on_progress: Callable[[float], None] | None = None,
+    timeout: int,
+    cancel_event: threading.Event | None = None,
+) -> subprocess.CompletedProcess:
+    started_at = time.perf_counter()
+    segment_duration = max(0.5, float(duration_seconds) / max(1, len(segment_commands)))
+    ratios = [0.0] * len(segment_commands)
+    ratios_lock = threading.Lock()
+
+    def _segment_progress(index: int) -> Callable[[float], None] | None:
+        if on_progress is None:
+            return None
+
+        def _report(ratio: float) -> None:
+            with ratios_lock:
+                ratios[index] = max(ratios[index], float(ratio))
+                overall = sum(ratios) / len(ratios)
+            on_progress(min(0.99, overall))
+
+        return _report
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(segment_commands)) as executor:
+            futures = [
+                executor.submit(
+                    _run_ffmpeg_command_with_progress,
+                    segment_command,
+                    duration_seconds=segment_duration,
+                    on_progress=_segment_progress(index),
+                    timeout=timeout,
+                    cancel_event=cancel_event,
+                    stdin_chunks=segment_stdin_chunks[index] if segment_stdin_chunks else None,
+                )
+                for index, segment_command in enumerate(segment_commands)
+            ]
+            results = [future.result() for future in futures]
+        for result in results:
+            if result.returncode != 0:
+                return result
+        concat_list_path.write_text(
+            "".join(f"file '{segment_path}'\n" for segment_path in segment_paths),
+            encoding="utf-8",
+        )
+        remaining = max(1, int(timeout - (time.perf_counter() - started_at)))
+        completed = _run_ffmpeg_command_with_progress(
+            concat_command,
+            duration_seconds=duration_seconds,
+            timeout=remaining,
+            cancel_event=cancel_event,
+        )
+        if completed.returncode == 0 and on_progress:
+            on_progress(1.0)
+        return completed
+    finally:
+        for segment_path in segment_paths:
+            segment_path.unlink(missing_ok=True)
+        concat_list_path.unlink(missing_ok=True)
+
+
 def _sniff_audio_format(sample: bytes) -> str | None:
     blob = bytes(sample or b"")
     if not blob:
@@ -2201,12 +2773,45 @@ async def _ensure_producer_profile(user_id: str, username: str) -> None:
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    return await _resolve_current_user(credentials.credentials)
+
+
+def create_job_events_token(user_id: str, job_id: str) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(seconds=JOB_EVENTS_TOKEN_TTL_SECONDS)
+    to_encode = {"sub": user_id, "job_id": job_id, "scope": JOB_EVENTS_TOKEN_SCOPE, "exp": expire}
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+async def get_current_user_for_job_stream(
+    job_id: str,
+    stream_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> dict:
+    """Like get_current_user, but also accepts a job-scoped ?stream_token=."""
+    if credentials:
+        return await _resolve_current_user(credentials.credentials)
+    token = (stream_token or "").strip()
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Stream token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = payload.get("sub")
+    if payload.get("scope") != JOB_EVENTS_TOKEN_SCOPE or payload.get("job_id") != job_id or not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return {"id": user_id}
+
+
+async def _resolve_current_user(token: str) -> dict:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id = payload.get("sub")
         username = payload.get("username")
-        if user_id is None or username is None:
+        # Scoped tokens (e.g. job event streams) never stand in for a session.
+        if user_id is None or username is None or payload.get("scope"):
             raise HTTPException(status_code=401, detail="Invalid token")
         existing_user = await db.users.find_one(
             {"id": user_id, "deleted": {"$ne": True}},
@@ -2253,6 +2858,15 @@ def _safe_iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _parse_utc_timestamp(value: str) -> datetime:
+    # An unencoded "+00:00" arrives as " 00:00" in a query string.
+    raw = str(value or "").strip().replace(" ", "+").replace("Z", "+00:00")
+    parsed = datetime.fromisoformat(raw)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
 def _stable_json_dumps(value: Any) -> str:
     return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
 
@@ -2371,7 +2985,7 @@ def _merge_ops_controls(raw: Optional[dict]) -> dict[str, Any]:
     return merged
 
 
-async def _get_ops_controls() -> dict[str, Any]:
+async def _load_ops_controls() -> dict[str, Any]:
     try:
         doc = await db.system_settings.find_one({"key": "ops_controls"}, {"_id": 0, "value": 1, "updated_at": 1})
     except (AttributeError, TypeError):
@@ -2382,8 +2996,44 @@ async def _get_ops_controls() -> dict[str, Any]:
     return _merge_ops_controls(value)
 
 
+async def _load_background_job_stats() -> dict[str, Any]:
+    try:
+        return await background_job_service.get_queue_stats()
+    except (AttributeError, TypeError):
+        return {
+            "queued": 0,
+            "processing": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "failed_last_hour": 0,
+            "oldest_queued_job": None,
+        }
+
+
+def _invalidate_ops_snapshot() -> None:
+    _ops_snapshot["expires_at"] = 0.0
+
+
+async def _get_ops_snapshot() -> dict[str, Any]:
+    if _ops_snapshot["controls"] is not None and time.monotonic() < _ops_snapshot["expires_at"]:
+        return _ops_snapshot
+    async with _ops_snapshot_lock:
+        if _ops_snapshot["controls"] is None or time.monotonic() >= _ops_snapshot["expires_at"]:
+            controls, jobs = await asyncio.gather(_load_ops_controls(), _load_background_job_stats())
+            _ops_snapshot.update(
+                controls=controls,
+                jobs=jobs,
+                expires_at=time.monotonic() + OPS_SNAPSHOT_TTL_SECONDS,
+            )
+    return _ops_snapshot
+
+
+async def _get_ops_controls() -> dict[str, Any]:
+    return (await _get_ops_snapshot())["controls"]
+
+
 async def _set_ops_controls(update_request: OpsControlsUpdateRequest) -> dict[str, Any]:
-    existing = await _get_ops_controls()
+    existing = await _load_ops_controls()
     next_value = _merge_ops_controls(existing)
     payload = update_request.model_dump(exclude_none=True)
     for key, value in payload.items():
@@ -2397,41 +3047,12 @@ async def _set_ops_controls(update_request: OpsControlsUpdateRequest) -> dict[st
         {"$set": {"key": "ops_controls", "value": next_value, "updated_at": next_value["updated_at"]}},
         upsert=True,
     )
+    _invalidate_ops_snapshot()
     return next_value
 
 
 async def _get_background_job_stats() -> dict[str, Any]:
-    pipeline = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-    ]
-    try:
-        rows = await db.upload_jobs.aggregate(pipeline).to_list(None)
-        failed_recent = await db.upload_jobs.count_documents(
-            {
-                "status": "failed",
-                "updated_at": {"$gte": (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()},
-            }
-        )
-        oldest_queued = await db.upload_jobs.find_one(
-            {"status": "queued"},
-            {"_id": 0, "created_at": 1, "type": 1},
-            sort=[("created_at", 1)],
-        )
-    except (AttributeError, TypeError):
-        rows = []
-        failed_recent = 0
-        oldest_queued = None
-    counts = {str(row.get("_id") or ""): int(row.get("count") or 0) for row in rows}
-    queued = counts.get("queued", 0)
-    processing = counts.get("processing", 0)
-    return {
-        "queued": queued,
-        "processing": processing,
-        "succeeded": counts.get("succeeded", 0),
-        "failed": counts.get("failed", 0),
-        "failed_last_hour": int(failed_recent),
-        "oldest_queued_job": oldest_queued,
-    }
+    return (await _get_ops_snapshot())["jobs"]
 
 
 async def _build_health_snapshot() -> dict[str, Any]:
@@ -2500,7 +3121,7 @@ async def _guard_heavy_feature(
     feature_key: str,
     job_type: str | None = None,
     queue_allowed_when_busy: bool = True,
-) -> None:
+) -> dict[str, Any]:
     controls = await _get_ops_controls()
     disabled_features = controls.get("disabled_features") or {}
     if disabled_features.get(feature_key):
@@ -2512,22 +3133,24 @@ async def _guard_heavy_feature(
     job_stats = await _get_background_job_stats()
     if job_type:
         try:
-            user_active_jobs = await db.upload_jobs.count_documents(
-                {
-                    "user_id": current_user["id"],
-                    "status": {"$in": ["queued", "processing"]},
-                }
-            )
+            user_active_jobs = await background_job_service.get_user_active_job_count(current_user["id"])
         except (AttributeError, TypeError):
             user_active_jobs = 0
         if user_active_jobs >= int(controls.get("max_user_active_jobs") or OPS_DEFAULT_MAX_USER_ACTIVE_JOBS):
             raise HTTPException(status_code=429, detail={"message": "You already have too many active jobs running. Wait for one to finish.", "code": "too_many_active_jobs"})
 
+    eta: dict[str, Any] = {"predicted_wait_seconds": None, "estimated_completion_at": None}
+    if job_type:
+        await job_duration_stats.refresh()
+        eta = background_job_service.estimate_job_eta(
+            {"type": job_type, "status": "queued", "created_at": _safe_iso_now()}
+        )
+
     queue_too_busy = int(job_stats.get("queued") or 0) >= int(controls.get("max_queued_jobs") or OPS_DEFAULT_MAX_QUEUED_JOBS)
     processing_too_busy = int(job_stats.get("processing") or 0) >= int(controls.get("max_processing_jobs") or OPS_DEFAULT_MAX_PROCESSING_JOBS)
     if queue_too_busy or processing_too_busy or controls.get("overload_mode_enabled"):
         if job_type and queue_allowed_when_busy and controls.get("queue_job_types_when_busy", {}).get(job_type, True):
-            return
+            return eta
         raise HTTPException(
             status_code=503,
             detail={
@@ -2535,8 +3158,10 @@ async def _guard_heavy_feature(
                 "code": "capacity_busy",
                 "queued_jobs": job_stats.get("queued"),
                 "processing_jobs": job_stats.get("processing"),
+                "predicted_wait_seconds": eta["predicted_wait_seconds"],
             },
         )
+    return eta
 
 
 def _clean_youtube_tags(raw_tags: list[str] | None) -> list[str]:
@@ -2573,7 +3198,6 @@ def _resolve_payload_render_fps(payload: dict[str, Any]) -> int:
 
 
 def _resolve_ffmpeg_mux_fps(payload: dict[str, Any]) -> int:
-    """FFmpeg output fps. GIF jobs set mux_fps (10–15); static stills always encode at 2."""
     mux = payload.get("mux_fps")
     if mux is not None:
         try:
@@ -2746,8 +3370,9 @@ async def _update_upload_job(
     result: dict | None = None,
     error: str | None = None,
     extra_updates: dict[str, Any] | None = None,
-) -> None:
-    await background_job_service.update_job(
+    only_if_owned: bool = False,
+) -> str | None:
+    return await background_job_service.update_job(
         job_id,
         status=status,
         progress=progress,
@@ -2755,6 +3380,7 @@ async def _update_upload_job(
         result=result,
         error=error,
         extra_updates=extra_updates,
+        only_if_owned=only_if_owned,
     )
 
 
@@ -2762,60 +3388,44 @@ class JobCancelledError(Exception):
     pass
 
 
-async def _get_background_job(job_id: str) -> dict | None:
-    return await background_job_service.get_job(job_id)
+class JobDeferredError(Exception):
+    pass
 
 
-async def _touch_upload_job_heartbeat(
-    job_id: str,
-    *,
-    message: str | None = None,
-    progress: int | None = None,
-) -> None:
-    await background_job_service.touch_heartbeat(
-        job_id,
-        message=message,
-        progress=progress,
-    )
+async def _get_background_job(job_id: str) -> dict | None:
+    return await background_job_service.get_job(job_id)
 
 
 async def _assert_job_not_cancel_requested(job_id: str, *, stage: str) -> None:
+    cancel_event = background_job_service.cancel_event_for(job_id)
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelledError(f"Job was cancelled during stage '{stage}'.")
     job_doc = await _get_background_job(job_id)
     if job_doc and job_doc.get("cancel_requested"):
         raise JobCancelledError(f"Job was cancelled during stage '{stage}'.")
 
 
 async def _job_heartbeat_loop(job_id: str) -> None:
-    """Refresh last_heartbeat_at without clobbering stage-specific progress/message."""
     while True:
-        job_doc = await _get_background_job(job_id)
-        if not job_doc or job_doc.get("status") != "processing":
-            break
-        stage = str(job_doc.get("stage") or "").strip()
-        hb_progress = int(job_doc.get("progress") or 0)
-        await _touch_upload_job_heartbeat(
-            job_id,
-            message=str(job_doc.get("message") or "Processing..."),
-            progress=hb_progress,
-        )
-        _agent_debug_log(
-            "H3",
-            "server.py:_job_heartbeat_loop",
-            "heartbeat mirrored job state",
-            {
-                "job_id": job_id,
-                "stage": stage or "unknown",
-                "progress": hb_progress,
-                "encode_progress": job_doc.get("encode_progress"),
-            },
-        )
-        logger.info(
-            "Job heartbeat job=%s stage=%s progress=%s message=%r",
-            job_id,
-            stage or "unknown",
-            int(job_doc.get("progress") or 0),
-            str(job_doc.get("message") or "")[:120],
-        )
+        try:
+            job_doc = await background_job_service.renew_lease(job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Job lease renewal failed job=%s: %s", job_id, exc)
+        else:
+            if not job_doc:
+                logger.warning("Job heartbeat stopped job=%s: lease no longer held by this worker", job_id)
+                background_job_service.request_local_cancel(job_id)
+                break
+            if job_doc.get("cancel_requested"):
+                background_job_service.request_local_cancel(job_id)
+                break
+            logger.debug(
+                "Job lease renewed job=%s stage=%s",
+                job_id,
+                str(job_doc.get("stage") or "unknown"),
+            )
         await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
 
 
@@ -2825,6 +3435,7 @@ async def _job_watchdog_loop() -> None:
         "ffmpeg_render": JOB_FFMPEG_STAGE_TIMEOUT_SECONDS,
         "youtube_upload": JOB_YOUTUBE_STAGE_TIMEOUT_SECONDS,
     }
+    next_archive_at = 0.0
     while True:
         try:
             result = await background_job_service.run_watchdog_pass(
@@ -2842,9 +3453,34 @@ async def _job_watchdog_loop() -> None:
             raise
         except Exception as exc:
             logger.error("Background job watchdog error: %s", str(exc))
+        if JOB_ARCHIVE_AFTER_DAYS > 0 and time.monotonic() >= next_archive_at:
+            next_archive_at = time.monotonic() + JOB_ARCHIVE_INTERVAL_SECONDS
+            try:
+                await _archive_finished_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Finished job archival error: %s", str(exc))
         await asyncio.sleep(JOB_WATCHDOG_INTERVAL_SECONDS)
 
 
+async def _archive_finished_jobs() -> int:
+    archived = await background_job_service.archive_finished_jobs(
+        older_than_seconds=JOB_ARCHIVE_AFTER_DAYS * 86400,
+        batch_size=JOB_ARCHIVE_BATCH_SIZE,
+    )
+    for job in archived:
+        if job.get("type") == "thumbnail_check":
+            # Covers jobs cleared or cancelled before a worker ran them.
+            _delete_job_input_files(str(job.get("id") or ""), job.get("payload"))
+        if job.get("upload_checkpoint"):
+            try:
+                _delete_render_checkpoint_file(str(job.get("id") or ""))
+            except Exception as exc:
+                logger.warning("Failed to delete render of archived job=%s: %s", job.get("id"), exc)
+    return len(archived)
+
+
 async def _claim_next_background_job() -> dict | None:
     return await background_job_service.claim_next_job()
 
@@ -2865,22 +3501,84 @@ async def _background_job_watchdog_loop() -> None:
     await _job_watchdog_loop()
 
 
+async def _background_job_queue_watch_loop() -> None:
+    await asyncio.gather(
+        background_job_service.watch_queue_changes(),
+        background_job_service.watch_cancel_requests(),
+    )
+
+
 async def _create_background_job(
     *,
     current_user: dict,
     job_type: str,
     payload: dict[str, Any],
     message: str = "Queued for background processing.",
+    run_at: str | None = None,
+    job_id: str | None = None,
 ) -> dict:
     return await background_job_service.create_job(
         current_user=current_user,
         job_type=job_type,
         payload=payload,
-        priority=0 if PRIORITIZE_YOUTUBE_UPLOAD_JOBS and job_type == "youtube_upload" else 1,
+        priority=_job_priority(job_type),
         message=message,
+        plan=await _resolve_job_plan(current_user["id"]),
+        run_at=run_at,
+        job_id=job_id,
     )
 
 
+def _job_priority(job_type: str) -> int:
+    if PRIORITIZE_YOUTUBE_UPLOAD_JOBS and job_type == "youtube_upload":
+        return 0
+    if job_type in UPLOAD_PREP_JOB_TYPES:
+        return 2
+    return 1
+
+
+async def _queue_upload_prep_job(current_user: dict, *, job_type: str, upload_id: str, message: str) -> str | None:
+    try:
+        active_prep_jobs = await db.upload_jobs.count_documents(
+            {
+                "status": {"$in": ["queued", "processing"]},
+                "user_id": current_user["id"],
+                "type": {"$in": sorted(UPLOAD_PREP_JOB_TYPES)},
+            },
+            limit=UPLOAD_PREP_MAX_ACTIVE_PER_USER,
+        )
+        if active_prep_jobs >= UPLOAD_PREP_MAX_ACTIVE_PER_USER:
+            logging.info("Skipped %s for upload=%s: user has %s active preparation jobs", job_type, upload_id, active_prep_jobs)
+            return None
+        job = await _create_background_job(
+            current_user=current_user,
+            job_type=job_type,
+            payload={"upload_id": upload_id},
+            message=message,
+        )
+        return job.get("id")
+    except Exception as exc:
+        logging.warning("Could not queue %s for upload=%s: %s", job_type, upload_id, exc)
+        return None
+
+
+async def _resolve_job_plan(user_id: str) -> str:
+    try:
+        user_doc = await db.users.find_one(
+            {"id": user_id},
+            {
+                "_id": 0,
+                "subscription_plan": 1,
+                "subscription_status": 1,
+                "stripe_subscription_id": 1,
+                "stripe_customer_id": 1,
+            },
+        )
+    except (AttributeError, TypeError):
+        return "free"
+    return _resolve_subscription_plan(user_doc or {})
+
+
 def _resolve_ffmpeg_binary() -> str:
     ffmpeg_bin = shutil.which("ffmpeg")
     if not ffmpeg_bin:
@@ -2907,13 +3605,21 @@ def _escape_ffmpeg_text(value: str) -> str:
     return text
 
 
-def _build_youtube_watermark_filter(*, target_w: int, target_h: int, background_color: str) -> str:
-    text = _escape_ffmpeg_text("Upload your beats for free on SendMyBeat")
-    font_color = "black@0.78" if background_color == "white" else "white@0.78"
-    border_color = "white@0.38" if background_color == "white" else "black@0.45"
+YOUTUBE_WATERMARK_TEXT = "Upload your beats for free on SendMyBeat"
+
+
+def _youtube_watermark_metrics(target_w: int, target_h: int) -> tuple[int, int, int]:
     font_size = max(22, min(34, int(target_w * 0.022)))
     margin_x = max(24, int(target_w * 0.025))
     margin_y = max(20, int(target_h * 0.03))
+    return font_size, margin_x, margin_y
+
+
+def _build_youtube_watermark_filter(*, target_w: int, target_h: int, background_color: str) -> str:
+    text = _escape_ffmpeg_text(YOUTUBE_WATERMARK_TEXT)
+    font_color = "black@0.78" if background_color == "white" else "white@0.78"
+    border_color = "white@0.38" if background_color == "white" else "black@0.45"
+    font_size, margin_x, margin_y = _youtube_watermark_metrics(target_w, target_h)
     return (
         f"drawtext=text='{text}':"
         f"fontcolor={font_color}:"
@@ -2958,6 +3664,73 @@ def _create_preblurred_background_image(image_path: Path, *, target_w: int, targ
     return output_path
 
 
+def _load_watermark_font(font_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", font_size)
+    except OSError:
+        return ImageFont.load_default(size=font_size)
+
+
+def _draw_youtube_watermark(frame: Image.Image, *, background_color: str) -> Image.Image:
+    target_w, target_h = frame.size
+    font_size, margin_x, margin_y = _youtube_watermark_metrics(target_w, target_h)
+    font = _load_watermark_font(font_size)
+    if background_color == "white":
+        fill, stroke = (0, 0, 0, int(255 * 0.78)), (255, 255, 255, int(255 * 0.38))
+    else:
+        fill, stroke = (255, 255, 255, int(255 * 0.78)), (0, 0, 0, int(255 * 0.45))
+    overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    left, top, right, bottom = draw.textbbox((0, 0), YOUTUBE_WATERMARK_TEXT, font=font)
+    draw.text(
+        (target_w - (right - left) - margin_x - left, target_h - (bottom - top) - margin_y - top),
+        YOUTUBE_WATERMARK_TEXT,
+        font=font,
+        fill=fill,
+        stroke_width=2,
+        stroke_fill=stroke,
+    )
+    return Image.alpha_composite(frame.convert("RGBA"), overlay)
+
+
+def _compose_still_frame(
+    image_path: Path,
+    *,
+    payload: dict[str, Any],
+    background_path: Path | None = None,
+) -> Path:
+    """Compose the final static frame once, matching _build_render_filter's layout."""
+    target_w, target_h = _resolve_youtube_render_dimensions(payload)
+    background_color = str(payload.get("background_color") or "black")
+    if background_path is not None:
+        with Image.open(background_path) as background:
+            frame = background.convert("RGB").resize((target_w, target_h), Image.Resampling.LANCZOS)
+    else:
+        frame = Image.new("RGB", (target_w, target_h), "white" if background_color == "white" else "black")
+
+    with Image.open(image_path) as source:
+        artwork = ImageOps.exif_transpose(source).convert("RGBA")
+    fit_ratio = min(target_w / float(artwork.width), target_h / float(artwork.height))
+    art_w = max(1, int(round(artwork.width * fit_ratio * float(payload["image_scale_x"]))))
+    art_h = max(1, int(round(artwork.height * fit_ratio * float(payload["image_scale_y"]))))
+    artwork = artwork.resize((art_w, art_h), Image.Resampling.LANCZOS)
+    rotation_degrees = float(payload.get("image_rotation") or 0.0)
+    if abs(rotation_degrees) >= 0.01:
+        # FFmpeg's rotate turns clockwise for positive angles; Pillow turns counter-clockwise.
+        artwork = artwork.rotate(-rotation_degrees, resample=Image.Resampling.BICUBIC, expand=True)
+
+    offset_x = (target_w - artwork.width) / 2.0 + float(payload["image_pos_x"]) * artwork.width * 0.5
+    offset_y = (target_h - artwork.height) / 2.0 + float(payload["image_pos_y"]) * artwork.height * 0.5
+    frame.paste(artwork, (int(offset_x), int(offset_y)), artwork)
+
+    if not payload.get("remove_watermark"):
+        frame = _draw_youtube_watermark(frame, background_color=background_color)
+
+    output_path = media_storage.create_temp_path(".png")
+    frame.convert("RGB").save(output_path, "PNG")
+    return output_path
+
+
 def _resolve_youtube_render_dimensions(payload: dict[str, Any]) -> tuple[int, int]:
     target_w = int(payload["target_w"])
     target_h = int(payload["target_h"])
@@ -3025,7 +3798,20 @@ def _build_render_filter(payload: dict[str, Any]) -> str:
 
     composite_label = "composite"
     visualizer = payload.get("visualizer") if isinstance(payload.get("visualizer"), dict) else {}
-    if visualizer.get("enabled") and payload.get("audio_input_index") is not None:
+    if visualizer.get("enabled") and payload.get("visualizer_mask_input_index") is not None:
+        # NumPy engine: a low-res gray mask (value = opacity) on stdin, coloured, scaled up and overlaid.
+        mask_input_index = int(payload["visualizer_mask_input_index"])
+        mask_w = int(payload["visualizer_mask_w"])
+        mask_h = int(payload["visualizer_mask_h"])
+        color = _safe_visualizer_hex_color(visualizer.get("spectrum_color"))
+        filter_chain += (
+            f";color=c=0x{color}:s={mask_w}x{mask_h}:r={render_fps}[vizcolor]"
+            f";[{mask_input_index}:v]format=gray[vizmask]"
+            f";[vizcolor][vizmask]alphamerge,scale={target_w}:{target_h}:flags=bilinear[viz]"
+            f";[composite][viz]overlay=0:0:format=auto:shortest=1[composite_viz]"
+        )
+        composite_label = "composite_viz"
+    elif visualizer.get("enabled") and payload.get("audio_input_index") is not None:
         audio_input_index = int(payload["audio_input_index"])
         visualizer_mode = str(visualizer.get("mode") or "circle")
         wave_mode = "p2p" if visualizer_mode == "monstercat" else "cline"
@@ -3085,6 +3871,41 @@ def _probe_audio_duration_seconds(audio_path: Path) -> float:
     return duration_seconds
 
 
+async def _upload_content_sha256(upload_doc: dict, path: Path) -> str:
+    recorded = str(upload_doc.get("sha256") or "").strip()
+    if recorded:
+        return recorded
+    return await asyncio.to_thread(_file_sha256_hex, path)
+
+
+async def _youtube_render_cache_key(
+    *,
+    audio_upload: dict,
+    audio_path: Path,
+    image_upload: dict,
+    image_path: Path,
+    payload: dict[str, Any],
+    audio_mode: str,
+    normalized_visual: bool,
+) -> str:
+    return RenderOutputCache.build_key(
+        {
+            "version": RENDER_CACHE_VERSION,
+            "audio_sha256": await _upload_content_sha256(audio_upload, audio_path),
+            "visual_sha256": await _upload_content_sha256(image_upload, image_path),
+            "render": {key: payload.get(key) for key in YOUTUBE_RENDER_PAYLOAD_KEYS},
+            # Prepared media (audio_prepare / visual_normalize) changes the encoded output.
+            "media": {"audio_mode": audio_mode, "normalized_visual_clip": normalized_visual},
+            "encoder": {
+                "preset": YOUTUBE_RENDER_PRESET,
+                "crf": YOUTUBE_RENDER_CRF,
+                "max_height": YOUTUBE_RENDER_MAX_HEIGHT,
+                "visualizer_engine": YOUTUBE_VISUALIZER_ENGINE,
+            },
+        }
+    )
+
+
 async def _render_youtube_video(
     *,
     audio_upload: dict,
@@ -3095,9 +3916,14 @@ async def _render_youtube_video(
     ffmpeg_bin = _resolve_ffmpeg_binary()
     output_path = media_storage.create_temp_path(".mp4")
     blurred_bg_path: Path | None = None
+    still_frame_path: Path | None = None
+    still_loop_segment_path: Path | None = None
+    parallel_segment_paths: list[Path] = []
+    parallel_concat_list_path: Path | None = None
 
     encode_progress_cb: Callable[[float], None] | None = None
     gif_progress_cb: Callable[[float], None] | None = None
+    cancel_event = background_job_service.cancel_event_for(job_id) if job_id else None
     if job_id:
         loop = asyncio.get_running_loop()
         encode_progress_cb = _make_job_encode_progress_callback(
@@ -3124,9 +3950,53 @@ async def _render_youtube_video(
                 user_render_fps = _resolve_payload_render_fps(payload)
                 is_gif_visual = _is_gif_visual_upload(image_upload, image_path)
                 visual_kind = _visual_kind_from_upload(image_upload, image_path)
+                normalized_clip: tuple[Path, int] | None = None
+                if not is_gif_visual and visual_kind == "video" and hasattr(media_storage, "root_dir"):
+                    # Until the visual_normalize clip exists the render loops the original.
+                    normalized_clip = await _get_or_create_gif_mp4_cache(
+                        image_upload,
+                        image_path,
+                        user_render_fps=user_render_fps,
+                        is_gif=False,
+                        cached_only=True,
+                    )
+                render_audio_path, audio_mode = _render_audio_source(audio_upload, audio_path)
+
+                render_cache_key: str | None = None
+                if render_output_cache.enabled:
+                    render_cache_key = await _youtube_render_cache_key(
+                        audio_upload=audio_upload,
+                        audio_path=audio_path,
+                        image_upload=image_upload,
+                        image_path=image_path,
+                        payload=payload,
+                        audio_mode=audio_mode,
+                        normalized_visual=is_gif_visual or normalized_clip is not None,
+                    )
+                    cached_media_debug = await asyncio.to_thread(render_output_cache.get, render_cache_key, output_path)
+                    if cached_media_debug is not None:
+                        payload["_media_debug"] = {
+                            **cached_media_debug,
+                            "generated_video_path": str(output_path),
+                            "render_cache_hit": True,
+                        }
+                        logging.info(
+                            "Render cache hit for youtube_upload job=%s audio=%s image=%s key=%s",
+                            job_id,
+                            audio_upload.get("id"),
+                            image_upload.get("id"),
+                            render_cache_key[:16],
+                        )
+                        return output_path
+
                 visual_source_path = image_path
                 loop_video = visual_kind == "video"
                 gif_mux_fps: int | None = None
+                normalized_visual = is_gif_visual
+                duration_features: dict[str, Any] = {
+                    "fps": user_render_fps,
+                    "visual": "gif" if is_gif_visual else visual_kind,
+                }
                 if is_gif_visual:
                     if job_id:
                         await _update_upload_job(
@@ -3135,6 +4005,7 @@ async def _render_youtube_video(
                             message="Converting GIF animation...",
                             extra_updates={
                                 "stage": "gif_transcode",
+                                "duration_features": duration_features,
                                 "last_heartbeat_at": _safe_iso_now(),
                             },
                         )
@@ -3143,6 +4014,7 @@ async def _render_youtube_video(
                         image_path,
                         user_render_fps=user_render_fps,
                         on_gif_encode_progress=gif_progress_cb,
+                        cancel_event=cancel_event,
                     )
                     if job_id:
                         await _update_upload_job(
@@ -3156,8 +4028,13 @@ async def _render_youtube_video(
                         )
                     visual_kind = "video"
                     loop_video = True
+                elif normalized_clip is not None:
+                    visual_source_path, gif_mux_fps = normalized_clip
+                    normalized_visual = True
 
-                audio_duration_seconds = await asyncio.to_thread(_probe_audio_duration_seconds, audio_path)
+                audio_duration_seconds = _recorded_audio_duration_seconds(audio_upload)
+                if audio_duration_seconds is None:
+                    audio_duration_seconds = await asyncio.to_thread(_probe_audio_duration_seconds, audio_path)
                 if audio_duration_seconds > YOUTUBE_MAX_AUDIO_DURATION_SECONDS:
                     max_minutes = round(YOUTUBE_MAX_AUDIO_DURATION_SECONDS / 60, 1)
                     raise HTTPException(
@@ -3165,10 +4042,14 @@ async def _render_youtube_video(
                         detail=f"Audio is too long to render. Max supported duration is {max_minutes} minutes.",
                     )
 
-                source_image_w, source_image_h = await asyncio.to_thread(
-                    _probe_image_dimensions,
-                    visual_source_path if is_gif_visual else image_path,
-                )
+                recorded_dimensions = _recorded_image_dimensions(image_upload) if visual_kind == "image" else None
+                if recorded_dimensions:
+                    source_image_w, source_image_h = recorded_dimensions
+                else:
+                    source_image_w, source_image_h = await asyncio.to_thread(
+                        _probe_image_dimensions,
+                        visual_source_path,
+                    )
                 target_w, target_h = _resolve_youtube_render_dimensions(payload)
                 aspect_matches_frame = bool(
                     source_image_w
@@ -3204,7 +4085,7 @@ async def _render_youtube_video(
                     render_payload,
                     user_render_fps=user_render_fps,
                     static_still=static_still,
-                    is_gif_visual=is_gif_visual and not visualizer_enabled,
+                    is_gif_visual=normalized_visual and not visualizer_enabled,
                     gif_mux_fps=gif_mux_fps if not visualizer_enabled else None,
                 )
                 mux_fps = _resolve_ffmpeg_mux_fps(render_payload)
@@ -3213,9 +4094,45 @@ async def _render_youtube_video(
                     audio_duration_seconds,
                     mux_fps,
                 )
+                if static_still:
+                    try:
+                        still_frame_path = await asyncio.to_thread(
+                            _compose_still_frame,
+                            image_path,
+                            payload=render_payload,
+                            background_path=blurred_bg_path,
+                        )
+                    except Exception as exc:
+                        logging.warning("Still frame composition failed for job=%s: %s; using FFmpeg filters", job_id, exc)
+                visualizer_renderer: VisualizerFrameRenderer | None = None
+                if visualizer_enabled and YOUTUBE_VISUALIZER_ENGINE == "numpy":
+                    try:
+                        visualizer_samples = await asyncio.to_thread(decode_audio_samples, ffmpeg_bin, audio_path)
+                        visualizer_renderer = VisualizerFrameRenderer(
+                            visualizer_samples,
+                            fps=mux_fps,
+                            width=max(2, target_w // YOUTUBE_VISUALIZER_LAYER_SCALE),
+                            height=max(2, target_h // YOUTUBE_VISUALIZER_LAYER_SCALE),
+                            mode=str(visualizer_payload.get("mode") or "circle"),
+                            intensity=float(visualizer_payload.get("intensity") or 1.0),
+                            opacity=float(visualizer_payload.get("opacity") or 0.68),
+                        )
+                    except Exception as exc:
+                        logging.warning("Visualizer engine unavailable for job=%s: %s; using showwaves", job_id, exc)
 
+                copy_audio = audio_mode != "encode"
                 command = [ffmpeg_bin, "-nostdin", "-y", "-loglevel", "error"]
-                if blurred_bg_path:
+                visual_inputs_start = len(command)
+                if still_frame_path:
+                    _append_ffmpeg_visual_input(
+                        command,
+                        visual_path=still_frame_path,
+                        visual_kind="image",
+                        render_fps=render_fps_value,
+                        loop_video=False,
+                    )
+                    audio_input_index = 1
+                elif blurred_bg_path:
                     command.extend(["-f", "image2", "-loop", "1", "-framerate", render_fps_value, "-i", str(blurred_bg_path)])
                     _append_ffmpeg_visual_input(
                         command,
@@ -3234,14 +4151,48 @@ async def _render_youtube_video(
                         loop_video=loop_video,
                     )
                     audio_input_index = 1
+                if visualizer_renderer is not None:
+                    command.extend(
+                        [
+                            "-f",
+                            "rawvideo",
+                            "-pix_fmt",
+                            "gray",
+                            "-s",
+                            f"{visualizer_renderer.width}x{visualizer_renderer.height}",
+                            "-framerate",
+                            render_fps_value,
+                            "-i",
+                            "pipe:0",
+                        ]
+                    )
+                    render_payload["visualizer_mask_input_index"] = audio_input_index
+                    render_payload["visualizer_mask_w"] = visualizer_renderer.width
+                    render_payload["visualizer_mask_h"] = visualizer_renderer.height
+                    audio_input_index += 1
 
                 render_payload["audio_input_index"] = audio_input_index
-                filter_complex = _build_render_filter(render_payload)
+                filter_complex = "[0:v]null[vout]" if still_frame_path else _build_render_filter(render_payload)
+                visual_input_args = command[visual_inputs_start:]
+                use_still_loop = bool(
+                    static_still
+                    and YOUTUBE_STILL_LOOP_SEGMENT_SECONDS > 0
+                    and audio_duration_seconds > YOUTUBE_STILL_LOOP_SEGMENT_SECONDS * 2
+                )
+                # Only still artwork: a looping GIF/video would restart at each segment boundary.
+                use_parallel_segments = bool(
+                    visualizer_enabled
+                    and visual_kind == "image"
+                    and not is_gif_visual
+                    and mux_fps >= 30
+                    and YOUTUBE_PARALLEL_RENDER_SEGMENTS > 1
+                    and audio_duration_seconds >= YOUTUBE_PARALLEL_RENDER_MIN_SECONDS
+                )
 
                 command.extend(
                     [
                         "-i",
-                        str(audio_path),
+                        str(render_audio_path),
                         "-filter_complex",
                         filter_complex,
                         "-map",
@@ -3256,10 +4207,7 @@ async def _render_youtube_video(
                         YOUTUBE_RENDER_CRF,
                         "-pix_fmt",
                         "yuv420p",
-                        "-c:a",
-                        "aac",
-                        "-b:a",
-                        "192k",
+                        *_youtube_audio_codec_args(copy_audio=copy_audio),
                         "-threads",
                         "0",
                         "-r",
@@ -3274,6 +4222,103 @@ async def _render_youtube_video(
                 if visual_kind != "video":
                     command.extend(["-tune", "stillimage"])
                 command.append(str(output_path))
+                if use_still_loop:
+                    still_loop_segment_path = media_storage.create_temp_path(".mp4")
+                    segment_command = [
+                        ffmpeg_bin,
+                        "-nostdin",
+                        "-y",
+                        "-loglevel",
+                        "error",
+                        *visual_input_args,
+                        "-filter_complex",
+                        filter_complex,
+                        *_still_loop_segment_encode_args(mux_fps=mux_fps, segment_path=still_loop_segment_path),
+                    ]
+                    mux_command = _still_loop_mux_command(
+                        ffmpeg_bin,
+                        segment_path=still_loop_segment_path,
+                        audio_path=render_audio_path,
+                        output_path=output_path,
+                        duration_seconds=audio_duration_seconds,
+                        copy_audio=copy_audio,
+                    )
+                parallel_segments = (
+                    _parallel_render_segments(audio_duration_seconds, mux_fps, YOUTUBE_PARALLEL_RENDER_SEGMENTS)
+                    if use_parallel_segments
+                    else []
+                )
+                if parallel_segments:
+                    threads_per_segment = str(max(1, (os.cpu_count() or 1) // len(parallel_segments)))
+                    parallel_segment_paths = [media_storage.create_temp_path(".mp4") for _ in parallel_segments]
+                    parallel_segment_commands = []
+                    for (segment_start, segment_frames), segment_path in zip(parallel_segments, parallel_segment_paths):
+                        parallel_segment_commands.append(
+                            [
+                                ffmpeg_bin,
+                                "-nostdin",
+                                "-y",
+                                "-loglevel",
+                                "error",
+                                *visual_input_args,
+                                # Audio drives showwaves, so each segment reads its own slice (plus a frame of slack).
+                                "-ss",
+                                f"{segment_start:.3f}",
+                                "-t",
+                                f"{segment_frames / float(mux_fps) + 1.0 / mux_fps:.3f}",
+                                "-i",
+                                str(audio_path),
+                                "-filter_complex",
+                                filter_complex,
+                                "-map",
+                                "[vout]",
+                                "-an",
+                                "-c:v",
+                                "libx264",
+                                "-preset",
+                                YOUTUBE_RENDER_PRESET,
+                                "-crf",
+                                YOUTUBE_RENDER_CRF,
+                                "-pix_fmt",
+                                "yuv420p",
+                                "-threads",
+                                threads_per_segment,
+                                "-r",
+                                render_fps_value,
+                                "-frames:v",
+                                str(segment_frames),
+                                str(segment_path),
+                            ]
+                        )
+                    parallel_concat_list_path = media_storage.create_temp_path(".txt")
+                    parallel_concat_command = [
+                        ffmpeg_bin,
+                        "-nostdin",
+                        "-y",
+                        "-loglevel",
+                        "error",
+                        "-f",
+                        "concat",
+                        "-safe",
+                        "0",
+                        "-i",
+                        str(parallel_concat_list_path),
+                        "-i",
+                        str(render_audio_path),
+                        "-map",
+                        "0:v",
+                        "-map",
+                        "1:a",
+                        "-c:v",
+                        "copy",
+                        *_youtube_audio_codec_args(copy_audio=copy_audio),
+                        "-movflags",
+                        "+faststart",
+                        "-t",
+                        f"{audio_duration_seconds:.3f}",
+                        "-shortest",
+                        str(output_path),
+                    ]
 
                 if job_id:
                     encode_message = "Encoding video... 0%"
@@ -3289,6 +4334,10 @@ async def _render_youtube_video(
                         extra_updates={
                             "encode_progress": 0,
                             "render_timeout_seconds": render_timeout_seconds,
+                            "duration_features": {
+                                **duration_features,
+                                "audio": audio_duration_bucket(audio_duration_seconds),
+                            },
                             "encode_mux_fps": mux_fps,
                             "user_render_fps": user_render_fps,
                             "static_encode_capped": static_encode_capped,
@@ -3298,13 +4347,15 @@ async def _render_youtube_video(
 
                 logging.info(
                     "Starting FFmpeg render for youtube_upload audio=%s image=%s visual_kind=%s is_gif=%s "
-                    "static_capped=%s user_fps=%s mux_fps=%s audio_duration=%.2fs output=%sx%s "
+                    "static_capped=%s still_loop=%s parallel_segments=%s user_fps=%s mux_fps=%s audio_duration=%.2fs output=%sx%s "
                     "timeout=%ss preset=%s output=%s",
                     audio_upload.get("id"),
                     image_upload.get("id"),
                     visual_kind,
                     is_gif_visual,
                     static_encode_capped,
+                    use_still_loop,
+                    len(parallel_segments),
                     user_render_fps,
                     mux_fps,
                     audio_duration_seconds,
@@ -3329,13 +4380,70 @@ async def _render_youtube_video(
                 )
                 render_started_at = time.perf_counter()
                 try:
-                    completed = await asyncio.to_thread(
-                        _run_ffmpeg_command_with_progress,
-                        command,
-                        duration_seconds=audio_duration_seconds,
-                        on_progress=encode_progress_cb,
-                        timeout=render_timeout_seconds,
-                    )
+                    if use_still_loop:
+                        completed = await asyncio.to_thread(
+                            _run_still_loop_render,
+                            segment_command=segment_command,
+                            mux_command=mux_command,
+                            duration_seconds=audio_duration_seconds,
+                            on_progress=encode_progress_cb,
+                            timeout=render_timeout_seconds,
+                            cancel_event=cancel_event,
+                        )
+                        if completed.returncode != 0:
+                            # Some FFmpeg builds mishandle looped stream copy; the full encode always works.
+                            logging.warning(
+                                "Still-loop render failed for job=%s returncode=%s stderr=%s; encoding every frame instead",
+                                job_id,
+                                completed.returncode,
+                                ((completed.stderr or completed.stdout or "").strip())[:400],
+                            )
+                            use_still_loop = False
+                    if parallel_segments:
+                        completed = await asyncio.to_thread(
+                            _run_segmented_render,
+                            segment_commands=parallel_segment_commands,
+                            segment_paths=parallel_segment_paths,
+                            concat_command=parallel_concat_command,
+                            concat_list_path=parallel_concat_list_path,
+                            segment_stdin_chunks=(
+                                [
+                                    visualizer_renderer.iter_frames(int(round(segment_start * mux_fps)), segment_frames)
+                                    for segment_start, segment_frames in parallel_segments
+                                ]
+                                if visualizer_renderer is not None
+                                else None
+                            ),
+                            duration_seconds=audio_duration_seconds,
+                            on_progress=encode_progress_cb,
+                            timeout=render_timeout_seconds,
+                            cancel_event=cancel_event,
+                        )
+                        if completed.returncode != 0:
+                            logging.warning(
+                                "Parallel segmented render failed for job=%s returncode=%s stderr=%s; using one FFmpeg process",
+                                job_id,
+                                completed.returncode,
+                                ((completed.stderr or completed.stdout or "").strip())[:400],
+                            )
+                            parallel_segments = []
+                    if not use_still_loop and not parallel_segments:
+                        completed = await asyncio.to_thread(
+                            _run_ffmpeg_command_with_progress,
+                            command,
+                            duration_seconds=audio_duration_seconds,
+                            on_progress=encode_progress_cb,
+                            timeout=render_timeout_seconds,
+                            cancel_event=cancel_event,
+                            stdin_chunks=visualizer_renderer.iter_frames() if visualizer_renderer is not None else None,
+                        )
+                except JobCancelledError:
+                    try:
+                        output_path.unlink(missing_ok=True)
+                    except Exception:
+                        pass
+                    logging.info("FFmpeg render cancelled for job=%s; partial output removed", job_id)
+                    raise
                 except subprocess.TimeoutExpired as exc:
                     try:
                         output_path.unlink(missing_ok=True)
@@ -3401,6 +4509,7 @@ async def _render_youtube_video(
                     "mux_fps": mux_fps,
                     "video_codec": "libx264",
                     "audio_codec": "aac",
+                    "audio_mode": audio_mode,
                     "preset": YOUTUBE_RENDER_PRESET,
                     "crf": YOUTUBE_RENDER_CRF,
                     "render_duration_seconds": round(render_duration_seconds, 3),
@@ -3412,15 +4521,25 @@ async def _render_youtube_video(
                         else "flat_background_contain"
                     ),
                     "preblurred_background": bool(blurred_bg_path),
+                    "precomposed_still_frame": bool(still_frame_path),
+                    "visualizer_engine": (
+                        ("numpy" if visualizer_renderer is not None else "ffmpeg") if visualizer_enabled else None
+                    ),
                     "visual_kind": visual_kind,
                     "is_gif_visual": is_gif_visual,
                     "gif_cached_mp4": is_gif_visual,
+                    "normalized_visual_clip": normalized_visual,
                     "visual_source_path": str(visual_source_path),
                     "user_render_fps": user_render_fps,
                     "encode_mux_fps": mux_fps,
                     "static_encode_capped": static_encode_capped,
+                    "render_mode": (
+                        "still_loop" if use_still_loop else "parallel_segments" if parallel_segments else "full_encode"
+                    ),
+                    **({"still_loop_segment_seconds": YOUTUBE_STILL_LOOP_SEGMENT_SECONDS} if use_still_loop else {}),
+                    **({"parallel_segments": len(parallel_segments)} if parallel_segments else {}),
                     "render_timeout_seconds": render_timeout_seconds,
-                    **({"gif_mux_fps": gif_mux_fps} if is_gif_visual and gif_mux_fps is not None else {}),
+                    **({"gif_mux_fps": gif_mux_fps} if normalized_visual and gif_mux_fps is not None else {}),
                 }
                 payload["_media_debug"] = media_debug
                 logging.info(
@@ -3432,11 +4551,24 @@ async def _render_youtube_video(
                     render_duration_seconds,
                     media_debug["layout_mode"],
                 )
+                if render_cache_key:
+                    try:
+                        await asyncio.to_thread(render_output_cache.put, render_cache_key, output_path, media_debug)
+                    except OSError as exc:
+                        logging.warning("Could not cache render for job=%s: %s", job_id, exc)
                 return output_path
     finally:
         try:
             if blurred_bg_path:
                 blurred_bg_path.unlink(missing_ok=True)
+            if still_frame_path:
+                still_frame_path.unlink(missing_ok=True)
+            if still_loop_segment_path:
+                still_loop_segment_path.unlink(missing_ok=True)
+            for segment_path in parallel_segment_paths:
+                segment_path.unlink(missing_ok=True)
+            if parallel_concat_list_path:
+                parallel_concat_list_path.unlink(missing_ok=True)
         except Exception:
             pass
 
@@ -3570,15 +4702,46 @@ async def _build_youtube_upload_job_payload(
     }
 
 
-async def _create_youtube_upload_job(*, current_user: dict, payload: dict[str, Any]) -> dict:
+async def _create_youtube_upload_job(
+    *,
+    current_user: dict,
+    payload: dict[str, Any],
+    run_at: str | None = None,
+) -> dict:
     return await _create_background_job(
         current_user=current_user,
         job_type="youtube_upload",
         payload=payload,
-        message="Queued YouTube upload job.",
+        message=f"Scheduled YouTube upload for {run_at}." if run_at else "Queued YouTube upload job.",
+        run_at=run_at,
     )
 
 
+async def _resolve_upload_run_at(user_id: str, raw_run_at: Any) -> str | None:
+    safe_raw = raw_run_at.strip() if isinstance(raw_run_at, str) else ""
+    if not safe_raw:
+        return None
+    now = datetime.now(timezone.utc)
+    if safe_raw.lower() == "best_hour":
+        best_hour = await _estimate_best_upload_hour_utc(user_id)
+        run_at = now.replace(hour=best_hour, minute=0, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+    else:
+        try:
+            run_at = _parse_utc_timestamp(safe_raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='run_at must be an ISO-8601 timestamp or "best_hour".')
+    if run_at <= now:
+        return None
+    if run_at > now + timedelta(days=YOUTUBE_SCHEDULE_MAX_AHEAD_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Uploads can be scheduled at most {YOUTUBE_SCHEDULE_MAX_AHEAD_DAYS} days ahead.",
+        )
+    return run_at.isoformat()
+
+
 async def _find_active_youtube_upload_job(*, current_user: dict) -> Optional[dict]:
     try:
         return await db.upload_jobs.find_one(
@@ -3586,6 +4749,7 @@ async def _find_active_youtube_upload_job(*, current_user: dict) -> Optional[dic
                 "user_id": current_user["id"],
                 "type": "youtube_upload",
                 "status": {"$in": ["queued", "processing"]},
+                "$or": [{"run_at": {"$lte": _safe_iso_now()}}, {"run_at": {"$exists": False}}],
             },
             {"_id": 0},
             sort=[("created_at", -1)],
@@ -3606,8 +4770,133 @@ def _format_job_error_message(exc: BaseException) -> str:
     return str(exc) or exc.__class__.__name__
 
 
-async def _youtube_resumable_upload(request, *, on_chunk_status=None) -> dict:
+def _youtube_upload_chunk_size() -> int:
+    if YOUTUBE_UPLOAD_CHUNK_SIZE_BYTES <= 0:
+        return -1
+    quantum = 256 * 1024
+    return max(quantum, (YOUTUBE_UPLOAD_CHUNK_SIZE_BYTES // quantum) * quantum)
+
+
+def _job_render_storage_key(job_id: str) -> str:
+    return f"{job_id}.render.mp4"
+
+
+def _render_checkpoint_fingerprint(path: Path) -> dict[str, int]:
+    # The job-keyed file is only put in place by rename, so size and mtime identify it.
+    stat = path.stat()
+    return {"size_bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+async def _save_render_checkpoint(job_id: str, rendered_path: Path, media_debug: dict) -> Path:
+    if not hasattr(media_storage, "root_dir"):
+        return rendered_path
+    checkpoint_path = media_storage.root_dir / _job_render_storage_key(job_id)
+    try:
+        await asyncio.to_thread(shutil.move, str(rendered_path), str(checkpoint_path))
+    except Exception as exc:
+        logging.warning("Render checkpoint skipped for job=%s: %s", job_id, exc)
+        return rendered_path
+    try:
+        await db.upload_jobs.update_one(
+            {"id": job_id},
+            {"$set": {
+                "upload_checkpoint": {
+                    "storage_key": _job_render_storage_key(job_id),
+                    **_render_checkpoint_fingerprint(checkpoint_path),
+                    "rendered_at": _safe_iso_now(),
+                    "media_debug": media_debug,
+                    "session_uri": None,
+                    "bytes_uploaded": 0,
+                },
+            }},
+        )
+    except Exception as exc:
+        logging.warning("Render checkpoint not recorded for job=%s: %s", job_id, exc)
+    return checkpoint_path
+
+
+async def _load_render_checkpoint(job_id: str, checkpoint: Any) -> Path | None:
+    if not isinstance(checkpoint, dict) or not hasattr(media_storage, "root_dir"):
+        return None
+    storage_key = str(checkpoint.get("storage_key") or "").strip()
+    if not storage_key:
+        return None
+    path = media_storage.root_dir / storage_key
+    if not path.exists() or path.stat().st_size != int(checkpoint.get("size_bytes") or -1):
+        logging.warning("Render checkpoint for job=%s is missing or truncated; re-rendering", job_id)
+        return None
+    if "mtime_ns" in checkpoint:
+        if _render_checkpoint_fingerprint(path)["mtime_ns"] != int(checkpoint.get("mtime_ns") or -1):
+            logging.warning("Render checkpoint for job=%s was replaced; re-rendering", job_id)
+            return None
+    elif await asyncio.to_thread(_file_sha256_hex, path) != checkpoint.get("sha256"):
+        # Checkpoints recorded before fingerprints carry a SHA-256 instead.
+        logging.warning("Render checkpoint for job=%s failed its hash check; re-rendering", job_id)
+        return None
+    return path
+
+
+async def _record_upload_session_checkpoint(job_id: str, session_uri: str, bytes_uploaded: int) -> None:
+    await db.upload_jobs.update_one(
+        {"id": job_id, "upload_checkpoint": {"$type": "object"}},
+        {"$set": {
+            "upload_checkpoint.session_uri": session_uri,
+            "upload_checkpoint.bytes_uploaded": int(bytes_uploaded),
+        }},
+    )
+
+
+def _delete_render_checkpoint_file(job_id: str) -> None:
+    if hasattr(media_storage, "root_dir"):
+        (media_storage.root_dir / _job_render_storage_key(job_id)).unlink(missing_ok=True)
+
+
+async def _discard_render_checkpoint(job_id: str) -> None:
+    try:
+        _delete_render_checkpoint_file(job_id)
+        await db.upload_jobs.update_one(
+            {"id": job_id, "upload_checkpoint": {"$exists": True}},
+            {"$unset": {"upload_checkpoint": ""}},
+        )
+    except Exception as exc:
+        logging.warning("Failed to discard render checkpoint for job=%s: %s", job_id, exc)
+
+
+def _query_youtube_upload_session(request, session_uri: str) -> tuple[str, Any]:
+    headers = {"Content-Range": f"bytes */{request.resumable.size()}", "Content-Length": "0"}
+    resp, content = request.http.request(session_uri, method="PUT", body=b"", headers=headers)
+    status = int(getattr(resp, "status", 0) or 0)
+    if status == 308:
+        committed_range = str(resp.get("range") or "")
+        return "resume", int(committed_range.rsplit("-", 1)[1]) + 1 if committed_range else 0
+    if status in (200, 201):
+        return "complete", json.loads(content or b"{}")
+    if status in (404, 410):
+        return "expired", None
+    raise HttpError(resp, content, uri=session_uri)
+
+
+async def _youtube_resumable_upload(
+    request,
+    *,
+    resume_session_uri: str | None = None,
+    on_chunk_status=None,
+    on_session_progress=None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
     """Run YouTube resumable upload with per-chunk and overall timeouts."""
+    if resume_session_uri:
+        outcome, value = await asyncio.wait_for(
+            asyncio.to_thread(_query_youtube_upload_session, request, resume_session_uri),
+            timeout=YOUTUBE_CHUNK_TIMEOUT_SECONDS,
+        )
+        if outcome == "complete":
+            return value
+        if outcome == "resume":
+            request.resumable_uri = resume_session_uri
+            request.resumable_progress = value
+        else:
+            logging.warning("YouTube upload session expired; starting a new session")
     response = None
     upload_started_at = time.perf_counter()
     while response is None:
@@ -3615,10 +4904,16 @@ async def _youtube_resumable_upload(request, *, on_chunk_status=None) -> dict:
             raise TimeoutError(
                 f"YouTube upload exceeded {JOB_YOUTUBE_STAGE_TIMEOUT_SECONDS} seconds."
             )
+        if cancel_event is not None and cancel_event.is_set():
+            # Cancelled or handed off: leave the session to whoever resumes it from the checkpoint.
+            raise JobCancelledError("Job was cancelled during stage 'youtube_upload'.")
         status, response = await asyncio.wait_for(
             asyncio.to_thread(request.next_chunk),
             timeout=YOUTUBE_CHUNK_TIMEOUT_SECONDS,
         )
+        session_uri = getattr(request, "resumable_uri", None)
+        if response is None and on_session_progress is not None and isinstance(session_uri, str):
+            await on_session_progress(session_uri, int(getattr(request, "resumable_progress", 0) or 0))
         if status is not None and on_chunk_status is not None:
             await on_chunk_status(status)
     return response
@@ -3669,47 +4964,73 @@ async def _execute_youtube_upload_job(job: dict) -> dict:
 
     await _assert_job_not_cancel_requested(job_id, stage="oauth_refresh")
     await ensure_has_upload_credit(user_id)
-    await _update_upload_job(
-        job_id,
-        progress=JOB_PROGRESS_ENCODE_MIN,
-        message="Preparing video encode...",
-        extra_updates={
-            "stage": "ffmpeg_render",
-            "encode_progress": 0,
-            "last_heartbeat_at": _safe_iso_now(),
-        },
-    )
-    _agent_debug_log(
-        "H1",
-        "server.py:_execute_youtube_upload_job",
-        "entered ffmpeg_render stage",
-        {"job_id": job_id, "progress": JOB_PROGRESS_ENCODE_MIN, "render_fps": payload.get("render_fps")},
-    )
-    heartbeat_task = asyncio.create_task(_job_heartbeat_loop(job_id))
-    try:
-        rendered_video_path = await _render_youtube_video(
-            audio_upload=audio_upload,
-            image_upload=image_upload,
-            payload=payload,
-            job_id=job_id,
+    checkpoint = job.get("upload_checkpoint") if isinstance(job.get("upload_checkpoint"), dict) else None
+    rendered_video_path = await _load_render_checkpoint(job_id, checkpoint)
+    if rendered_video_path is not None:
+        media_debug = dict(checkpoint.get("media_debug") or {})
+        logging.info(
+            "Resuming job=%s from render checkpoint; skipping FFmpeg (bytes_uploaded=%s)",
+            job_id,
+            checkpoint.get("bytes_uploaded"),
         )
-    finally:
-        heartbeat_task.cancel()
+        ready_message = "Video already rendered. Resuming YouTube upload..."
+    else:
+        if checkpoint:
+            await _discard_render_checkpoint(job_id)
+            checkpoint = None
+        await _update_upload_job(
+            job_id,
+            progress=JOB_PROGRESS_ENCODE_MIN,
+            message="Preparing video encode...",
+            extra_updates={
+                "stage": "ffmpeg_render",
+                "encode_progress": 0,
+                "last_heartbeat_at": _safe_iso_now(),
+            },
+        )
+        _agent_debug_log(
+            "H1",
+            "server.py:_execute_youtube_upload_job",
+            "entered ffmpeg_render stage",
+            {"job_id": job_id, "progress": JOB_PROGRESS_ENCODE_MIN, "render_fps": payload.get("render_fps")},
+        )
+        heartbeat_task = asyncio.create_task(_job_heartbeat_loop(job_id))
         try:
-            await heartbeat_task
-        except asyncio.CancelledError:
-            pass
+            rendered_video_path = await _render_youtube_video(
+                audio_upload=audio_upload,
+                image_upload=image_upload,
+                payload=payload,
+                job_id=job_id,
+            )
+        finally:
+            heartbeat_task.cancel()
+            try:
+                await heartbeat_task
+            except asyncio.CancelledError:
+                pass
 
-    media_debug = payload.get("_media_debug") if isinstance(payload.get("_media_debug"), dict) else {}
-    logging.info(
-        "FFmpeg render complete for job=%s; starting YouTube upload (media_debug=%s)",
-        job_id,
-        json.dumps(media_debug, default=str, ensure_ascii=True) if media_debug else "{}",
-    )
+        media_debug = payload.get("_media_debug") if isinstance(payload.get("_media_debug"), dict) else {}
+        logging.info(
+            "FFmpeg render complete for job=%s; starting YouTube upload (media_debug=%s)",
+            job_id,
+            json.dumps(media_debug, default=str, ensure_ascii=True) if media_debug else "{}",
+        )
+        rendered_video_path = await _save_render_checkpoint(job_id, rendered_video_path, media_debug)
+        ready_message = "Video rendered. Starting YouTube upload..."
+    run_at = str(job.get("run_at") or "").strip()
+    if run_at and run_at > _safe_iso_now():
+        # Rendered ahead of schedule in idle capacity; the upload is released at run_at.
+        if rendered_video_path.name != _job_render_storage_key(job_id):
+            rendered_video_path.unlink(missing_ok=True)
+        await background_job_service.defer_until_run_at(
+            job_id,
+            message=f"Video rendered. YouTube upload scheduled for {run_at}.",
+        )
+        raise JobDeferredError(f"YouTube upload deferred until {run_at}.")
     await _update_upload_job(
         job_id,
         progress=65,
-        message="Video rendered. Starting YouTube upload...",
+        message=ready_message,
         extra_updates={
             "encode_progress": 100,
             "last_heartbeat_at": _safe_iso_now(),
@@ -3738,12 +5059,18 @@ async def _execute_youtube_upload_job(job: dict) -> dict:
                 "privacyStatus": str(payload.get("privacy_status") or "public"),
             },
         }
-        media_upload = MediaFileUpload(str(rendered_video_path), chunksize=-1, resumable=True, mimetype="video/mp4")
+        media_upload = MediaFileUpload(
+            str(rendered_video_path),
+            chunksize=_youtube_upload_chunk_size(),
+            resumable=True,
+            mimetype="video/mp4",
+        )
         request = youtube.videos().insert(
             part="snippet,status",
             body=upload_body,
             media_body=media_upload,
         )
+        resume_session_uri = str((checkpoint or {}).get("session_uri") or "").strip() or None
 
         upload_started_at = time.perf_counter()
         upload_heartbeat_task = asyncio.create_task(_job_heartbeat_loop(job_id))
@@ -3757,10 +5084,25 @@ async def _execute_youtube_upload_job(job: dict) -> dict:
                 extra_updates={"last_heartbeat_at": _safe_iso_now()},
             )
 
+        last_session_checkpoint = {"session_uri": resume_session_uri, "at": time.monotonic()}
+
+        async def _checkpoint_youtube_session(session_uri: str, bytes_uploaded: int) -> None:
+            now = time.monotonic()
+            if (
+                session_uri == last_session_checkpoint["session_uri"]
+                and now - last_session_checkpoint["at"] < YOUTUBE_UPLOAD_CHECKPOINT_INTERVAL_SECONDS
+            ):
+                return
+            await _record_upload_session_checkpoint(job_id, session_uri, bytes_uploaded)
+            last_session_checkpoint.update(session_uri=session_uri, at=now)
+
         try:
             response = await _youtube_resumable_upload(
                 request,
+                resume_session_uri=resume_session_uri,
                 on_chunk_status=_report_youtube_chunk_progress,
+                on_session_progress=_checkpoint_youtube_session,
+                cancel_event=background_job_service.cancel_event_for(job_id),
             )
         finally:
             upload_heartbeat_task.cancel()
@@ -3806,10 +5148,11 @@ async def _execute_youtube_upload_job(job: dict) -> dict:
             "media_debug": media_debug,
         }
     finally:
-        try:
-            rendered_video_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+        if rendered_video_path.name != _job_render_storage_key(job_id):
+            try:
+                rendered_video_path.unlink(missing_ok=True)
+            except Exception:
+                pass
 
 
 async def _process_youtube_upload_job(job: dict) -> None:
@@ -3832,7 +5175,19 @@ async def _process_youtube_upload_job(job: dict) -> None:
                 "failed_stage": None,
             },
         )
+    except JobDeferredError as exc:
+        logging.info("YouTube upload job %s prerendered: %s", job_id, exc)
+        return
     except JobCancelledError as exc:
+        job_doc = await _get_background_job(job_id) or {}
+        if (
+            not job_doc.get("cancel_requested")
+            and job_doc.get("status") in ACTIVE_JOB_STATUSES
+            and job_doc.get("worker_id") != UPLOAD_JOB_WORKER_ID
+        ):
+            # The lease was reclaimed for another worker; stop here without touching its state.
+            logging.warning("YouTube upload job %s stopped: now owned by %s", job_id, job_doc.get("worker_id"))
+            return
         await _update_upload_job(
             job_id,
             status="cancelled",
@@ -3843,9 +5198,11 @@ async def _process_youtube_upload_job(job: dict) -> None:
                 "failed_at": _safe_iso_now(),
                 "worker_id": UPLOAD_JOB_WORKER_ID,
                 "error_code": "ADMIN_CANCELLED",
-                "failed_stage": str((await _get_background_job(job_id) or {}).get("stage") or "unknown"),
+                "failed_stage": str(job_doc.get("stage") or "unknown"),
                 "last_heartbeat_at": _safe_iso_now(),
             },
+            # Only while this worker still holds it; a requeued or reclaimed job is left alone.
+            only_if_owned=True,
         )
     except Exception as exc:
         error_message = _format_job_error_message(exc)
@@ -3879,6 +5236,7 @@ async def _process_youtube_upload_job(job: dict) -> None:
                 "last_heartbeat_at": _safe_iso_now(),
             },
         )
+    await _discard_render_checkpoint(job_id)
 
 
 async def _build_channel_analytics_job_payload(current_user: dict) -> dict[str, Any]:
@@ -4522,7 +5880,13 @@ async def _execute_thumbnail_check_job(job: dict) -> dict:
         image_bytes = media_storage.read_bytes(upload)
         ext = media_storage.get_suffix(upload)
         image_mime = ".png" == ext and "image/png" or (".webp" == ext and "image/webp" or "image/jpeg")
+    elif isinstance(payload.get("image_storage"), dict):
+        if not media_storage.exists(payload["image_storage"]):
+            raise HTTPException(status_code=404, detail="Uploaded thumbnail image is missing on server.")
+        image_bytes = media_storage.read_bytes(payload["image_storage"])
+        image_mime = str(payload.get("image_mime") or "image/jpeg")
     else:
+        # Jobs queued before images moved to media storage carry the bytes inline.
         image_b64 = str(payload.get("image_bytes_b64") or "")
         if image_b64:
             image_bytes = base64.b64decode(image_b64)
@@ -4633,11 +5997,29 @@ async def _process_thumbnail_check_job(job: dict) -> None:
     try:
         await _update_upload_job(job_id, progress=55, message="Analyzing thumbnail...")
         result = await _execute_thumbnail_check_job(job)
-        await _update_upload_job(job_id, status="succeeded", progress=100, message="Thumbnail analysis complete.", result=result, error=None, extra_updates={"completed_at": _safe_iso_now(), "worker_id": UPLOAD_JOB_WORKER_ID})
+        written = await _update_upload_job(job_id, status="succeeded", progress=100, message="Thumbnail analysis complete.", result=result, error=None, extra_updates={"completed_at": _safe_iso_now()}, only_if_owned=True)
     except Exception as exc:
         error_message = str(exc)
         logging.error(f"Thumbnail check job {job_id} failed: {error_message}")
-        await _update_upload_job(job_id, status="failed", progress=100, message="Thumbnail analysis failed.", error=error_message, extra_updates={"failed_at": _safe_iso_now(), "worker_id": UPLOAD_JOB_WORKER_ID})
+        written = await _update_upload_job(job_id, status="failed", progress=100, message="Thumbnail analysis failed.", error=error_message, extra_updates={"failed_at": _safe_iso_now()}, only_if_owned=True)
+    # A run whose lease was reclaimed leaves the image to the retry (or to archival).
+    if written:
+        _delete_job_input_files(job_id, job.get("payload"))
+
+
+def _job_input_file_id(job_id: str) -> str:
+    return f"{job_id}.input"
+
+
+def _delete_job_input_files(job_id: str, payload: dict | None) -> None:
+    """Delete the stored input a job's payload references (e.g. the thumbnail_check image)."""
+    image_storage = (payload or {}).get("image_storage")
+    if not isinstance(image_storage, dict):
+        return
+    try:
+        media_storage.delete(image_storage)
+    except Exception as exc:
+        logging.warning("Failed to delete input file of job=%s: %s", job_id, exc)
 
 
 async def _execute_tag_generation_job(job: dict) -> dict:
@@ -4698,6 +6080,105 @@ async def _process_tag_join_job(job: dict) -> None:
         await _update_upload_job(job_id, status="failed", progress=100, message="Tag join failed.", error=error_message, extra_updates={"failed_at": _safe_iso_now(), "worker_id": UPLOAD_JOB_WORKER_ID})
 
 
+async def _process_visual_normalize_job(job: dict) -> None:
+    job_id = job["id"]
+    upload_id = str((job.get("payload") or {}).get("upload_id") or "").strip()
+    heartbeat_task = asyncio.create_task(_job_heartbeat_loop(job_id))
+    try:
+        image_upload = await db.uploads.find_one({"id": upload_id, "user_id": job.get("user_id")}, {"_id": 0})
+        if not image_upload:
+            raise HTTPException(status_code=404, detail="Visual upload not found.")
+        await _update_upload_job(
+            job_id,
+            progress=10,
+            message="Preparing animated visual...",
+            extra_updates={"stage": "visual_normalize", "last_heartbeat_at": _safe_iso_now()},
+        )
+        async with media_storage.local_path_for_processing(image_upload) as image_path:
+            clip_path, clip_fps = await _get_or_create_gif_mp4_cache(
+                image_upload,
+                image_path,
+                user_render_fps=VISUAL_NORMALIZE_RENDER_FPS,
+                cancel_event=background_job_service.cancel_event_for(job_id),
+                is_gif=_is_gif_visual_upload(image_upload, image_path),
+            )
+        result = {"upload_id": upload_id, "storage_key": clip_path.name, "fps": clip_fps}
+        await _update_upload_job(job_id, status="succeeded", progress=100, message="Visual ready.", result=result, error=None, extra_updates={"completed_at": _safe_iso_now()}, only_if_owned=True)
+    except Exception as exc:
+        error_message = str(getattr(exc, "detail", None) or exc)
+        logging.error(f"Visual normalize job {job_id} failed for upload={upload_id}: {error_message}")
+        await _update_upload_job(job_id, status="failed", progress=100, message="Visual preparation failed.", error=error_message, extra_updates={"failed_at": _safe_iso_now()}, only_if_owned=True)
+    finally:
+        heartbeat_task.cancel()
+        try:
+            await heartbeat_task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _process_audio_prepare_job(job: dict) -> None:
+    job_id = job["id"]
+    upload_id = str((job.get("payload") or {}).get("upload_id") or "").strip()
+    cancel_event = background_job_service.cancel_event_for(job_id)
+    heartbeat_task = asyncio.create_task(_job_heartbeat_loop(job_id))
+    try:
+        audio_upload = await db.uploads.find_one(
+            {"id": upload_id, "user_id": job.get("user_id"), "file_type": "audio"},
+            {"_id": 0},
+        )
+        if not audio_upload:
+            raise HTTPException(status_code=404, detail="Audio upload not found.")
+        await _update_upload_job(
+            job_id,
+            progress=10,
+            message="Preparing audio...",
+            extra_updates={"stage": "audio_prepare", "last_heartbeat_at": _safe_iso_now()},
+        )
+        async with media_storage.local_path_for_processing(audio_upload) as audio_path:
+            metadata = _recorded_media_metadata(audio_upload) or await asyncio.to_thread(_probe_audio_metadata, audio_path)
+            if _audio_passthrough_compatible(metadata):
+                derived_audio: dict[str, Any] = {"mode": "passthrough", "codec": str(metadata.get("codec") or "").lower()}
+            else:
+                storage_key = _derived_audio_storage_key(upload_id)
+                sidecar_path = media_storage.root_dir / storage_key
+                temp_path = media_storage.create_temp_path(".m4a")
+                try:
+                    await asyncio.to_thread(
+                        _encode_audio_sidecar,
+                        source_path=audio_path,
+                        output_path=temp_path,
+                        duration_seconds=float(metadata.get("duration") or 0),
+                        cancel_event=cancel_event,
+                    )
+                    # A run that lost its lease must not replace the sidecar a render may be reading.
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise JobCancelledError("Job was cancelled during stage 'audio_prepare'.")
+                    shutil.move(str(temp_path), str(sidecar_path))
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                derived_audio = {
+                    "mode": "sidecar",
+                    "storage_key": storage_key,
+                    "codec": "aac",
+                    "bitrate": YOUTUBE_AUDIO_BITRATE,
+                    "file_size": sidecar_path.stat().st_size,
+                }
+        derived_audio.update({"version": AUDIO_SIDECAR_VERSION, "created_at": _safe_iso_now()})
+        await db.uploads.update_one({"id": upload_id}, {"$set": {"derived_audio": derived_audio}})
+        result = {"upload_id": upload_id, "mode": derived_audio["mode"]}
+        await _update_upload_job(job_id, status="succeeded", progress=100, message="Audio ready.", result=result, error=None, extra_updates={"completed_at": _safe_iso_now()}, only_if_owned=True)
+    except Exception as exc:
+        error_message = str(getattr(exc, "detail", None) or exc)
+        logging.error(f"Audio prepare job {job_id} failed for upload={upload_id}: {error_message}")
+        await _update_upload_job(job_id, status="failed", progress=100, message="Audio preparation failed.", error=error_message, extra_updates={"failed_at": _safe_iso_now()}, only_if_owned=True)
+    finally:
+        heartbeat_task.cancel()
+        try:
+            await heartbeat_task
+        except asyncio.CancelledError:
+            pass
+
+
 async def _estimate_best_upload_hour_utc(user_id: str) -> int:
     """
     Estimate best publish hour from the user's recent YouTube uploads.
@@ -5728,6 +7209,52 @@ def _fetch_artist_context_from_youtube_api(youtube: Any, artist_name: str) -> di
     }
 
 
+def _enrichment_flight_key(kind: str, *parts: Any) -> tuple:
+    return (kind, *(tag_metrics_service.normalize_tag_key(str(part)) for part in parts))
+
+
+async def _fetch_artist_context_coalesced(youtube: Any | None, artist_name: str) -> dict[str, Any]:
+    if youtube is None:
+        context = await _enrichment_flights.to_thread(
+            _enrichment_flight_key("artist_context_web", artist_name),
+            _fetch_artist_context_no_api,
+            artist_name,
+        )
+    else:
+        context = await _enrichment_flights.to_thread(
+            _enrichment_flight_key("artist_context_api", artist_name),
+            _fetch_artist_context_from_youtube_api,
+            youtube,
+            artist_name,
+        )
+    # The shared result may come from a request that spelled the artist differently.
+    return {**context, "artist_name": (artist_name or "").strip()}
+
+
+async def _fetch_artist_seeds_coalesced(source: str, artist_name: str) -> list[str]:
+    fetchers = {
+        "spotify": _fetch_spotify_track_seeds,
+        "soundcloud": _fetch_soundcloud_track_seeds,
+        "youtube": _fetch_youtube_track_seeds_no_api,
+    }
+    seeds = await _enrichment_flights.to_thread(
+        _enrichment_flight_key(f"artist_seeds_{source}", artist_name),
+        fetchers[source],
+        artist_name,
+    )
+    return list(seeds)
+
+
+async def _fetch_typebeat_tags_coalesced(query: str, limit: int = 18) -> list[str]:
+    tags = await _enrichment_flights.to_thread(
+        _enrichment_flight_key("typebeat_titles", query, limit),
+        _fetch_youtube_typebeat_tags_no_api,
+        query,
+        limit,
+    )
+    return list(tags)
+
+
 def _fetch_artist_context_no_api(artist_name: str) -> dict[str, Any]:
     artist_query = (artist_name or "").strip()
     if not artist_query:
@@ -6355,10 +7882,10 @@ async def _collect_join_source_candidates(queries: list[str]) -> tuple[list[str]
     ]
 
     async def gather_for_query(query: str) -> tuple[list[str], list[str], list[str], list[str]]:
-        youtube_titles_task = asyncio.to_thread(_fetch_youtube_typebeat_tags_no_api, query, 18)
-        youtube_seed_task = asyncio.to_thread(_fetch_youtube_track_seeds_no_api, query)
-        spotify_seed_task = asyncio.to_thread(_fetch_spotify_track_seeds, query)
-        soundcloud_seed_task = asyncio.to_thread(_fetch_soundcloud_track_seeds, query)
+        youtube_titles_task = _fetch_typebeat_tags_coalesced(query, 18)
+        youtube_seed_task = _fetch_artist_seeds_coalesced("youtube", query)
+        spotify_seed_task = _fetch_artist_seeds_coalesced("spotify", query)
+        soundcloud_seed_task = _fetch_artist_seeds_coalesced("soundcloud", query)
         return await asyncio.gather(
             youtube_titles_task,
             youtube_seed_task,
@@ -6485,7 +8012,7 @@ async def generate_tags(request: TagGenerationRequest, current_user: dict = Depe
                 youtube = build('youtube', 'v3', developerKey=youtube_api_key)
                 source_status["youtube"] = "youtube_api_key"
 
-            artist_context = _fetch_artist_context_from_youtube_api(youtube, artist_name)
+            artist_context = await _fetch_artist_context_coalesced(youtube, artist_name)
             source_status["youtube_context"] = "context_found" if (
                 artist_context.get("top_video_titles") or artist_context.get("type_beat_search_results")
             ) else "context_empty"
@@ -6507,7 +8034,7 @@ async def generate_tags(request: TagGenerationRequest, current_user: dict = Depe
             )
         except Exception as e:
             logging.warning(f"YouTube search for popular songs failed: {str(e)}")
-            artist_context = await asyncio.to_thread(_fetch_artist_context_no_api, artist_name)
+            artist_context = await _fetch_artist_context_coalesced(None, artist_name)
             fallback_youtube_tags: list[str] = []
             for title in artist_context.get("top_video_titles", []):
                 seed = _extract_song_seed(title, artist_name)
@@ -6521,8 +8048,8 @@ async def generate_tags(request: TagGenerationRequest, current_user: dict = Depe
             ) else "fallback_context_empty"
 
         spotify_seeds, soundcloud_seeds = await asyncio.gather(
-            asyncio.to_thread(_fetch_spotify_track_seeds, artist_name),
-            asyncio.to_thread(_fetch_soundcloud_track_seeds, artist_name),
+            _fetch_artist_seeds_coalesced("spotify", artist_name),
+            _fetch_artist_seeds_coalesced("soundcloud", artist_name),
         )
 
         spotify_type_beat_tags = [f"{seed} type beat" for seed in spotify_seeds]
@@ -7408,12 +8935,24 @@ async def upload_audio(file: UploadFile = File(...), current_user: dict = Depend
             "storage_backend": storage_meta["storage_backend"],
             "storage_key": storage_meta["storage_key"],
             "file_size": storage_meta["file_size"],
+            "sha256": storage_meta.get("sha256"),
             "uploaded_at": datetime.now(timezone.utc).isoformat()
         }
+        await _attach_upload_media_metadata(upload_doc)
         
         await db.uploads.insert_one(upload_doc)
-        
-        return {"file_id": file_id, "filename": file.filename}
+
+        prepare_job_id = None
+        if AUDIO_PREPARE_ON_UPLOAD and hasattr(media_storage, "root_dir"):
+            # Renders encode the original audio as before if this job fails or has not run yet.
+            prepare_job_id = await _queue_upload_prep_job(
+                current_user,
+                job_type="audio_prepare",
+                upload_id=file_id,
+                message="Queued audio preparation.",
+            )
+
+        return {"file_id": file_id, "filename": file.filename, "prepare_job_id": prepare_job_id}
     except HTTPException:
         raise
     except Exception as e:
@@ -7456,14 +8995,26 @@ async def upload_image(file: UploadFile = File(...), current_user: dict = Depend
             original_filename=file.filename,
         )
         upload_doc = stored["upload_doc"]
+        await _attach_upload_media_metadata(upload_doc, visual_format=detected_ext)
         await db.uploads.insert_one(upload_doc)
 
+        normalize_job_id = None
+        if VISUAL_NORMALIZE_ON_UPLOAD and upload_doc.get("media_kind") == "video" and hasattr(media_storage, "root_dir"):
+            # Renders fall back to converting (GIF) or looping the original (video) if this job fails.
+            normalize_job_id = await _queue_upload_prep_job(
+                current_user,
+                job_type="visual_normalize",
+                upload_id=stored["file_id"],
+                message="Queued animated visual preparation.",
+            )
+
         return {
             "file_id": stored["file_id"],
             "filename": stored["filename"],
             "media_kind": upload_doc.get("media_kind"),
             "content_type": upload_doc.get("content_type"),
             "storage_key": upload_doc.get("storage_key"),
+            "normalize_job_id": normalize_job_id,
         }
     except HTTPException:
         raise
@@ -7669,7 +9220,7 @@ async def _refresh_spotlight_metrics_for_profiles(profile_docs: list[dict]) -> N
         if not youtube_url:
             return
         async with semaphore:
-            top_beats, channel_perf = await asyncio.to_thread(_fetch_channel_top_viewed_beats, youtube_url, 5)
+            top_beats, channel_perf = await _fetch_channel_top_viewed_beats_coalesced(youtube_url, 5)
         next_views = int(channel_perf.get("total_views") or 0)
         next_likes = sum(int(beat.get("likes") or 0) for beat in top_beats)
         if next_views <= 0 and next_likes <= 0:
@@ -7860,6 +9411,15 @@ def _youtube_get_channel_id_from_hints(hints: dict, api_key: str) -> str | None:
     return None
 
 
+async def _fetch_channel_top_viewed_beats_coalesced(youtube_url: str, top_k: int = 5) -> tuple[list[dict], dict]:
+    return await _enrichment_flights.to_thread(
+        ("channel_top_beats", str(youtube_url or "").strip().rstrip("/").lower(), int(top_k)),
+        _fetch_channel_top_viewed_beats,
+        youtube_url,
+        top_k,
+    )
+
+
 def _fetch_channel_top_viewed_beats(youtube_url: str, top_k: int = 5) -> tuple[list[dict], dict]:
     api_key = os.environ.get("YOUTUBE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
     if not api_key:
@@ -8345,18 +9905,23 @@ async def check_thumbnail(
                 detail="Title, tags, and description are required for thumbnail checks."
             )
 
-        image_bytes_b64 = ""
+        job_id = str(uuid.uuid4())
+        image_storage: dict | None = None
         image_mime = "image/jpeg"
         safe_image_file_id = image_file_id.strip()
 
         if file is not None and getattr(file, "filename", None):
-            allowed_types = {"image/jpeg", "image/png", "image/webp"}
-            if file.content_type not in allowed_types:
+            if file.content_type not in THUMBNAIL_CHECK_IMAGE_EXTENSIONS:
                 raise HTTPException(status_code=400, detail="Invalid image type. Use JPG, PNG, or WEBP.")
-            image_bytes = await file.read()
-            if not image_bytes:
+            image_storage = await media_storage.save_upload_file(
+                upload_file=file,
+                file_id=_job_input_file_id(job_id),
+                file_ext=THUMBNAIL_CHECK_IMAGE_EXTENSIONS[file.content_type],
+                max_bytes=MAX_IMAGE_UPLOAD_BYTES,
+            )
+            if not image_storage.get("file_size"):
+                _delete_job_input_files(job_id, {"image_storage": image_storage})
                 raise HTTPException(status_code=400, detail="No image provided for thumbnail check.")
-            image_bytes_b64 = base64.b64encode(image_bytes).decode("utf-8")
             image_mime = file.content_type or image_mime
         elif safe_image_file_id:
             upload = await db.uploads.find_one({"id": safe_image_file_id, "user_id": current_user["id"], "file_type": "image"})
@@ -8367,19 +9932,24 @@ async def check_thumbnail(
 
         payload = {
             "image_file_id": safe_image_file_id,
-            "image_bytes_b64": image_bytes_b64,
+            "image_storage": image_storage,
             "image_mime": image_mime,
             "title": title,
             "tags": tags,
             "description": description,
             "llm_provider": llm_provider,
         }
-        job_doc = await _create_background_job(
-            current_user=current_user,
-            job_type="thumbnail_check",
-            payload=payload,
-            message="Queued thumbnail analysis job.",
-        )
+        try:
+            job_doc = await _create_background_job(
+                current_user=current_user,
+                job_type="thumbnail_check",
+                payload=payload,
+                message="Queued thumbnail analysis job.",
+                job_id=job_id,
+            )
+        except Exception:
+            _delete_job_input_files(job_id, payload)
+            raise
         return {"success": True, "queued": True, "message": "Thumbnail check queued.", "job": _sanitize_upload_job_doc(job_doc)}
     except HTTPException:
         raise
@@ -8410,6 +9980,7 @@ async def upload_to_youtube(
     render_fps: str = Form(str(YOUTUBE_RENDER_FPS_DEFAULT)),
     visualizer_enabled: bool = Form(False),
     visualizer_settings: Optional[str] = Form(None),
+    run_at: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_user)
 ):
     """Create a persisted YouTube upload job and return immediately."""
@@ -8453,17 +10024,23 @@ async def upload_to_youtube(
             visualizer_enabled=visualizer_enabled,
             visualizer_settings_json=visualizer_settings,
         )
-        job_doc = await _create_youtube_upload_job(current_user=current_user, payload=payload)
+        safe_run_at = await _resolve_upload_run_at(current_user["id"], run_at)
+        job_doc = await _create_youtube_upload_job(current_user=current_user, payload=payload, run_at=safe_run_at)
         logger.info(
-            "YouTube upload job queued id=%s user_id=%s render_fps=%s",
+            "YouTube upload job queued id=%s user_id=%s render_fps=%s run_at=%s",
             job_doc.get("id"),
             current_user["id"],
             safe_render_fps,
+            safe_run_at or "now",
         )
         return {
             "success": True,
             "queued": True,
-            "message": "Upload queued. Rendering and YouTube upload will continue in the background.",
+            "message": (
+                f"Upload scheduled for {safe_run_at}. The video may render earlier; the YouTube upload starts then."
+                if safe_run_at
+                else "Upload queued. Rendering and YouTube upload will continue in the background."
+            ),
             "job": _sanitize_upload_job_doc(job_doc),
         }
     except HTTPException:
@@ -8494,14 +10071,115 @@ async def list_youtube_upload_jobs(limit: int = 10, current_user: dict = Depends
     }
 
 
+JOBS_BATCH_MAX_IDS = 50
+# updated_at is stamped before a write commits, so the cursor trails the newest job.
+JOBS_BATCH_CURSOR_SAFETY_SECONDS = 5
+
+
+@api_router.get("/jobs")
+async def get_background_jobs_batch(
+    ids: str = "",
+    since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    job_ids = list(dict.fromkeys(item.strip() for item in ids.split(",") if item.strip()))
+    if not job_ids:
+        raise HTTPException(status_code=400, detail="ids is required.")
+    if len(job_ids) > JOBS_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {JOBS_BATCH_MAX_IDS} job ids per request.")
+    query: dict[str, Any] = {"id": {"$in": job_ids}, "user_id": current_user["id"]}
+    safe_since = ""
+    if str(since or "").strip():
+        try:
+            safe_since = _parse_utc_timestamp(since).isoformat()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="since must be an ISO-8601 timestamp.")
+        query["updated_at"] = {"$gt": safe_since}
+    jobs = await db.upload_jobs.find(query, {"_id": 0, "payload": 0}).to_list(len(job_ids))
+    missing_ids = set(job_ids) - {job.get("id") for job in jobs}
+    if missing_ids and not safe_since:
+        jobs += await db.upload_jobs_archive.find(
+            {**query, "id": {"$in": sorted(missing_ids)}},
+            {"_id": 0},
+        ).to_list(len(missing_ids))
+    await job_duration_stats.refresh()
+    sanitized = [_sanitize_upload_job_doc(job) for job in jobs]
+    cursor = safe_since
+    newest = max((str(job.get("updated_at") or "") for job in sanitized), default="")
+    if newest:
+        try:
+            trailing = _parse_utc_timestamp(newest) - timedelta(seconds=JOBS_BATCH_CURSOR_SAFETY_SECONDS)
+        except ValueError:
+            trailing = None
+        if trailing is not None:
+            cursor = max(cursor, trailing.isoformat())
+    return {"success": True, "jobs": sanitized, "cursor": cursor or None}
+
+
 @api_router.get("/jobs/{job_id}")
 async def get_background_job(job_id: str, current_user: dict = Depends(get_current_user)):
     job = await db.upload_jobs.find_one({"id": job_id, "user_id": current_user["id"]}, {"_id": 0})
+    if not job:
+        job = await background_job_service.get_archived_job(job_id, user_id=current_user["id"])
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    await job_duration_stats.refresh()
     return {"success": True, "job": _sanitize_upload_job_doc(job)}
 
 
+def _format_sse_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@api_router.post("/jobs/{job_id}/events/token")
+async def create_background_job_events_token(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await db.upload_jobs.find_one({"id": job_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        "stream_token": create_job_events_token(current_user["id"], job_id),
+        "expires_in": JOB_EVENTS_TOKEN_TTL_SECONDS,
+    }
+
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_background_job_events(
+    job_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user_for_job_stream),
+):
+    await job_duration_stats.refresh()
+    job, queue = await job_event_hub.subscribe(job_id)
+    if not job or job.get("user_id") != current_user["id"]:
+        job_event_hub.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        try:
+            snapshot = job_event_hub.snapshot(job_id) or {}
+            yield _format_sse_event("snapshot", snapshot)
+            if snapshot.get("status") in TERMINAL_JOB_STATUSES:
+                return
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=JOB_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse_event(event, data)
+                if data.get("status") in TERMINAL_JOB_STATUSES:
+                    return
+        finally:
+            job_event_hub.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @api_router.get("/health")
 async def get_health():
     snapshot = await _build_health_snapshot()
@@ -8842,9 +10520,17 @@ async def clear_admin_ops_jobs(request: AdminClearJobsRequest, current_user: dic
             }
         },
     )
+    cleared_count = int(getattr(result, "modified_count", 0) or 0)
+    if cleared_count:
+        # A bulk clear spans statuses and users, so recount instead of guessing the deltas.
+        try:
+            await background_job_service.reconcile_job_counters()
+        except Exception as exc:
+            logger.warning("Job counter reconcile after admin clear failed: %s", exc)
+        _invalidate_ops_snapshot()
     return {
         "success": True,
-        "cleared_count": int(getattr(result, "modified_count", 0) or 0),
+        "cleared_count": cleared_count,
         "filter": {
             "job_type": safe_job_type or None,
             "statuses": target_statuses,
@@ -8885,15 +10571,29 @@ async def clear_admin_ops_job(job_id: str, current_user: dict = Depends(get_curr
             }
         },
     )
+    cleared = bool(getattr(result, "modified_count", 0))
+    if cleared:
+        await background_job_service.record_status_change(
+            existing_job.get("status"),
+            "failed",
+            user_id=existing_job.get("user_id"),
+            job_type=existing_job.get("type"),
+        )
+        _invalidate_ops_snapshot()
+        # Jobs running in this process stop now; other workers get the cancel from the change stream.
+        background_job_service.request_local_cancel(safe_job_id)
     return {
         "success": True,
-        "cleared": bool(getattr(result, "modified_count", 0)),
+        "cleared": cleared,
         "job_id": safe_job_id,
         "previous_status": existing_job.get("status"),
         "was_processing": existing_job.get("status") == "processing",
         "job_type": existing_job.get("type"),
         "user_id": existing_job.get("user_id"),
-        "warning": "If the job was already processing, any FFmpeg subprocess will stop on the next cancellation checkpoint.",
+        "warning": (
+            f"If the job was already processing, its FFmpeg subprocess is killed right away, or within "
+            f"about {HEARTBEAT_INTERVAL_SECONDS}s on another worker without MongoDB change streams."
+        ),
     }
 
 
@@ -8964,6 +10664,21 @@ def _schedule_upload_job_update(
             )
 
     future.add_done_callback(_on_done)
+
+
+render_output_cache = RenderOutputCache(
+    root_dir=media_storage.root_dir / "render_cache" if hasattr(media_storage, "root_dir") else None,
+    max_bytes=YOUTUBE_RENDER_CACHE_MAX_BYTES,
+    logger=logger,
+)
+job_duration_stats = JobDurationStats(
+    db=db,
+    logger=logger,
+    min_samples=JOB_DURATION_MIN_SAMPLES,
+    timeout_multiplier=JOB_LEARNED_TIMEOUT_MULTIPLIER,
+    min_timeout_seconds=JOB_LEARNED_TIMEOUT_MIN_SECONDS,
+    max_timeout_seconds=JOB_LEARNED_TIMEOUT_MAX_SECONDS,
+)
 background_job_service = BackgroundJobService(
     db=db,
     logger=logger,
@@ -8971,7 +10686,24 @@ background_job_service = BackgroundJobService(
     stale_after_seconds=UPLOAD_JOB_STALE_AFTER_SECONDS,
     worker_id=UPLOAD_JOB_WORKER_ID,
     now_factory=_safe_iso_now,
+    max_concurrency=JOB_WORKER_CONCURRENCY,
+    slot_capacity={"render": JOB_RENDER_SLOTS, "llm": JOB_LLM_SLOTS, "prep": JOB_PREP_SLOTS},
+    job_slot_groups=JOB_SLOT_GROUPS,
+    lease_seconds=JOB_WORKER_HEARTBEAT_DEAD_SECONDS,
+    progress_flush_interval_seconds=JOB_PROGRESS_FLUSH_INTERVAL_SECONDS,
+    fair_share_weights=JOB_FAIR_SHARE_WEIGHTS if JOB_FAIR_SHARE_ENABLED else None,
+    prerender_job_types={"youtube_upload"},
+    prerender_ahead_seconds=JOB_PRERENDER_AHEAD_SECONDS,
+    duration_stats=job_duration_stats,
+    uncounted_job_types=set(UPLOAD_PREP_JOB_TYPES),
+)
+job_event_hub = JobEventHub(
+    db=db,
+    logger=logger,
+    sanitize_job_doc=background_job_service.sanitize_job_doc,
+    resync_interval_seconds=JOB_EVENTS_RESYNC_INTERVAL_SECONDS,
 )
+background_job_service.add_update_listener(job_event_hub.publish)
 background_job_service.set_handlers(
     {
         "youtube_upload": _process_youtube_upload_job,
@@ -8981,6 +10713,8 @@ background_job_service.set_handlers(
         "beat_fix": _process_beat_fix_job,
         "tag_generation": _process_tag_generation_job,
         "tag_join": _process_tag_join_job,
+        "visual_normalize": _process_visual_normalize_job,
+        "audio_prepare": _process_audio_prepare_job,
     }
 )
 spotlight_service = SpotlightService(
@@ -8993,36 +10727,83 @@ spotlight_service = SpotlightService(
     build_profiles=_build_spotlight_profiles,
     profile_with_role_tag=_profile_with_role_tag,
     refresh_metrics_for_profiles=_refresh_spotlight_metrics_for_profiles,
-    fetch_channel_top_viewed_beats=_fetch_channel_top_viewed_beats,
+    fetch_channel_top_viewed_beats=_fetch_channel_top_viewed_beats_coalesced,
     safe_iso_now=_safe_iso_now,
 )
 
-@app.on_event("startup")
-async def startup_background_tasks():
-    global _upload_job_worker_task, _job_watchdog_task, _spotlight_refresh_task
-    _validate_security_configuration()
-    _log_youtube_render_timeout_configuration()
+async def _start_background_loops(*, run_watchdog: bool = True, run_spotlight: bool = True) -> None:
+    global _upload_job_worker_task, _job_watchdog_task, _job_queue_watch_task, _spotlight_refresh_task
+    try:
+        await background_job_service.ensure_indexes()
+    except Exception as exc:
+        logger.warning("Could not ensure upload_jobs indexes: %s", exc)
+    if run_watchdog:
+        try:
+            await background_job_service.reconcile_job_counters()
+        except Exception as exc:
+            logger.warning("Could not reconcile job counters: %s", exc)
     await _requeue_stale_background_jobs()
     if _upload_job_worker_task is None:
         _upload_job_worker_task = asyncio.create_task(_background_job_worker_loop())
         logger.info("Background job worker started")
-    if _job_watchdog_task is None:
+    if _job_watchdog_task is None and run_watchdog:
         _job_watchdog_task = asyncio.create_task(_background_job_watchdog_loop())
         logger.info("Background job watchdog started")
-    if _spotlight_refresh_task is None:
+    if _job_queue_watch_task is None and JOB_QUEUE_CHANGE_STREAM_ENABLED:
+        _job_queue_watch_task = asyncio.create_task(_background_job_queue_watch_loop())
+        logger.info("Background job queue and cancel change streams started")
+    if _spotlight_refresh_task is None and run_spotlight:
         _spotlight_refresh_task = asyncio.create_task(_spotlight_refresh_loop())
         logger.info("Spotlight refresh loop started")
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    global _upload_job_worker_task, _job_watchdog_task, _spotlight_refresh_task
+
+async def _stop_background_loops() -> None:
+    global _upload_job_worker_task, _job_watchdog_task, _job_queue_watch_task, _spotlight_refresh_task
     if _upload_job_worker_task:
+        try:
+            await background_job_service.drain(grace_seconds=JOB_DRAIN_GRACE_SECONDS)
+        except Exception as exc:
+            logger.error("Background job drain failed: %s", exc)
+        await background_job_service.flush_duration_samples()
         _upload_job_worker_task.cancel()
         _upload_job_worker_task = None
     if _job_watchdog_task:
         _job_watchdog_task.cancel()
         _job_watchdog_task = None
+    if _job_queue_watch_task:
+        _job_queue_watch_task.cancel()
+        _job_queue_watch_task = None
     if _spotlight_refresh_task:
         _spotlight_refresh_task.cancel()
         _spotlight_refresh_task = None
+
+
+def _start_job_event_hub() -> None:
+    if _job_event_tasks:
+        return
+    _job_event_tasks.append(asyncio.create_task(job_event_hub.resync_loop()))
+    if JOB_QUEUE_CHANGE_STREAM_ENABLED:
+        _job_event_tasks.append(asyncio.create_task(job_event_hub.watch_changes()))
+
+
+def _stop_job_event_hub() -> None:
+    for task in _job_event_tasks:
+        task.cancel()
+    _job_event_tasks.clear()
+
+
+@app.on_event("startup")
+async def startup_background_tasks():
+    _validate_security_configuration()
+    _log_youtube_render_timeout_configuration()
+    _start_job_event_hub()
+    if not API_RUN_BACKGROUND_LOOPS:
+        logger.info("API_RUN_BACKGROUND_LOOPS=false; jobs, watchdog and spotlight refresh run in backend.worker")
+        return
+    await _start_background_loops()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    _stop_job_event_hub()
+    await _stop_background_loops()
     client.close()
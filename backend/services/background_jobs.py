@@ -2,15 +2,55 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
+import time
 import traceback
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Awaitable, Callable
 
-from pymongo import ReturnDocument
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from .job_durations import QUEUE_WAIT_STAGE, TOTAL_RUN_STAGE, JobDurationStats
 
 
 JobHandler = Callable[[dict], Awaitable[None]]
+JobUpdateListener = Callable[[str, dict], None]
+
+DEFAULT_SLOT_GROUP = "default"
+TERMINAL_JOB_STATUSES = frozenset({"succeeded", "failed", "cancelled"})
+ACTIVE_JOB_STATUSES = frozenset({"queued", "processing"})
+COUNTED_JOB_STATUSES = ("queued", "processing", "succeeded", "failed", "cancelled")
+STATUS_COUNTERS_KEY = "status"
+FAILED_BUCKET_SECONDS = 300
+# Users with the lowest fair-share pass tried per claim before falling back to FIFO.
+FAIR_SHARE_CANDIDATES = 8
+# A user whose claim missed (nothing due or claimable here) is left out of candidates this long.
+FAIR_SHARE_MISS_RETRY_SECONDS = 30.0
+ENCODE_STAGES = frozenset({"gif_transcode", "ffmpeg_render"})
+# Fields kept in upload_jobs_archive summaries.
+ARCHIVED_JOB_FIELDS = (
+    "id",
+    "type",
+    "user_id",
+    "status",
+    "progress",
+    "message",
+    "stage",
+    "attempts",
+    "max_attempts",
+    "cancel_requested",
+    "error_code",
+    "failed_stage",
+    "result",
+    "error",
+    "run_at",
+    "created_at",
+    "started_at",
+    "failed_at",
+    "updated_at",
+)
 
 
 class BackgroundJobService:
@@ -23,6 +63,16 @@ class BackgroundJobService:
         stale_after_seconds: int,
         worker_id: str | None = None,
         now_factory: Callable[[], str] | None = None,
+        max_concurrency: int = 1,
+        slot_capacity: dict[str, int] | None = None,
+        job_slot_groups: dict[str, str] | None = None,
+        lease_seconds: int | None = None,
+        progress_flush_interval_seconds: float = 0.0,
+        fair_share_weights: dict[str, float] | None = None,
+        prerender_job_types: set[str] | None = None,
+        prerender_ahead_seconds: float = 0.0,
+        duration_stats: JobDurationStats | None = None,
+        uncounted_job_types: set[str] | None = None,
     ) -> None:
         self.db = db
         self.logger = logger
@@ -30,11 +80,125 @@ class BackgroundJobService:
         self.stale_after_seconds = stale_after_seconds
         self.worker_id = worker_id or f"job-worker-{uuid.uuid4().hex[:10]}"
         self.now_factory = now_factory or (lambda: datetime.now(timezone.utc).isoformat())
+        self.lease_seconds = max(1, int(lease_seconds or stale_after_seconds))
         self.handlers: dict[str, JobHandler] = {}
+        # Each job type draws from a slot group so long encodes never block cheap I/O jobs.
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.slot_capacity = {
+            str(group): max(1, int(capacity))
+            for group, capacity in (slot_capacity or {}).items()
+        }
+        self.job_slot_groups = dict(job_slot_groups or {})
+        self.claim_types: frozenset[str] | None = None
+        self._slot_usage: dict[str, int] = {}
+        self._active_tasks: set[asyncio.Task] = set()
+        self._job_tasks: dict[str, asyncio.Task] = {}
+        self.draining = False
+        self._slot_released = asyncio.Event()
+        # Set when a job may have become claimable; polling is only a fallback.
+        self._job_available = asyncio.Event()
+        # Progress-only updates are buffered and flushed at most once per interval.
+        self.progress_flush_interval_seconds = max(0.0, float(progress_flush_interval_seconds or 0.0))
+        self._pending_updates: dict[str, dict[str, Any]] = {}
+        self._pending_flush_tasks: dict[str, asyncio.Task] = {}
+        self._last_flush_at: dict[str, float] = {}
+        # Serializes writes to one job so a late flush cannot overwrite a status write.
+        self._job_write_locks: dict[str, asyncio.Lock] = {}
+        self._update_listeners: list[JobUpdateListener] = []
+        # Reaches blocking work in worker threads (FFmpeg watchers) on cancel.
+        self._cancel_events: dict[str, threading.Event] = {}
+        # Start-time fair queuing by plan weight; None keeps FIFO order.
+        self.fair_share_weights = {
+            str(plan): max(0.01, float(weight))
+            for plan, weight in (fair_share_weights or {}).items()
+        } or None
+        self._fair_share_misses: dict[str, tuple[str, float]] = {}
+        self.prerender_job_types = frozenset(prerender_job_types or ())
+        self.prerender_ahead_seconds = max(0.0, float(prerender_ahead_seconds or 0.0))
+        self.duration_stats = duration_stats
+        self._stage_clocks: dict[str, dict[str, Any]] = {}
+        self._duration_record_tasks: set[asyncio.Task] = set()
+        # Upload-time prep jobs stay out of the active counts that gate new jobs.
+        self.uncounted_job_types = frozenset(uncounted_job_types or ())
 
     def set_handlers(self, handlers: dict[str, JobHandler]) -> None:
         self.handlers = handlers
 
+    def add_update_listener(self, listener: JobUpdateListener) -> None:
+        self._update_listeners.append(listener)
+
+    def _publish_job_update(self, job_id: str, fields: dict[str, Any]) -> None:
+        for listener in self._update_listeners:
+            try:
+                listener(job_id, fields)
+            except Exception as exc:
+                self.logger.warning("Job update listener failed job=%s: %s", job_id, exc)
+
+    def cancel_event_for(self, job_id: str) -> threading.Event | None:
+        return self._cancel_events.get(job_id)
+
+    def request_local_cancel(self, job_id: str) -> bool:
+        event = self._cancel_events.get(job_id)
+        if event is None:
+            return False
+        if not event.is_set():
+            self.logger.info("Cancelling running job id=%s on worker=%s", job_id, self.worker_id)
+            event.set()
+        return True
+
+    def running_job_ids(self) -> list[str]:
+        return list(self._cancel_events)
+
+    def set_claim_types(self, job_types: list[str] | None) -> None:
+        cleaned = {str(job_type).strip() for job_type in (job_types or []) if str(job_type).strip()}
+        self.claim_types = frozenset(cleaned) if cleaned else None
+
+    def slot_group_for(self, job_type: str | None) -> str:
+        return self.job_slot_groups.get(str(job_type or ""), DEFAULT_SLOT_GROUP)
+
+    def _group_capacity(self, group: str) -> int:
+        return self.slot_capacity.get(group, self.max_concurrency)
+
+    def _group_has_capacity(self, group: str) -> bool:
+        return self._slot_usage.get(group, 0) < self._group_capacity(group)
+
+    def notify_job_available(self) -> None:
+        self._job_available.set()
+
+    def active_job_count(self) -> int:
+        return len(self._active_tasks)
+
+    def slot_usage_snapshot(self) -> dict[str, dict[str, int]]:
+        groups = set(self.slot_capacity) | set(self._slot_usage) | {DEFAULT_SLOT_GROUP}
+        return {
+            group: {"active": self._slot_usage.get(group, 0), "capacity": self._group_capacity(group)}
+            for group in sorted(groups)
+        }
+
+    def _claim_filter(self) -> dict[str, Any] | None:
+        if self.draining or len(self._active_tasks) >= self.max_concurrency:
+            return None
+        if self.claim_types is not None:
+            allowed_types = sorted(
+                job_type for job_type in self.claim_types
+                if self._group_has_capacity(self.slot_group_for(job_type))
+            )
+            return {"status": "queued", "type": {"$in": allowed_types}} if allowed_types else None
+        known_types = set(self.handlers) | set(self.job_slot_groups)
+        blocked_types = sorted(
+            job_type for job_type in known_types
+            if not self._group_has_capacity(self.slot_group_for(job_type))
+        )
+        if not blocked_types:
+            return {"status": "queued"}
+        if self._group_has_capacity(DEFAULT_SLOT_GROUP):
+            # Unknown job types fall into the default group and must stay claimable so they fail loudly.
+            return {"status": "queued", "type": {"$nin": blocked_types}}
+        allowed_types = sorted(known_types - set(blocked_types))
+        if not allowed_types:
+            return None
+        return {"status": "queued", "type": {"$in": allowed_types}}
+
     @staticmethod
     def _optional_int_field(doc: dict, key: str) -> int | None:
         value = doc.get(key)
@@ -59,6 +223,8 @@ class BackgroundJobService:
             "encode_progress": self._optional_int_field(doc, "encode_progress"),
             "stage_started_at": doc.get("stage_started_at"),
             "last_heartbeat_at": doc.get("last_heartbeat_at"),
+            "run_at": doc.get("run_at"),
+            "prerendered": bool(doc.get("prerendered") or False),
             "attempts": int(doc.get("attempts") or 0),
             "max_attempts": int(doc.get("max_attempts") or 0),
             "cancel_requested": bool(doc.get("cancel_requested") or False),
@@ -69,8 +235,46 @@ class BackgroundJobService:
             "error": doc.get("error"),
             "created_at": doc.get("created_at"),
             "updated_at": doc.get("updated_at"),
+            **self.estimate_job_eta(doc),
         }
 
+    def estimate_job_eta(self, doc: dict) -> dict[str, Any]:
+        eta: dict[str, Any] = {"predicted_wait_seconds": None, "estimated_completion_at": None}
+        status = doc.get("status")
+        if self.duration_stats is None or status not in ACTIVE_JOB_STATUSES:
+            return eta
+        now = datetime.now(timezone.utc)
+        job_type = doc.get("type")
+        features = doc.get("duration_features") if isinstance(doc.get("duration_features"), dict) else {}
+        typical_run = self.duration_stats.percentile(job_type, TOTAL_RUN_STAGE, 0.5, features)
+        wait: float | None
+        remaining: float | None
+        if status == "queued":
+            run_at = self._parse_iso_timestamp(doc.get("run_at"))
+            if run_at is not None and run_at > now:
+                wait = (run_at - now).total_seconds()
+            else:
+                typical_wait = self.duration_stats.percentile(job_type, QUEUE_WAIT_STAGE, 0.5)
+                due_at = run_at or self._parse_iso_timestamp(doc.get("created_at")) or now
+                wait = None if typical_wait is None else max(0.0, typical_wait - (now - due_at).total_seconds())
+            remaining = typical_run
+        else:
+            wait = 0.0
+            started_at = self._parse_iso_timestamp(doc.get("started_at"))
+            remaining = (
+                max(0.0, typical_run - (now - started_at).total_seconds())
+                if typical_run is not None and started_at is not None
+                else None
+            )
+            encode_remaining = self._estimate_remaining_seconds(doc, now)
+            if encode_remaining is not None:
+                remaining = max(remaining or 0.0, encode_remaining)
+        if wait is not None:
+            eta["predicted_wait_seconds"] = int(round(wait))
+            if remaining is not None:
+                eta["estimated_completion_at"] = (now + timedelta(seconds=wait + remaining)).isoformat()
+        return eta
+
     async def update_job(
         self,
         job_id: str,
@@ -81,7 +285,8 @@ class BackgroundJobService:
         result: dict | None = None,
         error: str | None = None,
         extra_updates: dict[str, Any] | None = None,
-    ) -> None:
+        only_if_owned: bool = False,
+    ) -> str | None:
         now = self.now_factory()
         updates: dict[str, Any] = {"updated_at": now}
         if status is not None:
@@ -98,7 +303,174 @@ class BackgroundJobService:
             if "stage" in extra_updates:
                 updates["stage_started_at"] = now
             updates.update(extra_updates)
-        await self.db.upload_jobs.update_one({"id": job_id}, {"$set": updates})
+        self._observe_stage_clock(job_id, updates)
+        immediate = (
+            status is not None
+            or "stage" in updates
+            or self.progress_flush_interval_seconds <= 0
+        )
+        if immediate:
+            return await self._write_job_updates(job_id, updates, only_if_owned=only_if_owned)
+        self._pending_updates.setdefault(job_id, {}).update(updates)
+        if job_id in self._pending_flush_tasks:
+            return None
+        wait_seconds = self.progress_flush_interval_seconds - (
+            time.monotonic() - self._last_flush_at.get(job_id, float("-inf"))
+        )
+        if wait_seconds <= 0:
+            await self.flush_job_updates(job_id)
+            return None
+        self._pending_flush_tasks[job_id] = asyncio.create_task(self._flush_job_updates_after(job_id, wait_seconds))
+        return None
+
+    async def _write_job_updates(self, job_id: str, updates: dict[str, Any], *, only_if_owned: bool = False) -> str | None:
+        lock = self._job_write_locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            status = await self._write_job_updates_locked(job_id, updates, only_if_owned=only_if_owned)
+        if status in TERMINAL_JOB_STATUSES and self._job_write_locks.get(job_id) is lock and not lock.locked():
+            self._job_write_locks.pop(job_id, None)
+        return status
+
+    async def _write_job_updates_locked(
+        self,
+        job_id: str,
+        updates: dict[str, Any],
+        *,
+        only_if_owned: bool,
+    ) -> str | None:
+        pending = self._pending_updates.pop(job_id, None) or {}
+        flush_task = self._pending_flush_tasks.pop(job_id, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+        merged = {**pending, **updates}
+        if not merged:
+            return None
+        # Stamped when the write goes out, not when the value was buffered.
+        merged["updated_at"] = self.now_factory()
+        self._last_flush_at[job_id] = time.monotonic()
+        if merged.get("status") in TERMINAL_JOB_STATUSES:
+            self._last_flush_at.pop(job_id, None)
+        if "status" not in merged:
+            update_filter: dict[str, Any] = {"id": job_id}
+            owned = job_id in self._cancel_events
+            if owned:
+                # Only while this worker still holds the job.
+                update_filter.update({"status": "processing", "worker_id": self.worker_id})
+            result = await self.db.upload_jobs.update_one(update_filter, {"$set": merged})
+            if owned and not getattr(result, "matched_count", 1):
+                return None
+            self._publish_job_update(job_id, merged)
+            return None
+        status_filter: dict[str, Any] = {"id": job_id}
+        if only_if_owned:
+            status_filter.update({"status": "processing", "worker_id": self.worker_id})
+        previous = await self.db.upload_jobs.find_one_and_update(
+            status_filter,
+            {"$set": merged},
+            projection={"_id": 0, "status": 1, "user_id": 1, "type": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if only_if_owned and not previous:
+            self.logger.info("Skipped %s write for job=%s: no longer owned by %s", merged["status"], job_id, self.worker_id)
+            return None
+        self._publish_job_update(job_id, merged)
+        if previous:
+            await self.record_status_change(
+                previous.get("status"),
+                merged["status"],
+                user_id=previous.get("user_id"),
+                job_type=previous.get("type"),
+            )
+        return merged["status"]
+
+    def _record_duration(
+        self,
+        job_type: str,
+        stage: str,
+        seconds: float,
+        features: dict[str, Any] | None = None,
+    ) -> None:
+        task = asyncio.create_task(self.duration_stats.record(job_type, stage, seconds, features))
+        self._duration_record_tasks.add(task)
+        task.add_done_callback(self._on_duration_recorded)
+
+    def _on_duration_recorded(self, task: asyncio.Task) -> None:
+        self._duration_record_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("Job duration sample failed: %s", task.exception())
+
+    async def flush_duration_samples(self) -> None:
+        if self._duration_record_tasks:
+            await asyncio.gather(*list(self._duration_record_tasks), return_exceptions=True)
+
+    def _start_stage_clock(self, job: dict) -> None:
+        if self.duration_stats is None:
+            return
+        job_id = str(job.get("id") or "")
+        job_type = str(job.get("type") or "")
+        # Retried or prerendered runs are partial, so they add no queue wait or total samples.
+        full_run = not job.get("prerendered") and not int(job.get("attempts") or 0)
+        now = time.monotonic()
+        self._stage_clocks[job_id] = {
+            "type": job_type,
+            "stage": str(job.get("stage") or ""),
+            "stage_started": now,
+            "run_started": now,
+            "features": dict(job.get("duration_features") or {}),
+            "full_run": full_run,
+        }
+        started_at = self._parse_iso_timestamp(job.get("started_at"))
+        due_at = self._parse_iso_timestamp(job.get("run_at")) or self._parse_iso_timestamp(job.get("created_at"))
+        if full_run and started_at is not None and due_at is not None and started_at >= due_at:
+            self._record_duration(job_type, QUEUE_WAIT_STAGE, (started_at - due_at).total_seconds())
+
+    def _observe_stage_clock(self, job_id: str, updates: dict[str, Any]) -> None:
+        clock = self._stage_clocks.get(job_id)
+        if clock is None or self.duration_stats is None:
+            return
+        if isinstance(updates.get("duration_features"), dict):
+            clock["features"] = {**clock["features"], **updates["duration_features"]}
+        status = updates.get("status")
+        stage = updates.get("stage")
+        now = time.monotonic()
+        if status == "succeeded" or (status not in TERMINAL_JOB_STATUSES and stage is not None and stage != clock["stage"]):
+            self._record_duration(clock["type"], clock["stage"], now - clock["stage_started"], clock["features"])
+            clock["stage"] = stage if stage is not None else clock["stage"]
+            clock["stage_started"] = now
+        if status == "succeeded" and clock["full_run"]:
+            self._record_duration(clock["type"], TOTAL_RUN_STAGE, now - clock["run_started"], clock["features"])
+        if status in TERMINAL_JOB_STATUSES:
+            self._stage_clocks.pop(job_id, None)
+
+    async def _flush_job_updates_after(self, job_id: str, delay_seconds: float) -> None:
+        await asyncio.sleep(delay_seconds)
+        # Past the sleep the flush is no longer cancellable: a status write waits on the job's lock.
+        if self._pending_flush_tasks.get(job_id) is asyncio.current_task():
+            self._pending_flush_tasks.pop(job_id, None)
+        try:
+            await self.flush_job_updates(job_id)
+        except Exception as exc:
+            self.logger.error("Buffered job update flush failed job=%s: %s", job_id, exc)
+
+    def discard_job_updates(self, job_id: str) -> None:
+        self._pending_updates.pop(job_id, None)
+        self._last_flush_at.pop(job_id, None)
+        lock = self._job_write_locks.get(job_id)
+        if lock is not None and not lock.locked():
+            self._job_write_locks.pop(job_id, None)
+        flush_task = self._pending_flush_tasks.pop(job_id, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+    async def flush_job_updates(self, job_id: str) -> None:
+        await self._write_job_updates(job_id, {})
+
+    async def flush_all_job_updates(self) -> None:
+        for job_id in list(self._pending_updates):
+            try:
+                await self.flush_job_updates(job_id)
+            except Exception as exc:
+                self.logger.error("Buffered job update flush failed job=%s: %s", job_id, exc)
 
     async def create_job(
         self,
@@ -108,10 +480,13 @@ class BackgroundJobService:
         payload: dict[str, Any],
         priority: int = 1,
         message: str = "Queued for background processing.",
+        plan: str = "free",
+        run_at: str | None = None,
+        job_id: str | None = None,
     ) -> dict:
         now = self.now_factory()
         job_doc = {
-            "id": str(uuid.uuid4()),
+            "id": job_id or str(uuid.uuid4()),
             "type": job_type,
             "user_id": current_user["id"],
             "status": "queued",
@@ -123,6 +498,8 @@ class BackgroundJobService:
             "last_heartbeat_at": now,
             "attempts": 0,
             "max_attempts": 2 if job_type == "youtube_upload" else 1,
+            "plan": plan,
+            "run_at": run_at or now,
             "cancel_requested": False,
             "error_code": None,
             "failed_stage": None,
@@ -133,12 +510,387 @@ class BackgroundJobService:
             "updated_at": now,
         }
         await self.db.upload_jobs.insert_one(job_doc)
+        await self.record_status_change(None, "queued", user_id=job_doc["user_id"], plan=plan, job_type=job_type)
+        self.notify_job_available()
         return job_doc
 
-    async def claim_next_job(self) -> dict | None:
+    def _lease_expiry(self) -> str:
+        return (datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)).isoformat()
+
+    async def ensure_indexes(self) -> None:
+        await self.db.upload_jobs.create_index([("id", ASCENDING)], unique=True)
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("priority", ASCENDING), ("created_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("stage", ASCENDING), ("stage_started_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("user_id", ASCENDING), ("priority", ASCENDING), ("created_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+        await self.db.upload_jobs.create_index([("status", ASCENDING), ("updated_at", ASCENDING)])
+        await self.db.upload_jobs_archive.create_index([("id", ASCENDING)], unique=True)
+        await self.db.job_counters.create_index([("key", ASCENDING)], unique=True)
+        await self.db.job_counters.create_index(
+            [("fair_share_pass", ASCENDING), ("key", ASCENDING)],
+            partialFilterExpression={"queued": {"$gt": 0}},
+        )
+        if self.duration_stats is not None:
+            await self.duration_stats.ensure_indexes()
+        # Jobs queued before run_at existed are due as of their creation time.
+        await self.db.upload_jobs.update_many(
+            {"status": "queued", "run_at": {"$exists": False}},
+            [{"$set": {"run_at": "$created_at"}}],
+        )
+
+    @staticmethod
+    def _failed_bucket_key(moment: datetime) -> str:
+        floored = int(moment.timestamp()) // FAILED_BUCKET_SECONDS * FAILED_BUCKET_SECONDS
+        return datetime.fromtimestamp(floored, tz=timezone.utc).strftime("%Y%m%d%H%M")
+
+    async def record_status_change(
+        self,
+        previous_status: str | None,
+        next_status: str | None,
+        *,
+        count: int = 1,
+        user_id: str | None = None,
+        plan: str | None = None,
+        job_type: str | None = None,
+    ) -> None:
+        if job_type in self.uncounted_job_types:
+            # Only the lifetime terminal totals include uncounted job types.
+            previous_status = None if previous_status in ACTIVE_JOB_STATUSES else previous_status
+            next_status = None if next_status in ACTIVE_JOB_STATUSES else next_status
+            user_id = plan = None
+        if count <= 0 or previous_status == next_status:
+            return
+        increments: dict[str, int] = {}
+        if previous_status in COUNTED_JOB_STATUSES:
+            increments[f"status_counts.{previous_status}"] = -count
+        if next_status in COUNTED_JOB_STATUSES:
+            increments[f"status_counts.{next_status}"] = count
+        if next_status == "failed":
+            increments[f"failed_buckets.{self._failed_bucket_key(datetime.now(timezone.utc))}"] = count
+        active_delta = int(next_status in ACTIVE_JOB_STATUSES) - int(previous_status in ACTIVE_JOB_STATUSES)
+        queued_delta = int(next_status == "queued") - int(previous_status == "queued")
+        user_increments = {
+            field: delta * count
+            for field, delta in (("active", active_delta), ("queued", queued_delta))
+            if delta
+        }
+        try:
+            if increments:
+                await self.db.job_counters.update_one(
+                    {"key": STATUS_COUNTERS_KEY},
+                    {"$inc": increments},
+                    upsert=True,
+                )
+            if user_id and (user_increments or plan):
+                user_update: dict[str, Any] = {"$inc": user_increments} if user_increments else {}
+                if plan:
+                    user_update["$set"] = {"plan": plan}
+                await self.db.job_counters.update_one({"key": f"user:{user_id}"}, user_update, upsert=True)
+        except Exception as exc:
+            # Counters are advisory; reconcile_job_counters() repairs any drift.
+            self.logger.warning("Job counter update failed (%s -> %s): %s", previous_status, next_status, exc)
+
+    async def get_user_active_job_count(self, user_id: str) -> int:
+        doc = await self.db.job_counters.find_one({"key": f"user:{user_id}"}, {"_id": 0, "active": 1})
+        return max(0, int((doc or {}).get("active") or 0))
+
+    async def get_queue_stats(self) -> dict[str, Any]:
+        doc = await self.db.job_counters.find_one({"key": STATUS_COUNTERS_KEY}, {"_id": 0}) or {}
+        counts = doc.get("status_counts") or {}
+        now_dt = datetime.now(timezone.utc)
+        recent_cutoff = self._failed_bucket_key(now_dt - timedelta(hours=1))
+        prune_cutoff = self._failed_bucket_key(now_dt - timedelta(hours=2))
+        failed_buckets = doc.get("failed_buckets") or {}
+        failed_recent = sum(int(value or 0) for key, value in failed_buckets.items() if key >= recent_cutoff)
+        stale_buckets = [key for key in failed_buckets if key < prune_cutoff]
+        if stale_buckets:
+            await self.db.job_counters.update_one(
+                {"key": STATUS_COUNTERS_KEY},
+                {"$unset": {f"failed_buckets.{key}": "" for key in stale_buckets}},
+            )
+        oldest_queued = await self.db.upload_jobs.find_one(
+            {"status": "queued", "run_at": {"$lte": self.now_factory()}},
+            {"_id": 0, "created_at": 1, "run_at": 1, "type": 1},
+            sort=[("run_at", 1)],
+        )
+        return {
+            "queued": max(0, int(counts.get("queued") or 0)),
+            "processing": max(0, int(counts.get("processing") or 0)),
+            "succeeded": max(0, int(counts.get("succeeded") or 0)),
+            "failed": max(0, int(counts.get("failed") or 0)),
+            "failed_last_hour": failed_recent,
+            "oldest_queued_job": oldest_queued,
+        }
+
+    async def reconcile_active_counts(self) -> None:
+        active_filter: dict[str, Any] = {"status": {"$in": sorted(ACTIVE_JOB_STATUSES)}}
+        if self.uncounted_job_types:
+            active_filter["type"] = {"$nin": sorted(self.uncounted_job_types)}
+        rows = await self.db.upload_jobs.aggregate(
+            [
+                {"$match": active_filter},
+                {"$group": {"_id": {"user_id": "$user_id", "status": "$status"}, "count": {"$sum": 1}}},
+            ]
+        ).to_list(None)
+        totals = {status: 0 for status in sorted(ACTIVE_JOB_STATUSES)}
+        by_user: dict[str, dict[str, int]] = {}
+        for row in rows:
+            key = row.get("_id") or {}
+            status = str(key.get("status") or "")
+            count = int(row.get("count") or 0)
+            if status not in totals:
+                continue
+            totals[status] += count
+            if key.get("user_id"):
+                user_counts = by_user.setdefault(str(key["user_id"]), {"active": 0, "queued": 0})
+                user_counts["active"] += count
+                if status == "queued":
+                    user_counts["queued"] += count
+        await self.db.job_counters.update_one(
+            {"key": STATUS_COUNTERS_KEY},
+            {"$set": {f"status_counts.{status}": count for status, count in totals.items()}},
+            upsert=True,
+        )
+        await self.db.job_counters.update_many(
+            {"key": {"$regex": "^user:"}, "$or": [{"active": {"$ne": 0}}, {"queued": {"$gt": 0}}]},
+            {"$set": {"active": 0, "queued": 0}},
+        )
+        for user_id, user_counts in by_user.items():
+            await self.db.job_counters.update_one(
+                {"key": f"user:{user_id}"},
+                {"$set": user_counts},
+                upsert=True,
+            )
+
+    async def _reconcile_active_counts_after_bulk_change(self) -> None:
+        # Bulk writes do not say whose jobs moved, so rebuild the active counters.
+        try:
+            await self.reconcile_active_counts()
+        except Exception as exc:
+            self.logger.warning("Active job counter reconcile failed: %s", exc)
+
+    async def reconcile_job_counters(self) -> None:
+        rows = await self.db.upload_jobs.aggregate(
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        ).to_list(None)
+        counters_doc = await self.db.job_counters.find_one(
+            {"key": STATUS_COUNTERS_KEY},
+            {"_id": 0, "archived_counts": 1},
+        ) or {}
+        archived_counts = counters_doc.get("archived_counts") or {}
+        counts = {status: int(archived_counts.get(status) or 0) for status in COUNTED_JOB_STATUSES}
+        for row in rows:
+            status = str(row.get("_id") or "")
+            if status in counts:
+                counts[status] += int(row.get("count") or 0)
+        await self.db.job_counters.update_one(
+            {"key": STATUS_COUNTERS_KEY},
+            {"$set": {f"status_counts.{status}": count for status, count in counts.items()}},
+            upsert=True,
+        )
+        await self.reconcile_active_counts()
+
+    async def archive_finished_jobs(
+        self,
+        *,
+        older_than_seconds: float,
+        batch_size: int = 500,
+        max_batches: int = 20,
+    ) -> list[dict]:
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=float(older_than_seconds))).isoformat()
+        finished_filter = {"status": {"$in": sorted(TERMINAL_JOB_STATUSES)}, "updated_at": {"$lt": cutoff}}
+        batch_size = max(1, int(batch_size))
+        projection = {
+            "_id": 0,
+            **{field: 1 for field in ARCHIVED_JOB_FIELDS},
+            "upload_checkpoint": 1,
+            "payload.image_storage": 1,
+        }
+        archived: list[dict] = []
+        for _ in range(max(1, int(max_batches))):
+            docs = await self.db.upload_jobs.find(
+                finished_filter,
+                projection,
+                limit=batch_size,
+            ).to_list(batch_size)
+            if not docs:
+                break
+            archived_at = self.now_factory()
+            summaries = [
+                {**{field: doc[field] for field in ARCHIVED_JOB_FIELDS if field in doc}, "archived_at": archived_at}
+                for doc in docs
+            ]
+            try:
+                await self.db.upload_jobs_archive.insert_many(summaries, ordered=False)
+            except BulkWriteError as exc:
+                # Summaries copied by an interrupted earlier pass are already archived.
+                if any(error.get("code") != 11000 for error in exc.details.get("writeErrors") or []):
+                    raise
+            job_ids = [doc["id"] for doc in docs]
+            await self.db.upload_jobs.delete_many({"id": {"$in": job_ids}, **finished_filter})
+            archived_counts: dict[str, int] = {}
+            for doc in docs:
+                archived_counts[doc["status"]] = archived_counts.get(doc["status"], 0) + 1
+            # Lifetime totals survive reconcile_job_counters(), which only recounts the hot collection.
+            await self.db.job_counters.update_one(
+                {"key": STATUS_COUNTERS_KEY},
+                {"$inc": {f"archived_counts.{status}": count for status, count in archived_counts.items()}},
+                upsert=True,
+            )
+            archived.extend(docs)
+            if len(docs) < batch_size:
+                break
+        if archived:
+            self.logger.info("Archived %s finished job(s) last updated before %s", len(archived), cutoff)
+        return archived
+
+    async def get_archived_job(self, job_id: str, *, user_id: str | None = None) -> dict | None:
+        query: dict[str, Any] = {"id": job_id}
+        if user_id is not None:
+            query["user_id"] = user_id
+        return await self.db.upload_jobs_archive.find_one(query, {"_id": 0})
+
+    def _fair_share_weight(self, plan: str | None) -> float:
+        weights = self.fair_share_weights or {}
+        return weights.get(str(plan or "free"), weights.get("free", 1.0))
+
+    async def _fair_share_candidates(self, exclude_user_ids: list[str]) -> list[tuple[str, float, float]]:
+        counter_filter: dict[str, Any] = {"queued": {"$gt": 0}}
+        if exclude_user_ids:
+            counter_filter["key"] = {"$nin": [f"user:{user_id}" for user_id in exclude_user_ids]}
+        docs = await self.db.job_counters.find(
+            counter_filter,
+            {"_id": 0, "key": 1, "fair_share_pass": 1, "plan": 1},
+            sort=[("fair_share_pass", ASCENDING), ("key", ASCENDING)],
+            limit=FAIR_SHARE_CANDIDATES,
+        ).to_list(FAIR_SHARE_CANDIDATES)
+        if not docs:
+            return []
+        clock_doc = await self.db.job_counters.find_one(
+            {"key": STATUS_COUNTERS_KEY},
+            {"_id": 0, "fair_share_clock": 1},
+        )
+        clock = float((clock_doc or {}).get("fair_share_clock") or 0.0)
+        candidates = []
+        for doc in docs:
+            key = str(doc.get("key") or "")
+            if not key.startswith("user:"):
+                continue
+            # A user returning from idle starts at the shared clock instead of cashing in idle time.
+            start_tag = max(float(doc.get("fair_share_pass") or 0.0), clock)
+            candidates.append((key[len("user:"):], start_tag, self._fair_share_weight(doc.get("plan"))))
+        return candidates
+
+    def _fair_share_skipped(self, miss_scope: str) -> list[str]:
+        now = time.monotonic()
+        for user_id, (_, retry_at) in list(self._fair_share_misses.items()):
+            if retry_at <= now:
+                del self._fair_share_misses[user_id]
+        return sorted(user_id for user_id, (scope, _) in self._fair_share_misses.items() if scope == miss_scope)
+
+    async def _charge_fair_share(self, user_id: str, start_tag: float, weight: float) -> None:
+        try:
+            await self.db.job_counters.update_one(
+                {"key": f"user:{user_id}"},
+                {"$max": {"fair_share_pass": start_tag + 1.0 / weight}},
+                upsert=True,
+            )
+            await self.db.job_counters.update_one(
+                {"key": STATUS_COUNTERS_KEY},
+                {"$max": {"fair_share_clock": start_tag}},
+                upsert=True,
+            )
+        except Exception as exc:
+            self.logger.warning("Fair-share accounting failed for user %s: %s", user_id, exc)
+
+    async def claim_next_job(self, claim_filter: dict[str, Any] | None = None) -> dict | None:
+        claim_filter = claim_filter or {"status": "queued"}
         now = self.now_factory()
-        return await self.db.upload_jobs.find_one_and_update(
-            {"status": "queued"},
+        due_filter = {**claim_filter, "run_at": {"$lte": now}}
+        if self.fair_share_weights:
+            try:
+                # The head of the queue fixes the priority tier; fair share only orders users within it.
+                head = await self.db.upload_jobs.find_one(
+                    due_filter,
+                    {"_id": 0, "priority": 1},
+                    sort=[("priority", 1), ("created_at", 1)],
+                )
+                priority = (head or {}).get("priority", 1)
+                miss_scope = repr((claim_filter, priority))
+                candidates = await self._fair_share_candidates(self._fair_share_skipped(miss_scope)) if head else []
+            except Exception as exc:
+                self.logger.warning("Fair-share ordering failed, claiming in FIFO order: %s", exc)
+                candidates = []
+            for user_id, start_tag, weight in candidates:
+                job = await self._claim_job({**due_filter, "user_id": user_id, "priority": priority})
+                if job:
+                    self._fair_share_misses.pop(user_id, None)
+                    await self._charge_fair_share(user_id, start_tag, weight)
+                    return job
+                # Queued jobs that are not due yet, or not claimable by this worker right now.
+                self._fair_share_misses[user_id] = (miss_scope, time.monotonic() + FAIR_SHARE_MISS_RETRY_SECONDS)
+        job = await self._claim_job(due_filter)
+        if job is None:
+            job = await self._claim_prerender_job(claim_filter, now)
+        return job
+
+    async def _claim_prerender_job(self, claim_filter: dict[str, Any], now: str) -> dict | None:
+        now_dt = self._parse_iso_timestamp(now)
+        if not self.prerender_job_types or self.prerender_ahead_seconds <= 0 or now_dt is None:
+            return None
+        horizon = (now_dt + timedelta(seconds=self.prerender_ahead_seconds)).isoformat()
+        return await self._claim_job(
+            {"$and": [
+                claim_filter,
+                {
+                    "type": {"$in": sorted(self.prerender_job_types)},
+                    "run_at": {"$gt": now, "$lte": horizon},
+                    "prerendered": {"$ne": True},
+                },
+            ]},
+            sort=[("run_at", 1)],
+        )
+
+    async def defer_until_run_at(self, job_id: str, *, message: str) -> bool:
+        self.discard_job_updates(job_id)
+        now = self.now_factory()
+        fields = {
+            "status": "queued",
+            "stage": "scheduled",
+            "message": message,
+            "prerendered": True,
+            "stage_started_at": now,
+            "last_heartbeat_at": now,
+            "updated_at": now,
+        }
+        previous = await self.db.upload_jobs.find_one_and_update(
+            {"id": job_id, "status": "processing", "worker_id": self.worker_id},
+            {"$set": fields, "$unset": {"worker_id": "", "lease_expires_at": ""}},
+            projection={"_id": 0, "user_id": 1, "type": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if not previous:
+            return False
+        await self.record_status_change(
+            "processing",
+            "queued",
+            user_id=previous.get("user_id"),
+            job_type=previous.get("type"),
+        )
+        self._publish_job_update(job_id, fields)
+        return True
+
+    async def _claim_job(
+        self,
+        claim_filter: dict[str, Any],
+        *,
+        sort: list[tuple[str, int]] | None = None,
+    ) -> dict | None:
+        now = self.now_factory()
+        job = await self.db.upload_jobs.find_one_and_update(
+            claim_filter,
             {"$set": {
                 "status": "processing",
                 "progress": 5,
@@ -149,29 +901,42 @@ class BackgroundJobService:
                 "updated_at": now,
                 "started_at": now,
                 "worker_id": self.worker_id,
+                "lease_expires_at": self._lease_expiry(),
             }},
-            sort=[("priority", 1), ("created_at", 1)],
+            sort=sort or [("priority", 1), ("created_at", 1)],
             return_document=ReturnDocument.AFTER,
         )
+        if job:
+            await self.record_status_change("queued", "processing", user_id=job.get("user_id"), job_type=job.get("type"))
+            self._publish_job_update(str(job.get("id") or ""), job)
+        return job
 
     async def requeue_stale_jobs(self) -> None:
         cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.stale_after_seconds)).isoformat()
         now = self.now_factory()
-        await self.db.upload_jobs.update_many(
+        result = await self.db.upload_jobs.update_many(
             {
                 "status": "processing",
                 "updated_at": {"$lt": cutoff},
             },
-            {"$set": {
-                "status": "queued",
-                "progress": 0,
-                "message": "Job requeued after worker restart.",
-                "stage": "queued",
-                "stage_started_at": now,
-                "last_heartbeat_at": now,
-                "updated_at": now,
-            }},
+            {
+                "$set": {
+                    "status": "queued",
+                    "progress": 0,
+                    "message": "Job requeued after worker restart.",
+                    "stage": "queued",
+                    "stage_started_at": now,
+                    "last_heartbeat_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"worker_id": "", "lease_expires_at": ""},
+            },
         )
+        requeued = int(getattr(result, "modified_count", 0) or 0)
+        if requeued:
+            await self.record_status_change("processing", "queued", count=requeued)
+            await self._reconcile_active_counts_after_bulk_change()
+            self.notify_job_available()
 
     async def touch_heartbeat(
         self,
@@ -188,6 +953,18 @@ class BackgroundJobService:
             extra_updates={"last_heartbeat_at": self.now_factory()},
         )
 
+    async def renew_lease(self, job_id: str) -> dict | None:
+        now = self.now_factory()
+        return await self.db.upload_jobs.find_one_and_update(
+            {"id": job_id, "status": "processing", "worker_id": self.worker_id},
+            {"$set": {
+                "lease_expires_at": self._lease_expiry(),
+                "last_heartbeat_at": now,
+            }},
+            projection={"_id": 0, "id": 1, "status": 1, "stage": 1, "cancel_requested": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
     async def get_job(self, job_id: str) -> dict | None:
         return await self.db.upload_jobs.find_one({"id": job_id}, {"_id": 0})
 
@@ -203,6 +980,97 @@ class BackgroundJobService:
             return None
         return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
+    async def reclaim_expired_leases(self, *, worker_dead_seconds: int | None = None) -> dict[str, int]:
+        now_dt = datetime.now(timezone.utc)
+        now_iso = now_dt.isoformat()
+        heartbeat_cutoff = (now_dt - timedelta(seconds=int(worker_dead_seconds or self.lease_seconds))).isoformat()
+        expired_filter: dict[str, Any] = {
+            "status": "processing",
+            "$or": [
+                {"lease_expires_at": {"$lt": now_iso}},
+                # Jobs claimed before leases existed only carry a heartbeat timestamp.
+                {"lease_expires_at": {"$exists": False}, "last_heartbeat_at": {"$lt": heartbeat_cutoff}},
+            ],
+        }
+        now = self.now_factory()
+        requeue_result = await self.db.upload_jobs.update_many(
+            {**expired_filter, "$expr": {"$lt": [{"$ifNull": ["$attempts", 0]}, {"$ifNull": ["$max_attempts", 1]}]}},
+            {
+                "$set": {
+                    "status": "queued",
+                    "progress": 0,
+                    "message": "Requeued after worker lease expired.",
+                    "stage": "queued",
+                    "stage_started_at": now,
+                    "updated_at": now,
+                    "last_heartbeat_at": now,
+                    "error_code": None,
+                    "failed_stage": None,
+                },
+                # No owner while queued, so the worker that lost the lease cannot mistake it for its own.
+                "$unset": {"worker_id": "", "lease_expires_at": ""},
+                "$inc": {"attempts": 1},
+            },
+        )
+        # Pipeline update so failed_stage can copy each job's own stage in the same bulk write.
+        fail_result = await self.db.upload_jobs.update_many(
+            {**expired_filter, "$expr": {"$gte": [{"$ifNull": ["$attempts", 0]}, {"$ifNull": ["$max_attempts", 1]}]}},
+            [
+                {
+                    "$set": {
+                        "status": "failed",
+                        "progress": 100,
+                        "message": "Job failed after watchdog timeout.",
+                        "error": "Job timed out: worker heartbeat lost.",
+                        "error_code": "JOB_TIMEOUT",
+                        "failed_stage": "$stage",
+                        "updated_at": now,
+                        "last_heartbeat_at": now,
+                        "failed_at": now,
+                    }
+                },
+                {"$unset": ["worker_id", "lease_expires_at"]},
+            ],
+        )
+        requeued = int(getattr(requeue_result, "modified_count", 0) or 0)
+        failed = int(getattr(fail_result, "modified_count", 0) or 0)
+        if requeued:
+            await self.record_status_change("processing", "queued", count=requeued)
+            self.notify_job_available()
+            self.logger.warning("Watchdog requeued %s job(s) with expired worker leases", requeued)
+        if failed:
+            await self.record_status_change("processing", "failed", count=failed)
+        if requeued or failed:
+            await self._reconcile_active_counts_after_bulk_change()
+        if failed:
+            self.logger.error("Watchdog failed %s job(s) with expired worker leases", failed)
+        return {"requeued": requeued, "failed": failed}
+
+    async def _find_stage_overdue_jobs(
+        self,
+        *,
+        now_dt: datetime,
+        default_timeout_seconds: int,
+        stage_timeouts: dict[str, int],
+    ) -> list[dict]:
+        clauses: list[dict[str, Any]] = [
+            {
+                "stage": stage,
+                "stage_started_at": {"$lt": (now_dt - timedelta(seconds=int(timeout))).isoformat()},
+            }
+            for stage, timeout in stage_timeouts.items()
+        ]
+        clauses.append(
+            {
+                "stage": {"$nin": list(stage_timeouts)},
+                "stage_started_at": {"$lt": (now_dt - timedelta(seconds=int(default_timeout_seconds))).isoformat()},
+            }
+        )
+        return await self.db.upload_jobs.find(
+            {"status": "processing", "$or": clauses},
+            {"_id": 0},
+        ).to_list(None)
+
     async def run_watchdog_pass(
         self,
         *,
@@ -211,18 +1079,34 @@ class BackgroundJobService:
         worker_dead_seconds: int | None = None,
     ) -> dict[str, int]:
         now_dt = datetime.now(timezone.utc)
-        processing_jobs = await self.db.upload_jobs.find(
-            {"status": "processing"},
-            {"_id": 0},
-        ).to_list(None)
-        requeued = 0
-        failed = 0
         stage_timeouts = stage_timeouts or {}
         worker_dead_seconds = int(worker_dead_seconds or self.stale_after_seconds)
+        reclaimed = await self.reclaim_expired_leases(worker_dead_seconds=worker_dead_seconds)
+        requeued = reclaimed["requeued"]
+        failed = reclaimed["failed"]
+        stats = self.duration_stats
+        # The query uses the shorter of the learned and static timeouts so no candidate is missed.
+        query_timeouts = dict(stage_timeouts)
+        if stats is not None:
+            await stats.refresh()
+            for stage, learned_timeout in stats.shortest_stage_timeouts().items():
+                query_timeouts[stage] = min(learned_timeout, int(query_timeouts.get(stage) or default_timeout_seconds))
+        overdue_jobs = await self._find_stage_overdue_jobs(
+            now_dt=now_dt,
+            default_timeout_seconds=default_timeout_seconds,
+            stage_timeouts=query_timeouts,
+        )
 
-        for job in processing_jobs:
+        for job in overdue_jobs:
             stage = str(job.get("stage") or "").strip() or "unknown"
             timeout_seconds = int(stage_timeouts.get(stage) or default_timeout_seconds)
+            if stats is not None:
+                timeout_seconds = stats.stage_timeout(
+                    job.get("type"),
+                    stage,
+                    job.get("duration_features"),
+                    fallback=timeout_seconds,
+                )
             per_job_timeout = job.get("render_timeout_seconds")
             if stage == "ffmpeg_render" and per_job_timeout is not None:
                 try:
@@ -234,24 +1118,21 @@ class BackgroundJobService:
                 or self._parse_iso_timestamp(job.get("started_at"))
                 or self._parse_iso_timestamp(job.get("updated_at"))
             )
-            last_heartbeat = (
-                self._parse_iso_timestamp(job.get("last_heartbeat_at"))
-                or self._parse_iso_timestamp(job.get("updated_at"))
-            )
             if stage_started is None:
                 continue
-
-            stage_elapsed = (now_dt - stage_started).total_seconds()
-            heartbeat_stale = (
-                last_heartbeat is not None
-                and (now_dt - last_heartbeat).total_seconds() > worker_dead_seconds
-            )
-            if stage_elapsed <= timeout_seconds and not heartbeat_stale:
+            if (now_dt - stage_started).total_seconds() <= timeout_seconds:
                 continue
 
+            lease_expires = self._parse_iso_timestamp(job.get("lease_expires_at"))
+            last_heartbeat = self._parse_iso_timestamp(job.get("last_heartbeat_at"))
+            lease_alive = (
+                lease_expires > now_dt
+                if lease_expires is not None
+                else last_heartbeat is not None and (now_dt - last_heartbeat).total_seconds() <= worker_dead_seconds
+            )
             job_worker_id = str(job.get("worker_id") or "").strip()
-            if job_worker_id and job_worker_id == self.worker_id and not heartbeat_stale:
-                # Same in-process worker is still running (fresh heartbeats); do not requeue mid-encode.
+            if job_worker_id and job_worker_id == self.worker_id and lease_alive:
+                # Same in-process worker is still running (lease renewed); do not requeue mid-encode.
                 continue
 
             attempts = int(job.get("attempts") or 0)
@@ -261,11 +1142,7 @@ class BackgroundJobService:
                 "status": "processing",
                 "updated_at": job.get("updated_at"),
             }
-            timeout_reason = (
-                "worker heartbeat lost"
-                if heartbeat_stale and stage_elapsed <= timeout_seconds
-                else f"stage '{stage}' exceeded {timeout_seconds}s"
-            )
+            timeout_reason = f"stage '{stage}' exceeded {timeout_seconds}s"
             if attempts < max_attempts:
                 result = await self.db.upload_jobs.update_one(
                     update_filter,
@@ -278,15 +1155,22 @@ class BackgroundJobService:
                             "stage_started_at": self.now_factory(),
                             "updated_at": self.now_factory(),
                             "last_heartbeat_at": self.now_factory(),
-                            "worker_id": self.worker_id,
                             "error_code": None,
                             "failed_stage": None,
                         },
+                        "$unset": {"worker_id": "", "lease_expires_at": ""},
                         "$inc": {"attempts": 1},
                     },
                 )
                 if getattr(result, "modified_count", 0):
                     requeued += 1
+                    await self.record_status_change(
+                        "processing",
+                        "queued",
+                        user_id=job.get("user_id"),
+                        job_type=job.get("type"),
+                    )
+                    self.notify_job_available()
                     self.logger.warning(
                         "Watchdog requeued job %s (%s): %s",
                         job.get("id"),
@@ -307,12 +1191,18 @@ class BackgroundJobService:
                             "updated_at": self.now_factory(),
                             "last_heartbeat_at": self.now_factory(),
                             "failed_at": self.now_factory(),
-                            "worker_id": self.worker_id,
-                        }
+                        },
+                        "$unset": {"worker_id": "", "lease_expires_at": ""},
                     },
                 )
                 if getattr(result, "modified_count", 0):
                     failed += 1
+                    await self.record_status_change(
+                        "processing",
+                        "failed",
+                        user_id=job.get("user_id"),
+                        job_type=job.get("type"),
+                    )
                     self.logger.error(
                         "Watchdog failed job %s (%s): %s",
                         job.get("id"),
@@ -330,25 +1220,36 @@ class BackgroundJobService:
         failed_stage: str,
         message: str = "Job failed.",
     ) -> bool:
+        self.discard_job_updates(job_id)
         now = self.now_factory()
-        result = await self.db.upload_jobs.update_one(
+        failed_fields = {
+            "status": "failed",
+            "progress": 100,
+            "message": message,
+            "error": error,
+            "error_code": error_code,
+            "failed_stage": failed_stage,
+            "failed_at": now,
+            "updated_at": now,
+            "last_heartbeat_at": now,
+            "worker_id": self.worker_id,
+        }
+        previous = await self.db.upload_jobs.find_one_and_update(
             {"id": job_id, "status": "processing"},
-            {
-                "$set": {
-                    "status": "failed",
-                    "progress": 100,
-                    "message": message,
-                    "error": error,
-                    "error_code": error_code,
-                    "failed_stage": failed_stage,
-                    "failed_at": now,
-                    "updated_at": now,
-                    "last_heartbeat_at": now,
-                    "worker_id": self.worker_id,
-                }
-            },
+            {"$set": failed_fields},
+            projection={"_id": 0, "user_id": 1, "type": 1},
+            return_document=ReturnDocument.BEFORE,
         )
-        return bool(getattr(result, "modified_count", 0))
+        if not previous:
+            return False
+        await self.record_status_change(
+            "processing",
+            "failed",
+            user_id=previous.get("user_id"),
+            job_type=previous.get("type"),
+        )
+        self._publish_job_update(job_id, failed_fields)
+        return True
 
     async def process_job(self, job: dict) -> None:
         job_type = str(job.get("type") or "").strip()
@@ -376,6 +1277,8 @@ class BackgroundJobService:
             job.get("stage"),
             job.get("progress"),
         )
+        self._cancel_events[job_id] = threading.Event()
+        self._start_stage_clock(job)
         try:
             await handler(job)
         except Exception as exc:
@@ -393,9 +1296,17 @@ class BackgroundJobService:
                 failed_stage=str(job.get("stage") or "unknown"),
             )
             return
+        finally:
+            self._cancel_events.pop(job_id, None)
+            self._stage_clocks.pop(job_id, None)
 
+        await self.flush_job_updates(job_id)
         refreshed = await self.get_job(job_id)
-        if refreshed and refreshed.get("status") == "processing":
+        if (
+            refreshed
+            and refreshed.get("status") == "processing"
+            and refreshed.get("worker_id") in (None, self.worker_id)
+        ):
             self.logger.error(
                 "Job %s (%s) handler returned while still processing at stage=%s progress=%s",
                 job_id,
@@ -410,46 +1321,211 @@ class BackgroundJobService:
                 failed_stage=str(refreshed.get("stage") or "unknown"),
             )
 
-    async def worker_loop(self) -> None:
+    async def _run_job_in_slot(self, job: dict, group: str) -> None:
+        try:
+            await self.process_job(job)
+        finally:
+            self._slot_usage[group] = max(0, self._slot_usage.get(group, 0) - 1)
+            self._slot_released.set()
+
+    def _start_job_task(self, job: dict) -> asyncio.Task:
+        group = self.slot_group_for(job.get("type"))
+        self._slot_usage[group] = self._slot_usage.get(group, 0) + 1
+        task = asyncio.create_task(self._run_job_in_slot(job, group))
+        self._active_tasks.add(task)
+        task.add_done_callback(self._active_tasks.discard)
+        job_id = str(job.get("id") or "")
+        self._job_tasks[job_id] = task
+        task.add_done_callback(
+            lambda done, key=job_id: self._job_tasks.pop(key, None) if self._job_tasks.get(key) is done else None
+        )
+        return task
+
+    @classmethod
+    def _estimate_remaining_seconds(cls, job_doc: dict, now: datetime) -> float | None:
+        encode_progress = cls._optional_int_field(job_doc, "encode_progress")
+        stage_started_at = cls._parse_iso_timestamp(job_doc.get("stage_started_at"))
+        if job_doc.get("stage") not in ENCODE_STAGES or not encode_progress or stage_started_at is None:
+            return None
+        elapsed = max(0.0, (now - stage_started_at).total_seconds())
+        return elapsed * (100 - min(100, encode_progress)) / encode_progress
+
+    async def hand_off_jobs(self, job_ids: list[str]) -> int:
+        if not job_ids:
+            return 0
+        now = self.now_factory()
+        result = await self.db.upload_jobs.update_many(
+            {"id": {"$in": job_ids}, "status": "processing", "worker_id": self.worker_id},
+            {
+                "$set": {
+                    "status": "queued",
+                    "stage": "queued",
+                    "message": "Worker restarting; job requeued to resume on another worker.",
+                    "stage_started_at": now,
+                    "last_heartbeat_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"worker_id": "", "lease_expires_at": ""},
+            },
+        )
+        handed_off = int(getattr(result, "modified_count", 0) or 0)
+        for job_id in job_ids:
+            self.discard_job_updates(job_id)
+            self.request_local_cancel(job_id)
+        if handed_off:
+            await self.record_status_change("processing", "queued", count=handed_off)
+            await self._reconcile_active_counts_after_bulk_change()
+        return handed_off
+
+    async def drain(self, *, grace_seconds: float) -> dict[str, int]:
+        self.draining = True
+        running = dict(self._job_tasks)
+        summary = {"finished": 0, "handed_off": 0}
+        if not running:
+            return summary
+        now = datetime.now(timezone.utc)
+        long_job_ids: list[str] = []
+        try:
+            docs = await self.db.upload_jobs.find(
+                {"id": {"$in": list(running)}},
+                {"_id": 0, "id": 1, "stage": 1, "stage_started_at": 1, "encode_progress": 1},
+            ).to_list(len(running))
+            for doc in docs:
+                remaining = self._estimate_remaining_seconds(doc, now)
+                if remaining is not None and remaining > grace_seconds:
+                    long_job_ids.append(str(doc.get("id")))
+        except Exception as exc:
+            self.logger.warning("Drain could not estimate remaining job time: %s", exc)
+        if long_job_ids:
+            summary["handed_off"] += await self.hand_off_jobs(long_job_ids)
+        _done, pending = await asyncio.wait(set(running.values()), timeout=max(0.0, grace_seconds))
+        leftover_ids = [job_id for job_id, task in running.items() if task in pending and job_id not in long_job_ids]
+        if leftover_ids:
+            summary["handed_off"] += await self.hand_off_jobs(leftover_ids)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        summary["finished"] = sum(
+            1 for job_id, task in running.items() if task not in pending and job_id not in long_job_ids
+        )
+        await self.flush_all_job_updates()
+        self.logger.info(
+            "Worker %s drained: finished=%s handed_off=%s",
+            self.worker_id,
+            summary["finished"],
+            summary["handed_off"],
+        )
+        return summary
+
+    async def _wait_for_free_slot(self) -> None:
+        self._slot_released.clear()
+        try:
+            await asyncio.wait_for(self._slot_released.wait(), timeout=self.poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _seconds_until_next_run_at(self, claim_filter: dict[str, Any] | None = None) -> float | None:
+        now = self.now_factory()
+        try:
+            doc = await self.db.upload_jobs.find_one(
+                {**(claim_filter or {"status": "queued"}), "run_at": {"$gt": now}},
+                {"_id": 0, "run_at": 1},
+                sort=[("run_at", 1)],
+            )
+        except Exception as exc:
+            self.logger.warning("Next run_at lookup failed: %s", exc)
+            return None
+        run_at = self._parse_iso_timestamp((doc or {}).get("run_at"))
+        now_dt = self._parse_iso_timestamp(now)
+        if run_at is None or now_dt is None:
+            return None
+        return max(0.0, (run_at - now_dt).total_seconds())
+
+    async def _wait_for_job_available(self, claim_filter: dict[str, Any] | None = None) -> None:
+        timeout = self.poll_interval_seconds
+        next_due = await self._seconds_until_next_run_at(claim_filter)
+        if next_due is not None:
+            timeout = max(0.05, min(timeout, next_due))
+        try:
+            await asyncio.wait_for(self._job_available.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def watch_queue_changes(self) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [
+                        {"operationType": "insert"},
+                        {"operationType": "update", "updateDescription.updatedFields.status": "queued"},
+                    ]
+                }
+            }
+        ]
         while True:
             try:
-                job = await self.claim_next_job()
-                if not job:
-                    await asyncio.sleep(self.poll_interval_seconds)
-                    continue
-                self.logger.info(
-                    "Worker claimed job id=%s type=%s user_id=%s",
-                    job.get("id"),
-                    job.get("type"),
-                    job.get("user_id"),
-                )
-                try:
-                    from pathlib import Path
-                    import json
-                    import time as _time
-
-                    payload = {
-                        "sessionId": "d4a8d0",
-                        "hypothesisId": "H5",
-                        "location": "background_jobs.py:worker_loop",
-                        "message": "worker claimed job",
-                        "data": {
-                            "job_id": job.get("id"),
-                            "type": job.get("type"),
-                            "status": job.get("status"),
-                            "progress": job.get("progress"),
-                        },
-                        "timestamp": int(_time.time() * 1000),
-                        "runId": "worker-media",
-                    }
-                    log_path = Path(__file__).resolve().parent.parent.parent / "debug-d4a8d0.log"
-                    with log_path.open("a", encoding="utf-8") as debug_file:
-                        debug_file.write(json.dumps(payload, default=str) + "\n")
-                except Exception:
-                    pass
-                await self.process_job(job)
+                async with self.db.upload_jobs.watch(pipeline) as stream:
+                    self.logger.info("Job queue change stream opened; workers wake on new jobs")
+                    async for _change in stream:
+                        self.notify_job_available()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as exc:
+                self.logger.info("Job queue change stream unavailable (%s); using polling fallback", exc)
+                return
+            except Exception as exc:
+                self.logger.warning("Job queue change stream error: %s", exc)
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def watch_cancel_requests(self) -> None:
+        pipeline = [
+            {"$match": {"operationType": "update", "updateDescription.updatedFields.cancel_requested": True}}
+        ]
+        while True:
+            try:
+                async with self.db.upload_jobs.watch(pipeline, full_document="updateLookup") as stream:
+                    self.logger.info("Job cancel change stream opened; running jobs stop on cancel")
+                    async for change in stream:
+                        job_id = str((change.get("fullDocument") or {}).get("id") or "")
+                        if job_id:
+                            self.request_local_cancel(job_id)
             except asyncio.CancelledError:
                 raise
+            except OperationFailure as exc:
+                self.logger.info("Job cancel change stream unavailable (%s); cancels arrive with lease renewals", exc)
+                return
             except Exception as exc:
-                self.logger.error(f"Background job worker loop error: {str(exc)}")
+                self.logger.warning("Job cancel change stream error: %s", exc)
                 await asyncio.sleep(self.poll_interval_seconds)
+
+    async def worker_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    claim_filter = self._claim_filter()
+                    if claim_filter is None:
+                        await self._wait_for_free_slot()
+                        continue
+                    # Clear before claiming so a job inserted mid-claim still wakes the next wait.
+                    self._job_available.clear()
+                    job = await self.claim_next_job(claim_filter)
+                    if not job:
+                        await self._wait_for_job_available(claim_filter)
+                        continue
+                    self.logger.info(
+                        "Worker claimed job id=%s type=%s user_id=%s slot_group=%s",
+                        job.get("id"),
+                        job.get("type"),
+                        job.get("user_id"),
+                        self.slot_group_for(job.get("type")),
+                    )
+                    self._start_job_task(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    self.logger.error(f"Background job worker loop error: {str(exc)}")
+                    await asyncio.sleep(self.poll_interval_seconds)
+        finally:
+            for task in list(self._active_tasks):
+                task.cancel()
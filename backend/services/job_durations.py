@@ -0,0 +1,160 @@
+"""Learned job stage durations: rolling samples per (job type, stage, input features)."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from pymongo import ASCENDING
+
+
+# Pseudo-stages recorded alongside real stages: time from due to claim, and claim to success.
+QUEUE_WAIT_STAGE = "_queue_wait"
+TOTAL_RUN_STAGE = "_total"
+FEATURE_LEVELS = (("fps", "visual"), ("fps", "visual", "audio"))
+
+
+def audio_duration_bucket(seconds: Any) -> int | None:
+    try:
+        value = float(seconds)
+    except (TypeError, ValueError):
+        return None
+    if value <= 0:
+        return None
+    return max(1, math.ceil(value / 60.0))
+
+
+def feature_keys(features: dict[str, Any] | None) -> list[str]:
+    """Feature keys from most general to most specific."""
+    features = features or {}
+    keys = [""]
+    for level in FEATURE_LEVELS:
+        if any(features.get(name) in (None, "") for name in level):
+            break
+        keys.append("|".join(f"{name}={features[name]}" for name in level))
+    return keys
+
+
+def _percentile(sorted_samples: list[float], quantile: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(quantile * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+class JobDurationStats:
+    def __init__(
+        self,
+        *,
+        db,
+        logger: logging.Logger,
+        sample_limit: int = 200,
+        min_samples: int = 20,
+        cache_seconds: float = 60.0,
+        timeout_multiplier: float = 3.0,
+        min_timeout_seconds: int = 120,
+        max_timeout_seconds: int = 14400,
+        monotonic: Callable[[], float] | None = None,
+    ) -> None:
+        self.db = db
+        self.logger = logger
+        self.sample_limit = max(1, int(sample_limit))
+        self.min_samples = max(1, int(min_samples))
+        self.cache_seconds = max(0.0, float(cache_seconds))
+        self.timeout_multiplier = max(1.0, float(timeout_multiplier))
+        self.min_timeout_seconds = max(1, int(min_timeout_seconds))
+        self.max_timeout_seconds = max(self.min_timeout_seconds, int(max_timeout_seconds))
+        self.monotonic = monotonic or time.monotonic
+        self._samples: dict[tuple[str, str, str], list[float]] = {}
+        self._loaded_at: float | None = None
+
+    async def ensure_indexes(self) -> None:
+        await self.db.job_stage_durations.create_index([("key", ASCENDING)], unique=True)
+
+    async def record(
+        self,
+        job_type: str,
+        stage: str,
+        seconds: float,
+        features: dict[str, Any] | None = None,
+    ) -> None:
+        if not job_type or not stage or seconds < 0:
+            return
+        sample = round(float(seconds), 3)
+        now = datetime.now(timezone.utc).isoformat()
+        for feature_key in feature_keys(features):
+            cache_key = (job_type, stage, feature_key)
+            cached = self._samples.setdefault(cache_key, [])
+            cached.append(sample)
+            cached.sort()
+            try:
+                await self.db.job_stage_durations.update_one(
+                    {"key": "|".join(cache_key)},
+                    {
+                        "$push": {"samples": {"$each": [sample], "$slice": -self.sample_limit}},
+                        "$set": {"job_type": job_type, "stage": stage, "features": feature_key, "updated_at": now},
+                    },
+                    upsert=True,
+                )
+            except Exception as exc:
+                self.logger.warning("Job duration sample write failed key=%s: %s", "|".join(cache_key), exc)
+                return
+
+    async def refresh(self, *, force: bool = False) -> None:
+        now = self.monotonic()
+        if not force and self._loaded_at is not None and now - self._loaded_at < self.cache_seconds:
+            return
+        self._loaded_at = now
+        try:
+            docs = await self.db.job_stage_durations.find(
+                {},
+                {"_id": 0, "job_type": 1, "stage": 1, "features": 1, "samples": 1},
+            ).to_list(None)
+        except Exception as exc:
+            self.logger.warning("Job duration stats refresh failed: %s", exc)
+            return
+        samples: dict[tuple[str, str, str], list[float]] = {}
+        for doc in docs:
+            values = sorted(float(value) for value in (doc.get("samples") or []) if value is not None)
+            if values:
+                samples[(str(doc.get("job_type") or ""), str(doc.get("stage") or ""), str(doc.get("features") or ""))] = values
+        self._samples = samples
+
+    def percentile(
+        self,
+        job_type: str | None,
+        stage: str | None,
+        quantile: float,
+        features: dict[str, Any] | None = None,
+    ) -> float | None:
+        for feature_key in reversed(feature_keys(features)):
+            samples = self._samples.get((str(job_type or ""), str(stage or ""), feature_key)) or []
+            if len(samples) >= self.min_samples:
+                return _percentile(samples, quantile)
+        return None
+
+    def _clamp_timeout(self, p99: float) -> int:
+        return int(min(self.max_timeout_seconds, max(self.min_timeout_seconds, math.ceil(p99 * self.timeout_multiplier))))
+
+    def stage_timeout(
+        self,
+        job_type: str | None,
+        stage: str | None,
+        features: dict[str, Any] | None = None,
+        *,
+        fallback: int,
+    ) -> int:
+        p99 = self.percentile(job_type, stage, 0.99, features)
+        if p99 is None:
+            return int(fallback)
+        return self._clamp_timeout(p99)
+
+    def shortest_stage_timeouts(self) -> dict[str, int]:
+        shortest: dict[str, int] = {}
+        for (_job_type, stage, _feature_key), samples in self._samples.items():
+            if stage.startswith("_") or len(samples) < self.min_samples:
+                continue
+            timeout = self._clamp_timeout(_percentile(samples, 0.99))
+            shortest[stage] = min(timeout, shortest.get(stage, timeout))
+        return shortest
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from pymongo.errors import OperationFailure
+
+
+JOB_EVENT_SNAPSHOT = "snapshot"
+JOB_EVENT_DELTA = "delta"
+
+
+class JobEventHub:
+    """In-process fan-out of job progress to SSE watchers."""
+
+    def __init__(
+        self,
+        *,
+        db,
+        logger: logging.Logger,
+        sanitize_job_doc: Callable[[dict | None], dict | None],
+        queue_size: int = 32,
+        resync_interval_seconds: float = 30.0,
+    ) -> None:
+        self.db = db
+        self.logger = logger
+        self.sanitize_job_doc = sanitize_job_doc
+        self.queue_size = max(2, int(queue_size))
+        self.resync_interval_seconds = max(1.0, float(resync_interval_seconds))
+        self._docs: dict[str, dict[str, Any]] = {}
+        self._sent: dict[str, dict[str, Any]] = {}
+        self._object_ids: dict[Any, str] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._load_locks: dict[str, asyncio.Lock] = {}
+
+    def watched_job_count(self) -> int:
+        return len(self._subscribers)
+
+    def watcher_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def _load(self, job_id: str) -> dict | None:
+        lock = self._load_locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            if job_id not in self._docs:
+                doc = await self.db.upload_jobs.find_one({"id": job_id}, {"payload": 0})
+                if not doc:
+                    return None
+                self._remember(job_id, doc)
+        return self._docs.get(job_id)
+
+    def _remember(self, job_id: str, doc: dict) -> None:
+        object_id = doc.get("_id")
+        if object_id is not None:
+            self._object_ids[object_id] = job_id
+        self._docs[job_id] = dict(doc)
+        self._sent[job_id] = self.sanitize_job_doc(doc) or {}
+
+    async def subscribe(self, job_id: str) -> tuple[dict | None, asyncio.Queue | None]:
+        doc = self._docs.get(job_id) or await self._load(job_id)
+        if doc is None:
+            if job_id not in self._subscribers:
+                self._load_locks.pop(job_id, None)
+            return None, None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return doc, queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue | None) -> None:
+        queues = self._subscribers.get(job_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if queues:
+            return
+        self._subscribers.pop(job_id, None)
+        self._load_locks.pop(job_id, None)
+        doc = self._docs.pop(job_id, None) or {}
+        self._sent.pop(job_id, None)
+        self._object_ids.pop(doc.get("_id"), None)
+
+    def snapshot(self, job_id: str) -> dict | None:
+        sent = self._sent.get(job_id)
+        return dict(sent) if sent is not None else None
+
+    def _deliver(self, job_id: str, event: str, data: dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(job_id) or ()):
+            if queue.full():
+                # A slow watcher loses intermediate deltas but is resynced with a full snapshot.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((JOB_EVENT_SNAPSHOT, self.snapshot(job_id) or data))
+                continue
+            queue.put_nowait((event, data))
+
+    def publish(self, job_id: str, fields: dict[str, Any]) -> None:
+        doc = self._docs.get(job_id)
+        if doc is None or not fields:
+            return
+        for key, value in fields.items():
+            if "." not in key:
+                doc[key] = value
+        current = self.sanitize_job_doc(doc) or {}
+        previous = self._sent.get(job_id) or {}
+        delta = {key: value for key, value in current.items() if previous.get(key) != value}
+        if not delta:
+            return
+        self._sent[job_id] = current
+        self._deliver(job_id, JOB_EVENT_DELTA, {"id": job_id, **delta})
+
+    def publish_change(self, change: dict[str, Any]) -> None:
+        object_id = (change.get("documentKey") or {}).get("_id")
+        job_id = self._object_ids.get(object_id)
+        if job_id is None:
+            return
+        updated_fields = (change.get("updateDescription") or {}).get("updatedFields") or {}
+        self.publish(job_id, updated_fields)
+
+    async def resync(self) -> None:
+        job_ids = list(self._subscribers)
+        if not job_ids:
+            return
+        docs = await self.db.upload_jobs.find(
+            {"id": {"$in": job_ids}},
+            {"payload": 0},
+        ).to_list(len(job_ids))
+        for doc in docs:
+            job_id = doc.get("id")
+            if job_id in self._docs:
+                self.publish(job_id, {key: value for key, value in doc.items() if key != "_id"})
+
+    async def resync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_interval_seconds)
+            try:
+                await self.resync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.logger.warning("Job event resync failed: %s", exc)
+
+    async def watch_changes(self) -> None:
+        pipeline = [{"$match": {"operationType": "update"}}]
+        while True:
+            try:
+                async with self.db.upload_jobs.watch(pipeline) as stream:
+                    self.logger.info("Job event change stream opened")
+                    async for change in stream:
+                        self.publish_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as exc:
+                self.logger.info("Job event change stream unavailable (%s); using periodic resync", exc)
+                return
+            except Exception as exc:
+                self.logger.warning("Job event change stream error: %s", exc)
+                await asyncio.sleep(self.resync_interval_seconds)
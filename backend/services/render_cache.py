@@ -0,0 +1,97 @@
+"""Content-addressed cache of finished render MP4s with size-bounded LRU eviction on disk."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
+
+
+class RenderOutputCache:
+    """Renders stored as ``<key>.mp4`` plus a ``<key>.json`` metadata sidecar."""
+
+    def __init__(self, *, root_dir: Path | None, max_bytes: int, logger: logging.Logger) -> None:
+        self.root_dir = root_dir
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self.logger = logger
+
+    @property
+    def enabled(self) -> bool:
+        return self.root_dir is not None and self.max_bytes > 0
+
+    @staticmethod
+    def build_key(inputs: dict[str, Any]) -> str:
+        encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _video_path(self, key: str) -> Path:
+        return self.root_dir / f"{key}.mp4"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root_dir / f"{key}.json"
+
+    def get(self, key: str, dest_path: Path) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        video_path = self._video_path(key)
+        try:
+            if video_path.stat().st_size <= 0:
+                return None
+            dest_path.unlink(missing_ok=True)
+            _link_or_copy(video_path, dest_path)
+            os.utime(video_path)
+        except OSError:
+            return None
+        try:
+            metadata = json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            metadata = {}
+        return metadata if isinstance(metadata, dict) else {}
+
+    def put(self, key: str, source_path: Path, metadata: dict[str, Any] | None = None) -> None:
+        if not self.enabled:
+            return
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.root_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            _link_or_copy(source_path, temp_path)
+            self._meta_path(key).write_text(json.dumps(metadata or {}, default=str), encoding="utf-8")
+            os.replace(temp_path, self._video_path(key))
+        finally:
+            temp_path.unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self) -> int:
+        if not self.enabled or not self.root_dir.exists():
+            return 0
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.root_dir.glob("*.mp4"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_bytes = sum(size for _mtime, size, _path in entries)
+        evicted = 0
+        for _mtime, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total_bytes -= size
+            evicted += 1
+        if evicted:
+            self.logger.info("Render cache evicted %s entr%s; %s bytes remain", evicted, "y" if evicted == 1 else "ies", total_bytes)
+        return evicted
@@ -0,0 +1,39 @@
+"""In-flight call coalescing: concurrent callers with the same key share one computation."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; callers arriving meanwhile await the same result."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled.
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, call_key=key: self._forget(call_key, done))
+        return await asyncio.shield(task)
+
+    async def to_thread(self, key: Hashable, func: Callable[..., T], *args: Any) -> T:
+        return await self.do(key, lambda: asyncio.to_thread(func, *args))
@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
 from pydantic import BaseModel
 
@@ -21,7 +21,7 @@ class SpotlightService:
         build_profiles: Callable[[list[dict], dict[str, dict]], Any],
         profile_with_role_tag: Callable[[dict], Any],
         refresh_metrics_for_profiles: Callable[[list[dict]], Any],
-        fetch_channel_top_viewed_beats: Callable[[str, int], tuple[list[dict], dict]],
+        fetch_channel_top_viewed_beats: Callable[[str, int], Awaitable[tuple[list[dict], dict]]],
         safe_iso_now: Callable[[], str],
     ) -> None:
         self.db = db
@@ -167,7 +167,7 @@ class SpotlightService:
             top_beats.append({"title": f"Beat {idx + 1}: {name}", "url": None})
 
         youtube_url = ((profile.get("social_links") or {}).get("youtube") or "").strip()
-        channel_top_beats, channel_perf = await asyncio.to_thread(self.fetch_channel_top_viewed_beats, youtube_url, 5)
+        channel_top_beats, channel_perf = await self.fetch_channel_top_viewed_beats(youtube_url, 5)
         if channel_top_beats:
             top_beats = channel_top_beats
 
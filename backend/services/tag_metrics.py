@@ -11,6 +11,8 @@ from datetime import datetime, timezone
 from statistics import median
 from typing import Any, Callable
 
+from .singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 TAG_MIN_PUBLISH_SCORE = int(os.environ.get("TAG_MIN_PUBLISH_SCORE", "58"))
@@ -25,6 +27,9 @@ TAG_MAX_PUBLISH_COUNT = int(os.environ.get("TAG_MAX_PUBLISH_COUNT", "50"))
 
 TAG_KEYWORD_CACHE_COLLECTION = "tag_keyword_cache"
 
+# Concurrent tag-generation requests scoring the same tag share one YouTube lookup.
+_tag_metrics_flights = SingleFlight()
+
 
 def normalize_tag_key(tag: str) -> str:
     return re.sub(r"\s+", " ", str(tag or "").strip().lower())
@@ -249,10 +254,14 @@ async def resolve_tag_metrics(
     if cached is not None:
         return cached
 
-    metrics = await asyncio.to_thread(fetch_tag_youtube_metrics, youtube, tag)
-    api_calls_counter[0] += 1
-    await set_cached_tag_metrics(db, tag_key, metrics)
-    return metrics
+    async def fetch_and_cache() -> dict[str, Any]:
+        metrics = await asyncio.to_thread(fetch_tag_youtube_metrics, youtube, tag)
+        # Only the caller that actually spent the quota counts the API call.
+        api_calls_counter[0] += 1
+        await set_cached_tag_metrics(db, tag_key, metrics)
+        return metrics
+
+    return await _tag_metrics_flights.do(tag_key, fetch_and_cache)
 
 
 def prioritize_tags_for_lookup(
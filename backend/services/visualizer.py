@@ -0,0 +1,143 @@
+"""Audio visualizer frames computed with NumPy and streamed to FFmpeg as a raw grayscale mask."""
+
+from __future__ import annotations
+
+import subprocess
+from typing import Any, Iterator
+
+import numpy as np
+
+
+VISUALIZER_SAMPLE_RATE = 22050
+VISUALIZER_BAR_COUNT = 64
+VISUALIZER_FFT_SIZE = 2048
+VISUALIZER_BAR_GAP = 0.25
+# Spectrum magnitudes are mapped from this dB range onto bar height.
+VISUALIZER_DB_FLOOR = -60.0
+VISUALIZER_DB_CEILING = 0.0
+
+
+def decode_audio_samples(
+    ffmpeg_bin: str,
+    audio_path: Any,
+    *,
+    sample_rate: int = VISUALIZER_SAMPLE_RATE,
+    timeout: int = 300,
+) -> np.ndarray:
+    """Decode the whole track to mono float32 samples in [-1, 1]."""
+    completed = subprocess.run(
+        [
+            ffmpeg_bin,
+            "-nostdin",
+            "-v",
+            "error",
+            "-i",
+            str(audio_path),
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-f",
+            "f32le",
+            "pipe:1",
+        ],
+        capture_output=True,
+        timeout=timeout,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"Audio decode for visualizer failed: {completed.stderr.decode('utf-8', 'replace').strip()[:400]}"
+        )
+    return np.frombuffer(completed.stdout, dtype="<f4").astype(np.float32, copy=False)
+
+
+class VisualizerFrameRenderer:
+    def __init__(
+        self,
+        samples: np.ndarray,
+        *,
+        sample_rate: int = VISUALIZER_SAMPLE_RATE,
+        fps: int,
+        width: int,
+        height: int,
+        mode: str = "circle",
+        intensity: float = 1.0,
+        opacity: float = 0.68,
+        batch_size: int = 32,
+    ) -> None:
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self.fps = max(1, int(fps))
+        self.width = max(2, int(width))
+        self.height = max(2, int(height))
+        self.mode = "monstercat" if mode == "monstercat" else "circle"
+        self.intensity = float(intensity)
+        self.mask_value = np.uint8(round(max(0.0, min(1.0, float(opacity))) * 255))
+        self.batch_size = max(1, int(batch_size))
+        self.samples_per_frame = self.sample_rate / float(self.fps)
+        self.frame_count = max(1, int(np.ceil(len(self.samples) / self.samples_per_frame)))
+        self.frame_bytes = self.width * self.height
+        self._rows = np.arange(self.height, dtype=np.float32)[:, None]
+        self._bar_columns = self._bar_column_map()
+        self._bar_bins = self._bar_bin_edges()
+        self._window = np.hanning(VISUALIZER_FFT_SIZE).astype(np.float32)
+
+    def _bar_column_map(self) -> np.ndarray:
+        bar_width = self.width / float(VISUALIZER_BAR_COUNT)
+        columns = np.arange(self.width, dtype=np.float32)
+        bar_index = np.minimum((columns / bar_width).astype(np.int64), VISUALIZER_BAR_COUNT - 1)
+        in_gap = (columns - bar_index * bar_width) >= bar_width * (1.0 - VISUALIZER_BAR_GAP)
+        return np.where(in_gap, -1, bar_index)
+
+    def _bar_bin_edges(self) -> np.ndarray:
+        nyquist = self.sample_rate / 2.0
+        edges_hz = np.geomspace(40.0, nyquist, VISUALIZER_BAR_COUNT + 1)
+        edges = np.round(edges_hz / nyquist * (VISUALIZER_FFT_SIZE // 2)).astype(np.int64)
+        edges = np.clip(edges, 1, VISUALIZER_FFT_SIZE // 2)
+        # Every bar gets at least one bin, even where low-frequency edges round together.
+        return np.maximum(edges, np.arange(edges.size) + 1)
+
+    def _frame_windows(self, start_frame: int, count: int, window_size: int) -> np.ndarray:
+        centres = (np.arange(start_frame, start_frame + count) * self.samples_per_frame).astype(np.int64)
+        offsets = np.arange(window_size, dtype=np.int64) - window_size // 2
+        indices = centres[:, None] + offsets[None, :]
+        valid = (indices >= 0) & (indices < len(self.samples))
+        windows = np.zeros(indices.shape, dtype=np.float32)
+        windows[valid] = self.samples[indices[valid]]
+        return windows
+
+    def waveform_heights(self, start_frame: int, count: int) -> np.ndarray:
+        window_size = max(self.width, int(np.ceil(self.samples_per_frame)))
+        windows = np.abs(self._frame_windows(start_frame, count, window_size))
+        column_starts = (np.arange(self.width) * window_size) // self.width
+        peaks = np.maximum.reduceat(windows, column_starts, axis=1)
+        return np.clip(peaks * self.intensity, 0.0, 1.0)
+
+    def bar_heights(self, start_frame: int, count: int) -> np.ndarray:
+        windows = self._frame_windows(start_frame, count, VISUALIZER_FFT_SIZE) * self._window
+        magnitudes = np.abs(np.fft.rfft(windows, axis=1)) / (VISUALIZER_FFT_SIZE / 4.0)
+        band_peaks = np.maximum.reduceat(magnitudes, self._bar_bins[:-1], axis=1)
+        decibels = 20.0 * np.log10(np.maximum(band_peaks, 1e-6))
+        levels = (decibels - VISUALIZER_DB_FLOOR) / (VISUALIZER_DB_CEILING - VISUALIZER_DB_FLOOR)
+        levels = np.clip(levels * self.intensity, 0.0, 1.0).astype(np.float32)
+        heights = levels[:, np.maximum(self._bar_columns, 0)]
+        heights[:, self._bar_columns < 0] = 0.0
+        return heights
+
+    def render_batch(self, start_frame: int, count: int) -> np.ndarray:
+        if self.mode == "monstercat":
+            # Bars rise from the bottom edge.
+            tops = self.height - self.bar_heights(start_frame, count) * self.height
+            mask = self._rows[None, :, :] >= tops[:, None, :]
+        else:
+            # Centred vertical line per column, like showwaves=mode=cline.
+            centre = (self.height - 1) / 2.0
+            reach = self.waveform_heights(start_frame, count) * (self.height / 2.0)
+            mask = np.abs(self._rows[None, :, :] - centre) <= reach[:, None, :]
+        return np.where(mask, self.mask_value, np.uint8(0)).astype(np.uint8, copy=False)
+
+    def iter_frames(self, start_frame: int = 0, frame_count: int | None = None) -> Iterator[bytes]:
+        end_frame = self.frame_count if frame_count is None else min(self.frame_count, start_frame + frame_count)
+        for batch_start in range(start_frame, end_frame, self.batch_size):
+            count = min(self.batch_size, end_frame - batch_start)
+            yield self.render_batch(batch_start, count).tobytes()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
+import hashlib
 import os
 from pathlib import Path
 from tempfile import NamedTemporaryFile
@@ -87,6 +88,7 @@ class LocalMediaStorage(MediaStorageAdapter):
             "stored_filename": path.name,
             "file_path": str(path),
             "file_size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
         }
 
     async def save_upload_file(
@@ -100,6 +102,8 @@ class LocalMediaStorage(MediaStorageAdapter):
         path = self._path_for(file_id, file_ext)
         total_bytes = 0
         chunk_size = 1024 * 1024
+        # Hashed while streaming so the render path never has to re-read the file for its hash.
+        digest = hashlib.sha256()
         with open(path, "wb") as buffer:
             while True:
                 chunk = await upload_file.read(chunk_size)
@@ -114,6 +118,7 @@ class LocalMediaStorage(MediaStorageAdapter):
                         pass
                     raise HTTPException(status_code=400, detail=f"File is too large. Max size is {max_bytes // (1024 * 1024)}MB.")
                 buffer.write(chunk)
+                digest.update(chunk)
 
         return {
             "storage_backend": "local",
@@ -121,6 +126,7 @@ class LocalMediaStorage(MediaStorageAdapter):
             "stored_filename": path.name,
             "file_path": str(path),
             "file_size": total_bytes,
+            "sha256": digest.hexdigest(),
         }
 
     def exists(self, upload_doc: dict) -> bool:
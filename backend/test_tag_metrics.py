@@ -1,9 +1,12 @@
 """Unit tests for YouTube-proxy tag scoring."""
 
+import asyncio
 import os
 import sys
+import threading
+import time
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -18,6 +21,7 @@ from services.tag_metrics import (
     normalize_competition_score,
     normalize_demand_score,
     fetch_tag_youtube_metrics,
+    resolve_tag_metrics,
 )
 
 
@@ -100,3 +104,30 @@ def test_fetch_tag_youtube_metrics_aggregates_views():
     assert metrics["total_results"] == 12000
     assert metrics["median_views"] == 150000
     assert len(metrics["top_titles"]) >= 1
+
+
+def test_resolve_tag_metrics_coalesces_concurrent_identical_lookups():
+    calls = []
+    lock = threading.Lock()
+
+    def slow_fetch(_youtube, tag):
+        with lock:
+            calls.append(tag)
+        time.sleep(0.05)
+        return {"tag": tag, "total_results": 10, "median_views": 1000}
+
+    async def run_lookups():
+        counters = [[0], [0], [0]]
+        results = await asyncio.gather(
+            resolve_tag_metrics(youtube=None, db=None, tag="Drake Type Beat", ttl_seconds=60, api_calls_counter=counters[0]),
+            resolve_tag_metrics(youtube=None, db=None, tag="drake  type beat", ttl_seconds=60, api_calls_counter=counters[1]),
+            resolve_tag_metrics(youtube=None, db=None, tag="drake type beat", ttl_seconds=60, api_calls_counter=counters[2]),
+        )
+        return results, counters
+
+    with patch("services.tag_metrics.fetch_tag_youtube_metrics", side_effect=slow_fetch):
+        results, counters = asyncio.run(run_lookups())
+
+    assert len(calls) == 1
+    assert all(result["median_views"] == 1000 for result in results)
+    assert sum(counter[0] for counter in counters) == 1
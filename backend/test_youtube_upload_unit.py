@@ -1,12 +1,17 @@
 import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
 import itertools
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi import HTTPException
+import httplib2
+import numpy as np
+from PIL import Image
 
 os.environ["MONGO_URL"] = "mongodb://localhost:27017"
 os.environ["JWT_SECRET_KEY"] = "test_secret"
@@ -340,6 +345,388 @@ class TestYouTubeUpload(unittest.IsolatedAsyncioTestCase):
         self.assertIn("youtube.com/watch?v=yt_video_123", final_kwargs["result"]["video_url"])
         mock_consume_upload_credit.assert_awaited_once_with(self.user_id)
 
+    async def test_requeued_job_resumes_upload_from_checkpoint_without_rendering(self):
+        update_job = AsyncMock()
+        self.mock_db.uploads.find_one = AsyncMock(side_effect=[{"id": "audio_1"}, {"id": "image_1"}])
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch("backend.server._update_upload_job", update_job), \
+             patch("backend.server._assert_job_not_cancel_requested", new_callable=AsyncMock), \
+             patch("backend.server.ensure_has_upload_credit", new_callable=AsyncMock), \
+             patch("backend.server.consume_upload_credit", new_callable=AsyncMock), \
+             patch("backend.server.refresh_youtube_token", new_callable=AsyncMock), \
+             patch("backend.server._render_youtube_video", new_callable=AsyncMock) as mock_render, \
+             patch("backend.server.MediaFileUpload"), \
+             patch("backend.server.build") as mock_build:
+            rendered_path = Path(temp_dir) / server._job_render_storage_key("job_resume")
+            rendered_path.write_bytes(b"rendered video")
+            job = {
+                "id": "job_resume",
+                "user_id": self.user_id,
+                "payload": {"title": "My Beat", "audio_file_id": "audio_1", "image_file_id": "image_1"},
+                "upload_checkpoint": {
+                    "storage_key": rendered_path.name,
+                    **server._render_checkpoint_fingerprint(rendered_path),
+                    "media_debug": {"fps": 30},
+                    "session_uri": "https://upload.youtube.test/session-1",
+                    "bytes_uploaded": 8,
+                },
+            }
+            request = MagicMock()
+            request.resumable.size.return_value = 14
+            request.http.request.return_value = (httplib2.Response({"status": 308, "range": "bytes=0-7"}), b"")
+            request.next_chunk.return_value = (None, {"id": "yt_video_resumed"})
+            mock_build.return_value.videos().insert.return_value = request
+
+            await server._process_youtube_upload_job(job)
+
+            mock_render.assert_not_awaited()
+            status_query = request.http.request.call_args
+            self.assertEqual(status_query.args[0], "https://upload.youtube.test/session-1")
+            self.assertEqual(status_query.kwargs["method"], "PUT")
+            self.assertEqual(status_query.kwargs["headers"]["Content-Range"], "bytes */14")
+            self.assertEqual(request.resumable_uri, "https://upload.youtube.test/session-1")
+            self.assertEqual(request.resumable_progress, 8)
+            self.assertFalse(rendered_path.exists())
+        final_kwargs = update_job.await_args_list[-1].kwargs
+        self.assertEqual(final_kwargs["status"], "succeeded")
+        self.assertEqual(final_kwargs["result"]["video_id"], "yt_video_resumed")
+
+    async def test_prerendered_job_is_deferred_until_run_at_without_uploading(self):
+        update_job = AsyncMock()
+        self.mock_db.uploads.find_one = AsyncMock(side_effect=[{"id": "audio_1"}, {"id": "image_1"}])
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch("backend.server._update_upload_job", update_job), \
+             patch("backend.server._assert_job_not_cancel_requested", new_callable=AsyncMock), \
+             patch("backend.server.ensure_has_upload_credit", new_callable=AsyncMock), \
+             patch("backend.server.refresh_youtube_token", new_callable=AsyncMock), \
+             patch("backend.server._render_youtube_video", new_callable=AsyncMock) as mock_render, \
+             patch.object(server.background_job_service, "defer_until_run_at", new_callable=AsyncMock) as mock_defer, \
+             patch("backend.server.build") as mock_build:
+            rendered_path = Path(temp_dir) / "rendered.mp4"
+            rendered_path.write_bytes(b"video")
+            mock_render.return_value = rendered_path
+            job = {
+                "id": "job_scheduled",
+                "user_id": self.user_id,
+                "run_at": "2999-01-01T18:00:00+00:00",
+                "payload": {"title": "My Beat", "audio_file_id": "audio_1", "image_file_id": "image_1"},
+            }
+
+            await server._process_youtube_upload_job(job)
+
+            checkpoint_path = Path(temp_dir) / server._job_render_storage_key("job_scheduled")
+            self.assertTrue(checkpoint_path.exists())
+        mock_defer.assert_awaited_once()
+        mock_build.assert_not_called()
+        self.assertNotIn("status", update_job.await_args_list[-1].kwargs)
+
+    async def test_render_cache_hit_returns_cached_mp4_without_running_ffmpeg(self):
+        payload = {"title": "My Beat", "aspect_ratio": "16:9", "render_fps": 30, "remove_watermark": False}
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+             patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            root = Path(temp_dir)
+            (root / "audio_1.mp3").write_bytes(b"audio bytes")
+            (root / "image_1.png").write_bytes(b"image bytes")
+            audio_upload = {"id": "audio_1", "storage_key": "audio_1.mp3"}
+            image_upload = {"id": "image_1", "storage_key": "image_1.png"}
+            cache = server.RenderOutputCache(root_dir=root / "render_cache", max_bytes=10**9, logger=MagicMock())
+            key = await server._youtube_render_cache_key(
+                audio_upload=audio_upload,
+                audio_path=root / "audio_1.mp3",
+                image_upload=image_upload,
+                image_path=root / "image_1.png",
+                payload=payload,
+                audio_mode="encode",
+                normalized_visual=False,
+            )
+            sidecar_key = await server._youtube_render_cache_key(
+                audio_upload=audio_upload,
+                audio_path=root / "audio_1.mp3",
+                image_upload=image_upload,
+                image_path=root / "image_1.png",
+                payload=payload,
+                audio_mode="sidecar",
+                normalized_visual=False,
+            )
+            self.assertNotEqual(key, sidecar_key)
+            previous_render = root / "previous.mp4"
+            previous_render.write_bytes(b"cached video")
+            cache.put(key, previous_render, {"fps": 30, "generated_video_path": str(previous_render)})
+
+            with patch("backend.server.render_output_cache", cache):
+                output_path = await server._render_youtube_video(
+                    audio_upload=audio_upload,
+                    image_upload=image_upload,
+                    payload=payload,
+                )
+
+            mock_ffmpeg.assert_not_called()
+            self.assertEqual(output_path.read_bytes(), b"cached video")
+            self.assertTrue(payload["_media_debug"]["render_cache_hit"])
+            self.assertEqual(payload["_media_debug"]["generated_video_path"], str(output_path))
+            output_path.unlink()
+            self.assertTrue((root / "render_cache" / f"{key}.mp4").exists())
+
+    async def test_static_cover_encodes_one_segment_and_loops_it_by_stream_copy(self):
+        payload = {
+            "title": "My Beat",
+            "remove_watermark": False,
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=30),
+        }
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch("backend.server.render_output_cache", disabled_cache), \
+             patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+             patch("backend.server._probe_audio_duration_seconds", return_value=180.0), \
+             patch("backend.server._probe_image_dimensions", return_value=(1920, 1080)), \
+             patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            root = Path(temp_dir)
+            (root / "audio_1.mp3").write_bytes(b"audio bytes")
+            Image.new("RGB", (1920, 1080), "red").save(root / "image_1.png")
+            mock_ffmpeg.return_value = server.subprocess.CompletedProcess([], 0, "", "")
+
+            await server._render_youtube_video(
+                audio_upload={"id": "audio_1", "storage_key": "audio_1.mp3"},
+                image_upload={"id": "image_1", "storage_key": "image_1.png"},
+                payload=payload,
+            )
+
+        self.assertEqual(mock_ffmpeg.call_count, 2)
+        segment_command = mock_ffmpeg.call_args_list[0].args[0]
+        mux_command = mock_ffmpeg.call_args_list[1].args[0]
+        frame_count = str(server.YOUTUBE_STILL_LOOP_SEGMENT_SECONDS * server.STATIC_STILL_ENCODE_FPS)
+        self.assertIn("-an", segment_command)
+        self.assertEqual(segment_command[segment_command.index("-frames:v") + 1], frame_count)
+        self.assertEqual(segment_command[segment_command.index("-g") + 1], frame_count)
+        self.assertEqual(mux_command[mux_command.index("-stream_loop") + 1], "-1")
+        self.assertEqual(mux_command[mux_command.index("-c:v") + 1], "copy")
+        self.assertEqual(mux_command[mux_command.index("-i") + 1], segment_command[-1])
+        self.assertEqual(mock_ffmpeg.call_args_list[1].kwargs["duration_seconds"], 180.0)
+        self.assertEqual(payload["_media_debug"]["render_mode"], "still_loop")
+        self.assertTrue(payload["_media_debug"]["precomposed_still_frame"])
+        self.assertEqual(segment_command[segment_command.index("-filter_complex") + 1], "[0:v]null[vout]")
+        self.assertTrue(segment_command[segment_command.index("-i") + 1].endswith(".png"))
+
+    async def test_long_visualizer_render_encodes_parallel_segments_and_concatenates(self):
+        payload = {
+            "title": "My Beat",
+            "remove_watermark": False,
+            "visualizer": server._normalize_visualizer_payload(True, {"mode": "monstercat"}),
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=30),
+        }
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch.object(server, "YOUTUBE_PARALLEL_RENDER_SEGMENTS", 3), \
+             patch.object(server, "YOUTUBE_VISUALIZER_ENGINE", "ffmpeg"), \
+             patch("backend.server.render_output_cache", disabled_cache), \
+             patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+             patch("backend.server._probe_audio_duration_seconds", return_value=180.0), \
+             patch("backend.server._probe_image_dimensions", return_value=(1920, 1080)), \
+             patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            root = Path(temp_dir)
+            (root / "audio_1.mp3").write_bytes(b"audio bytes")
+            (root / "image_1.png").write_bytes(b"image bytes")
+            concat_lists = []
+
+            def _run(command, **kwargs):
+                if "concat" in command:
+                    concat_lists.append(Path(command[command.index("-i") + 1]).read_text(encoding="utf-8"))
+                return server.subprocess.CompletedProcess(command, 0, "", "")
+
+            mock_ffmpeg.side_effect = _run
+
+            await server._render_youtube_video(
+                audio_upload={"id": "audio_1", "storage_key": "audio_1.mp3"},
+                image_upload={"id": "image_1", "storage_key": "image_1.png"},
+                payload=payload,
+            )
+            leftover = sorted(path.name for path in root.iterdir())
+
+        commands = [call.args[0] for call in mock_ffmpeg.call_args_list]
+        self.assertEqual(len(commands), 4)
+        segment_commands = [command for command in commands if "-ss" in command]
+        self.assertEqual(sorted(command[command.index("-ss") + 1] for command in segment_commands), ["0.000", "120.000", "60.000"])
+        self.assertTrue(all(command[command.index("-frames:v") + 1] == "1800" for command in segment_commands))
+        self.assertTrue(all("showwaves" in command[command.index("-filter_complex") + 1] for command in segment_commands))
+        concat_command = commands[-1]
+        self.assertEqual(concat_command[concat_command.index("-c:v") + 1], "copy")
+        self.assertEqual(concat_lists[0].count("file '"), 3)
+        self.assertEqual(payload["_media_debug"]["render_mode"], "parallel_segments")
+        # Only the inputs and the final render remain; segments and the concat list are removed.
+        self.assertEqual([name for name in leftover if not name.endswith(".mp4")], ["audio_1.mp3", "image_1.png"])
+        self.assertEqual(len([name for name in leftover if name.endswith(".mp4")]), 1)
+
+    async def test_visualizer_render_pipes_numpy_mask_frames_instead_of_showwaves(self):
+        payload = {
+            "title": "My Beat",
+            "remove_watermark": True,
+            "visualizer": server._normalize_visualizer_payload(True, {"mode": "circle", "spectrumColor": "#ff0000"}),
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=30),
+        }
+        samples = np.zeros(22050 * 4, dtype=np.float32)
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)), \
+             patch.object(server, "YOUTUBE_VISUALIZER_ENGINE", "numpy"), \
+             patch.object(server, "YOUTUBE_PARALLEL_RENDER_SEGMENTS", 0), \
+             patch("backend.server.render_output_cache", disabled_cache), \
+             patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+             patch("backend.server.decode_audio_samples", return_value=samples), \
+             patch("backend.server._probe_audio_duration_seconds", return_value=4.0), \
+             patch("backend.server._probe_image_dimensions", return_value=(1920, 1080)), \
+             patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            root = Path(temp_dir)
+            (root / "audio_1.mp3").write_bytes(b"audio bytes")
+            (root / "image_1.png").write_bytes(b"image bytes")
+            streamed = []
+
+            def _run(command, **kwargs):
+                streamed.append(sum(len(chunk) for chunk in kwargs["stdin_chunks"]))
+                return server.subprocess.CompletedProcess(command, 0, "", "")
+
+            mock_ffmpeg.side_effect = _run
+
+            await server._render_youtube_video(
+                audio_upload={"id": "audio_1", "storage_key": "audio_1.mp3"},
+                image_upload={"id": "image_1", "storage_key": "image_1.png"},
+                payload=payload,
+            )
+
+        command = mock_ffmpeg.call_args.args[0]
+        target_w, target_h = server._resolve_youtube_render_dimensions(payload)
+        mask_w, mask_h = target_w // server.YOUTUBE_VISUALIZER_LAYER_SCALE, target_h // server.YOUTUBE_VISUALIZER_LAYER_SCALE
+        self.assertEqual(command[command.index("pipe:0") - 5 : command.index("pipe:0") - 1], ["-s", f"{mask_w}x{mask_h}", "-framerate", "30"])
+        filter_complex = command[command.index("-filter_complex") + 1]
+        self.assertNotIn("showwaves", filter_complex)
+        self.assertIn("color=c=0xff0000", filter_complex)
+        self.assertIn("[1:v]format=gray[vizmask]", filter_complex)
+        self.assertEqual(command[command.index("-map", command.index("[vout]")) + 1], "2:a")
+        self.assertEqual(streamed, [4 * 30 * mask_w * mask_h])
+        self.assertEqual(payload["_media_debug"]["visualizer_engine"], "numpy")
+
+    def test_parallel_render_segments_split_on_whole_frames(self):
+        self.assertEqual(
+            server._parallel_render_segments(100.0, 30, 4),
+            [(0.0, 750), (25.0, 750), (50.0, 750), (75.0, 750)],
+        )
+        segments = server._parallel_render_segments(10.1, 30, 4)
+        self.assertEqual([frames for _start, frames in segments], [76, 76, 76, 75])
+        self.assertEqual(sum(frames for _start, frames in segments), 303)
+
+    def test_compose_still_frame_contains_transformed_artwork_on_background(self):
+        payload = {
+            **server._normalize_upload_render_settings("16:9", 0.5, None, None, 1.0, 0.0, 90.0, "white"),
+            "remove_watermark": True,
+        }
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)):
+            source_path = Path(temp_dir) / "art.png"
+            Image.new("RGB", (400, 200), "red").save(source_path)
+
+            frame_path = server._compose_still_frame(source_path, payload=payload)
+            with Image.open(frame_path) as frame:
+                frame = frame.convert("RGB")
+                target_w, target_h = server._resolve_youtube_render_dimensions(payload)
+                self.assertEqual(frame.size, (target_w, target_h))
+                # Contain-fit to the frame width, halved, rotated upright, then shifted right by half its width.
+                art_w = target_w // 4
+                self.assertEqual(frame.getpixel((target_w // 2 + art_w // 2, target_h // 2)), (255, 0, 0))
+                self.assertEqual(frame.getpixel((target_w // 2 - art_w // 4, target_h // 2)), (255, 255, 255))
+                self.assertEqual(frame.getpixel((5, 5)), (255, 255, 255))
+
+    def test_compose_still_frame_draws_watermark_unless_removed(self):
+        settings = server._normalize_upload_render_settings("16:9", 0.5, None, None, 0.0, 0.0, 0.0, "black")
+        with tempfile.TemporaryDirectory() as temp_dir, \
+             patch.object(server.media_storage, "root_dir", Path(temp_dir)):
+            source_path = Path(temp_dir) / "art.png"
+            Image.new("RGB", (100, 100), "red").save(source_path)
+            frames = []
+            for remove_watermark in (False, True):
+                frame_path = server._compose_still_frame(
+                    source_path,
+                    payload={**settings, "remove_watermark": remove_watermark},
+                )
+                with Image.open(frame_path) as frame:
+                    target_w, target_h = frame.size
+                    frames.append(frame.convert("RGB").crop((target_w // 2, target_h * 9 // 10, target_w, target_h)))
+
+        watermarked, clean = frames
+        self.assertIsNone(clean.getbbox())
+        self.assertIsNotNone(watermarked.getbbox())
+
+    async def test_resolve_upload_run_at_accepts_best_hour_and_rejects_far_future(self):
+        with patch("backend.server._estimate_best_upload_hour_utc", new_callable=AsyncMock, return_value=18):
+            run_at = await server._resolve_upload_run_at(self.user_id, "best_hour")
+        parsed = server.datetime.fromisoformat(run_at)
+        self.assertEqual((parsed.hour, parsed.minute), (18, 0))
+        self.assertGreater(parsed, server.datetime.now(server.timezone.utc))
+
+        self.assertIsNone(await server._resolve_upload_run_at(self.user_id, "2020-01-01T00:00:00Z"))
+        with self.assertRaises(HTTPException):
+            await server._resolve_upload_run_at(self.user_id, "2999-01-01T00:00:00Z")
+
+    async def test_resumable_upload_checkpoints_session_and_restarts_expired_session(self):
+        request = MagicMock()
+        request.resumable_uri = None
+        request.resumable_progress = 0
+        request.resumable.size.return_value = 1024 * 1024
+        request.http.request.return_value = (httplib2.Response({"status": 410}), b"gone")
+
+        def _next_chunk():
+            if request.next_chunk.call_count == 1:
+                request.resumable_uri = "https://upload.youtube.test/session-2"
+                request.resumable_progress = 256 * 1024
+                return MagicMock(), None
+            return None, {"id": "yt_video_1"}
+
+        request.next_chunk.side_effect = _next_chunk
+        checkpoints = []
+
+        async def _record(session_uri, bytes_uploaded):
+            checkpoints.append((session_uri, bytes_uploaded))
+
+        response = await server._youtube_resumable_upload(
+            request,
+            resume_session_uri="https://upload.youtube.test/expired",
+            on_session_progress=_record,
+        )
+
+        self.assertEqual(response, {"id": "yt_video_1"})
+        self.assertEqual(checkpoints, [("https://upload.youtube.test/session-2", 256 * 1024)])
+
+    async def test_resume_of_finished_session_returns_video_without_uploading(self):
+        request = MagicMock()
+        request.resumable.size.return_value = 14
+        request.http.request.return_value = (httplib2.Response({"status": 200}), b'{"id": "yt_video_done"}')
+
+        response = await server._youtube_resumable_upload(request, resume_session_uri="https://upload.youtube.test/s")
+
+        self.assertEqual(response, {"id": "yt_video_done"})
+        request.next_chunk.assert_not_called()
+
+    async def test_cancel_stops_pushing_chunks_to_the_session(self):
+        request = MagicMock()
+        cancel_event = threading.Event()
+
+        def _next_chunk():
+            cancel_event.set()
+            return MagicMock(), None
+
+        request.next_chunk.side_effect = _next_chunk
+
+        with self.assertRaises(server.JobCancelledError):
+            await server._youtube_resumable_upload(request, cancel_event=cancel_event)
+
+        self.assertEqual(request.next_chunk.call_count, 1)
+
     async def test_process_youtube_upload_job_failure_marks_job_failed(self):
         job = {
             "id": "job_fail",
@@ -605,6 +992,48 @@ class TestYouTubeUpload(unittest.IsolatedAsyncioTestCase):
             self.assertTrue(any(r >= 0.2 for r in ratios))
             self.assertTrue(any(r >= 0.99 for r in ratios))
 
+    def test_run_ffmpeg_command_with_progress_kills_process_on_cancel(self):
+        cancel_event = threading.Event()
+        threading.Timer(0.3, cancel_event.set).start()
+        started_at = time.monotonic()
+
+        with self.assertRaises(server.JobCancelledError):
+            server._run_ffmpeg_command_with_progress(
+                [sys.executable, "-c", "import time; time.sleep(30)", "-y"],
+                duration_seconds=30.0,
+                timeout=60,
+                cancel_event=cancel_event,
+            )
+        self.assertLess(time.monotonic() - started_at, 2.0)
+
+    def test_run_ffmpeg_command_with_progress_streams_stdin_chunks(self):
+        script = "import sys; data = sys.stdin.buffer.read(); print(f'bytes={len(data)}')"
+
+        completed = server._run_ffmpeg_command_with_progress(
+            [sys.executable, "-c", script, "-y"],
+            duration_seconds=1.0,
+            timeout=30,
+            stdin_chunks=(b"x" * 1000 for _ in range(50)),
+        )
+
+        self.assertEqual(completed.returncode, 0)
+        self.assertIn("bytes=50000", completed.stdout)
+
+    def test_run_ffmpeg_command_with_progress_fails_when_stdin_producer_raises(self):
+        def _frames():
+            yield b"x" * 1000
+            raise ValueError("frame generation broke")
+
+        completed = server._run_ffmpeg_command_with_progress(
+            [sys.executable, "-c", "import sys, time; sys.stdin.buffer.read(1000); time.sleep(30)", "-y"],
+            duration_seconds=1.0,
+            timeout=10,
+            stdin_chunks=_frames(),
+        )
+
+        self.assertNotEqual(completed.returncode, 0)
+        self.assertIn("frame generation broke", completed.stderr)
+
     def test_build_render_filter_accepts_internal_mux_fps_for_gif(self):
         payload = {
             "target_w": 1280,
@@ -0,0 +1,210 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ["MONGO_URL"] = "mongodb://localhost:27017"
+os.environ["JWT_SECRET_KEY"] = "test_secret"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_EXPIRATION_MINUTES"] = "60"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_123"
+os.environ["GOOGLE_CLIENT_ID"] = "test_client_id"
+os.environ["GOOGLE_CLIENT_SECRET"] = "test_client_secret"
+os.environ["DB_NAME"] = "test_db"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from backend import server
+from backend.storage import LocalMediaStorage
+
+
+class TestAudioPreparation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.storage = LocalMediaStorage(self.root)
+        storage_patch = patch.object(server, "media_storage", self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.user = {"id": "user_1", "username": "user"}
+
+    async def test_audio_upload_queues_prepare_job(self):
+        mock_db = MagicMock()
+        mock_db.uploads.insert_one = AsyncMock()
+        mock_db.upload_jobs.count_documents = AsyncMock(return_value=0)
+        create_job = AsyncMock(side_effect=lambda **kwargs: {"id": "job_prepare", "status": "queued"})
+
+        with patch.object(server, "db", mock_db), \
+                patch.object(server, "_probe_audio_metadata", return_value={"duration": 60.0, "codec": "mp3"}), \
+                patch.object(server, "_create_background_job", create_job):
+            response = await server.upload_audio(
+                file=UploadFile(
+                    file=io.BytesIO(b"ID3" + b"\x00" * 4096),
+                    filename="beat.mp3",
+                    headers=Headers({"content-type": "audio/mpeg"}),
+                ),
+                current_user=self.user,
+            )
+
+        kwargs = create_job.await_args.kwargs
+        self.assertEqual(kwargs["job_type"], "audio_prepare")
+        self.assertEqual(kwargs["payload"], {"upload_id": response["file_id"]})
+        self.assertEqual(response["prepare_job_id"], "job_prepare")
+        self.assertEqual(server.JOB_SLOT_GROUPS["audio_prepare"], "prep")
+        self.assertIn("audio_prepare", server.UPLOAD_PREP_JOB_TYPES)
+
+    async def _run_prepare_job(self, audio_upload: dict, fake_ffmpeg=None, cancel_event=None, expected_status="succeeded"):
+        mock_db = MagicMock()
+        mock_db.uploads.find_one = AsyncMock(return_value=audio_upload)
+        mock_db.uploads.update_one = AsyncMock()
+        update_job = AsyncMock()
+        heartbeat = AsyncMock()
+        with patch.object(server, "db", mock_db), \
+                patch.object(server, "_update_upload_job", update_job), \
+                patch.object(server, "_job_heartbeat_loop", heartbeat), \
+                patch.object(server.background_job_service, "cancel_event_for", return_value=cancel_event), \
+                patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+                patch("backend.server._run_ffmpeg_command_with_progress", side_effect=fake_ffmpeg) as mock_ffmpeg:
+            await server._process_audio_prepare_job(
+                {"id": "job_prepare", "user_id": "user_1", "payload": {"upload_id": audio_upload["id"]}}
+            )
+        self.assertEqual(update_job.await_args.kwargs["status"], expected_status)
+        self.assertTrue(update_job.await_args.kwargs["only_if_owned"])
+        heartbeat.assert_called_once_with("job_prepare")
+        if expected_status != "succeeded":
+            mock_db.uploads.update_one.assert_not_awaited()
+            return None, mock_ffmpeg
+        return mock_db.uploads.update_one.await_args.args[1]["$set"]["derived_audio"], mock_ffmpeg
+
+    async def test_aac_upload_is_marked_passthrough_without_encoding(self):
+        (self.root / "aac_1.m4a").write_bytes(b"m4a bytes")
+        derived, mock_ffmpeg = await self._run_prepare_job(
+            {
+                "id": "aac_1",
+                "storage_key": "aac_1.m4a",
+                "media_metadata": {"duration": 120.0, "codec": "aac", "sample_rate": 44100, "channels": 2},
+            }
+        )
+
+        mock_ffmpeg.assert_not_called()
+        self.assertEqual(derived["mode"], "passthrough")
+        self.assertEqual(derived["version"], server.AUDIO_SIDECAR_VERSION)
+
+    async def test_wav_upload_gets_aac_sidecar(self):
+        (self.root / "wav_1.wav").write_bytes(b"RIFF wav bytes")
+
+        def fake_ffmpeg(command, **kwargs):
+            Path(command[-1]).write_bytes(b"aac sidecar")
+            return server.subprocess.CompletedProcess(command, 0, "", "")
+
+        derived, mock_ffmpeg = await self._run_prepare_job(
+            {
+                "id": "wav_1",
+                "storage_key": "wav_1.wav",
+                "media_metadata": {"duration": 120.0, "codec": "pcm_s16le", "sample_rate": 44100, "channels": 2},
+            },
+            fake_ffmpeg,
+        )
+
+        command = mock_ffmpeg.call_args.args[0]
+        self.assertEqual(command[command.index("-c:a") + 1 : command.index("-c:a") + 4], ["aac", "-b:a", "192k"])
+        self.assertEqual(derived["mode"], "sidecar")
+        self.assertEqual(derived["bitrate"], server.YOUTUBE_AUDIO_BITRATE)
+        self.assertEqual((self.root / derived["storage_key"]).read_bytes(), b"aac sidecar")
+
+    async def test_cancelled_encode_leaves_existing_sidecar_in_place(self):
+        (self.root / "wav_2.wav").write_bytes(b"RIFF wav bytes")
+        sidecar_path = self.root / server._derived_audio_storage_key("wav_2")
+        sidecar_path.write_bytes(b"sidecar in use")
+        cancel_event = threading.Event()
+
+        def fake_ffmpeg(command, **kwargs):
+            self.assertIs(kwargs["cancel_event"], cancel_event)
+            Path(command[-1]).write_bytes(b"late sidecar")
+            # The lease was reclaimed while FFmpeg was finishing.
+            cancel_event.set()
+            return server.subprocess.CompletedProcess(command, 0, "", "")
+
+        await self._run_prepare_job(
+            {
+                "id": "wav_2",
+                "storage_key": "wav_2.wav",
+                "media_metadata": {"duration": 120.0, "codec": "pcm_s16le", "sample_rate": 44100, "channels": 2},
+            },
+            fake_ffmpeg,
+            cancel_event=cancel_event,
+            expected_status="failed",
+        )
+
+        self.assertEqual(sidecar_path.read_bytes(), b"sidecar in use")
+
+    def test_render_audio_source_falls_back_to_encoding(self):
+        audio_path = self.root / "beat.wav"
+        (self.root / "beat.render-audio.m4a").write_bytes(b"aac")
+        sidecar = {"mode": "sidecar", "storage_key": "beat.render-audio.m4a", "bitrate": server.YOUTUBE_AUDIO_BITRATE, "version": server.AUDIO_SIDECAR_VERSION}
+
+        self.assertEqual(
+            server._render_audio_source({"derived_audio": sidecar}, audio_path),
+            (self.root / "beat.render-audio.m4a", "sidecar"),
+        )
+        self.assertEqual(server._render_audio_source({}, audio_path), (audio_path, "encode"))
+        self.assertEqual(
+            server._render_audio_source({"derived_audio": {**sidecar, "bitrate": "320k"}}, audio_path),
+            (audio_path, "encode"),
+        )
+        self.assertEqual(
+            server._render_audio_source({"derived_audio": {**sidecar, "storage_key": "missing.m4a"}}, audio_path),
+            (audio_path, "encode"),
+        )
+
+    async def test_render_stream_copies_prepared_sidecar(self):
+        (self.root / "audio_1.wav").write_bytes(b"wav bytes")
+        (self.root / "audio_1.render-audio.m4a").write_bytes(b"aac sidecar")
+        (self.root / "image_1.png").write_bytes(b"image bytes")
+        audio_upload = {
+            "id": "audio_1",
+            "storage_key": "audio_1.wav",
+            "media_metadata": {"duration": 95.5, "codec": "pcm_s16le"},
+            "derived_audio": {
+                "mode": "sidecar",
+                "storage_key": "audio_1.render-audio.m4a",
+                "bitrate": server.YOUTUBE_AUDIO_BITRATE,
+                "version": server.AUDIO_SIDECAR_VERSION,
+            },
+        }
+        image_upload = {
+            "id": "image_1",
+            "storage_key": "image_1.png",
+            "detected_format": ".png",
+            "media_metadata": {"width": 1920, "height": 1080},
+        }
+        payload = {
+            "title": "My Beat",
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=2),
+        }
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+
+        with patch("backend.server.render_output_cache", disabled_cache), \
+                patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+                patch("backend.server._compose_still_frame", side_effect=OSError("not an image")), \
+                patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            mock_ffmpeg.return_value = server.subprocess.CompletedProcess([], 0, "", "")
+            await server._render_youtube_video(audio_upload=audio_upload, image_upload=image_upload, payload=payload)
+
+        mux_command = mock_ffmpeg.call_args.args[0]
+        self.assertIn(str(self.root / "audio_1.render-audio.m4a"), mux_command)
+        self.assertNotIn(str(self.root / "audio_1.wav"), mux_command)
+        self.assertEqual(mux_command[mux_command.index("-c:a") + 1], "copy")
+        self.assertEqual(payload["_media_debug"]["audio_mode"], "sidecar")
+
+
+if __name__ == "__main__":
+    unittest.main()
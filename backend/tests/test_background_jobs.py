@@ -1,9 +1,12 @@
+import asyncio
 import os
 import sys
+import threading
+import time
 import unittest
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import ANY, AsyncMock, MagicMock, call, patch
 
 os.environ["MONGO_URL"] = "mongodb://localhost:27017"
 os.environ["JWT_SECRET_KEY"] = "test_secret_key_123456"
@@ -95,6 +98,7 @@ class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
         }
         self.mock_db.upload_jobs.find.return_value = _FakeCursor([active_job])
         self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=0))
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
 
         result = await self.service.run_watchdog_pass(
             default_timeout_seconds=300,
@@ -119,6 +123,7 @@ class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
         }
         self.mock_db.upload_jobs.find.return_value = _FakeCursor([stale_job])
         self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
 
         result = await self.service.run_watchdog_pass(
             default_timeout_seconds=300,
@@ -146,6 +151,7 @@ class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
         }
         self.mock_db.upload_jobs.find.return_value = _FakeCursor([stale_job])
         self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
 
         result = await self.service.run_watchdog_pass(
             default_timeout_seconds=300,
@@ -157,30 +163,69 @@ class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
         update_args = self.mock_db.upload_jobs.update_one.await_args
         self.assertIn("exceeded 660s", update_args.args[1]["$set"]["error"])
 
-    async def test_watchdog_requeues_stale_processing_job(self):
-        stale_job = {
-            "id": "job_stale",
-            "status": "processing",
-            "stage": "ffmpeg_render",
-            "attempts": 0,
-            "max_attempts": 2,
-            "worker_id": "other-worker",
-            **_watchdog_job_timestamps(stage_elapsed_seconds=700, heartbeat_age_seconds=700),
-        }
-        self.mock_db.upload_jobs.find.return_value = _FakeCursor([stale_job])
-        self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+    async def test_requeue_stale_jobs_clears_the_owner(self):
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
+
+        await self.service.requeue_stale_jobs()
+
+        update = self.mock_db.upload_jobs.update_many.await_args.args[1]
+        self.assertEqual(update["$set"]["status"], "queued")
+        self.assertEqual(update["$unset"], {"worker_id": "", "lease_expires_at": ""})
+
+    async def test_watchdog_reclaims_expired_leases_with_bulk_updates(self):
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor([])
+        self.mock_db.upload_jobs.update_one = AsyncMock()
+        self.mock_db.upload_jobs.update_many = AsyncMock(
+            side_effect=[SimpleNamespace(modified_count=2), SimpleNamespace(modified_count=1)]
+        )
 
         result = await self.service.run_watchdog_pass(
             default_timeout_seconds=300,
             stage_timeouts={"ffmpeg_render": 300},
         )
 
-        self.assertEqual(result["requeued"], 1)
-        update_args = self.mock_db.upload_jobs.update_one.await_args
-        self.assertEqual(update_args.args[0]["id"], "job_stale")
-        self.assertEqual(update_args.args[1]["$set"]["status"], "queued")
-        self.assertEqual(update_args.args[1]["$set"]["message"], "Requeued after timeout.")
-        self.assertEqual(update_args.args[1]["$inc"]["attempts"], 1)
+        self.assertEqual(result, {"requeued": 2, "failed": 1})
+        requeue_call, fail_call = self.mock_db.upload_jobs.update_many.await_args_list
+        self.assertEqual(requeue_call.args[0]["status"], "processing")
+        self.assertIn({"lease_expires_at": {"$lt": ANY}}, requeue_call.args[0]["$or"])
+        self.assertEqual(requeue_call.args[1]["$set"]["status"], "queued")
+        self.assertEqual(requeue_call.args[1]["$inc"]["attempts"], 1)
+        self.assertEqual(requeue_call.args[1]["$unset"], {"worker_id": "", "lease_expires_at": ""})
+        self.assertNotIn("worker_id", requeue_call.args[1]["$set"])
+        self.assertEqual(fail_call.args[1][0]["$set"]["status"], "failed")
+        self.assertEqual(fail_call.args[1][0]["$set"]["failed_stage"], "$stage")
+        self.assertNotIn("worker_id", fail_call.args[1][0]["$set"])
+        self.assertEqual(fail_call.args[1][1], {"$unset": ["worker_id", "lease_expires_at"]})
+        self.mock_db.upload_jobs.update_one.assert_not_awaited()
+        find_filter = self.mock_db.upload_jobs.find.call_args.args[0]
+        self.assertEqual(find_filter["status"], "processing")
+        self.assertEqual(find_filter["$or"][0]["stage"], "ffmpeg_render")
+
+    async def test_owned_status_write_skips_job_requeued_from_this_worker(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value=None)
+        self.mock_db.job_counters.update_one = AsyncMock()
+        listener = MagicMock()
+        self.service.add_update_listener(listener)
+
+        await self.service.update_job("job_1", status="cancelled", progress=100, only_if_owned=True)
+
+        call = self.mock_db.upload_jobs.find_one_and_update.await_args
+        self.assertEqual(call.args[0], {"id": "job_1", "status": "processing", "worker_id": "worker-test"})
+        listener.assert_not_called()
+        self.mock_db.job_counters.update_one.assert_not_awaited()
+
+    async def test_renew_lease_is_single_conditional_write_for_owning_worker(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(
+            return_value={"id": "job_1", "status": "processing", "stage": "ffmpeg_render"}
+        )
+
+        renewed = await self.service.renew_lease("job_1")
+
+        self.assertEqual(renewed["id"], "job_1")
+        call = self.mock_db.upload_jobs.find_one_and_update.await_args
+        self.assertEqual(call.args[0], {"id": "job_1", "status": "processing", "worker_id": "worker-test"})
+        self.assertIn("lease_expires_at", call.args[1]["$set"])
+        self.assertEqual(call.args[1]["$set"]["last_heartbeat_at"], "2026-06-01T00:10:00+00:00")
 
     async def test_process_job_marks_processing_job_failed_when_handler_returns_without_terminal_status(self):
         async def noop_handler(_job):
@@ -190,15 +235,677 @@ class TestBackgroundJobs(unittest.IsolatedAsyncioTestCase):
         self.mock_db.upload_jobs.find_one = AsyncMock(
             return_value={"id": "job_1", "status": "processing", "stage": "ffmpeg_render", "progress": 40}
         )
-        self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"user_id": "user_1"})
+        self.mock_db.job_counters.update_one = AsyncMock()
 
         await self.service.process_job({"id": "job_1", "type": "youtube_upload", "stage": "ffmpeg_render"})
 
-        update_args = self.mock_db.upload_jobs.update_one.await_args
+        update_args = self.mock_db.upload_jobs.find_one_and_update.await_args
         self.assertEqual(update_args.args[0], {"id": "job_1", "status": "processing"})
         self.assertEqual(update_args.args[1]["$set"]["status"], "failed")
         self.assertEqual(update_args.args[1]["$set"]["error_code"], "WORKER_EXITED")
 
 
+    async def test_running_job_has_local_cancel_event_until_handler_returns(self):
+        seen = {}
+
+        async def handler(_job):
+            seen["signalled"] = self.service.request_local_cancel("job_1")
+            seen["is_set"] = self.service.cancel_event_for("job_1").is_set()
+
+        self.service.set_handlers({"youtube_upload": handler})
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"id": "job_1", "status": "cancelled"})
+
+        await self.service.process_job({"id": "job_1", "type": "youtube_upload"})
+
+        self.assertEqual(seen, {"signalled": True, "is_set": True})
+        self.assertIsNone(self.service.cancel_event_for("job_1"))
+        self.assertFalse(self.service.request_local_cancel("job_1"))
+
+    async def test_cancel_change_stream_signals_job_running_here(self):
+        cancel_event = threading.Event()
+        self.service._cancel_events["job_1"] = cancel_event
+        changes = [{"fullDocument": {"id": "job_other"}}, {"fullDocument": {"id": "job_1"}}]
+
+        class _FakeStream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *_exc):
+                return False
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if not changes:
+                    raise asyncio.CancelledError
+                return changes.pop(0)
+
+        self.mock_db.upload_jobs.watch.return_value = _FakeStream()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await self.service.watch_cancel_requests()
+
+        self.assertTrue(cancel_event.is_set())
+        pipeline = self.mock_db.upload_jobs.watch.call_args.args[0]
+        self.assertEqual(pipeline[0]["$match"]["updateDescription.updatedFields.cancel_requested"], True)
+        self.assertEqual(self.mock_db.upload_jobs.watch.call_args.kwargs["full_document"], "updateLookup")
+
+class TestBackgroundJobCounters(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.job_counters.update_one = AsyncMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+        )
+
+    async def test_create_job_increments_queued_and_user_active_counters(self):
+        self.mock_db.upload_jobs.insert_one = AsyncMock()
+
+        await self.service.create_job(current_user={"id": "user_1"}, job_type="tag_generation", payload={})
+
+        calls = self.mock_db.job_counters.update_one.await_args_list
+        self.assertEqual(calls[0].args, ({"key": "status"}, {"$inc": {"status_counts.queued": 1}}))
+        self.assertEqual(
+            calls[1].args,
+            ({"key": "user:user_1"}, {"$inc": {"active": 1, "queued": 1}, "$set": {"plan": "free"}}),
+        )
+
+    async def test_terminal_status_moves_counters_from_previous_status(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"status": "processing", "user_id": "user_1"})
+
+        await self.service.update_job("job_1", status="failed", progress=100, error="boom")
+
+        status_inc = self.mock_db.job_counters.update_one.await_args_list[0].args[1]["$inc"]
+        self.assertEqual(status_inc["status_counts.processing"], -1)
+        self.assertEqual(status_inc["status_counts.failed"], 1)
+        self.assertTrue(any(key.startswith("failed_buckets.") for key in status_inc))
+        user_call = self.mock_db.job_counters.update_one.await_args_list[1]
+        self.assertEqual(user_call.args, ({"key": "user:user_1"}, {"$inc": {"active": -1}}))
+
+    async def test_queue_stats_read_counters_without_scanning_jobs(self):
+        now_dt = datetime.now(timezone.utc)
+        recent_bucket = self.service._failed_bucket_key(now_dt)
+        stale_bucket = self.service._failed_bucket_key(now_dt - timedelta(hours=3))
+        self.mock_db.job_counters.find_one = AsyncMock(
+            return_value={
+                "status_counts": {"queued": 3, "processing": 2, "succeeded": 40, "failed": 5},
+                "failed_buckets": {recent_bucket: 2, stale_bucket: 3},
+            }
+        )
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"created_at": "2026-06-01T00:00:00+00:00", "type": "youtube_upload"})
+        self.mock_db.upload_jobs.aggregate = MagicMock()
+        self.mock_db.upload_jobs.count_documents = AsyncMock()
+
+        stats = await self.service.get_queue_stats()
+
+        self.assertEqual(stats["queued"], 3)
+        self.assertEqual(stats["processing"], 2)
+        self.assertEqual(stats["failed_last_hour"], 2)
+        self.assertEqual(stats["oldest_queued_job"]["type"], "youtube_upload")
+        self.mock_db.upload_jobs.aggregate.assert_not_called()
+        self.mock_db.upload_jobs.count_documents.assert_not_awaited()
+        prune = self.mock_db.job_counters.update_one.await_args.args[1]
+        self.assertEqual(prune, {"$unset": {f"failed_buckets.{stale_bucket}": ""}})
+
+
+    async def test_archive_moves_old_finished_jobs_as_summaries_and_keeps_lifetime_counts(self):
+        finished = [
+            {"id": "job_1", "user_id": "user_1", "status": "succeeded", "result": {"video_id": "v1"}, "upload_checkpoint": {"storage_key": "job_1.render.mp4"}, "updated_at": "2026-05-01T00:00:00+00:00"},
+            {"id": "job_2", "user_id": "user_1", "status": "failed", "error": "boom", "updated_at": "2026-05-01T00:00:00+00:00"},
+        ]
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor(finished)
+        self.mock_db.upload_jobs_archive.insert_many = AsyncMock()
+        self.mock_db.upload_jobs.delete_many = AsyncMock()
+
+        archived = await self.service.archive_finished_jobs(older_than_seconds=86400, batch_size=10)
+
+        self.assertEqual([job["id"] for job in archived], ["job_1", "job_2"])
+        find_filter, projection = self.mock_db.upload_jobs.find.call_args.args
+        self.assertEqual(find_filter["status"], {"$in": ["cancelled", "failed", "succeeded"]})
+        self.assertIn("$lt", find_filter["updated_at"])
+        self.assertEqual(projection["payload.image_storage"], 1)
+        self.assertNotIn("payload", projection)
+        self.assertNotIn("media_debug", projection)
+        summaries = self.mock_db.upload_jobs_archive.insert_many.await_args.args[0]
+        self.assertEqual(summaries[0]["result"], {"video_id": "v1"})
+        self.assertNotIn("upload_checkpoint", summaries[0])
+        self.assertEqual(summaries[1]["archived_at"], "2026-06-01T00:10:00+00:00")
+        delete_filter = self.mock_db.upload_jobs.delete_many.await_args.args[0]
+        self.assertEqual(delete_filter["id"], {"$in": ["job_1", "job_2"]})
+        self.assertEqual(delete_filter["status"], find_filter["status"])
+        counter_inc = self.mock_db.job_counters.update_one.await_args.args[1]["$inc"]
+        self.assertEqual(counter_inc, {"archived_counts.succeeded": 1, "archived_counts.failed": 1})
+
+    async def test_reconcile_adds_archived_totals_to_hot_counts(self):
+        self.mock_db.upload_jobs.aggregate.side_effect = [
+            _FakeCursor([{"_id": "succeeded", "count": 3}, {"_id": "queued", "count": 1}]),
+            _FakeCursor([{"_id": {"user_id": "user_1", "status": "queued"}, "count": 1}]),
+        ]
+        self.mock_db.job_counters.find_one = AsyncMock(return_value={"archived_counts": {"succeeded": 40}})
+        self.mock_db.job_counters.update_many = AsyncMock()
+
+        await self.service.reconcile_job_counters()
+
+        counts = self.mock_db.job_counters.update_one.await_args_list[0].args[1]["$set"]
+        self.assertEqual(counts["status_counts.succeeded"], 43)
+        self.assertEqual(counts["status_counts.queued"], 1)
+
+    async def test_uncounted_job_types_skip_active_and_user_counters(self):
+        self.service.uncounted_job_types = frozenset({"audio_prepare"})
+        self.mock_db.upload_jobs.insert_one = AsyncMock()
+
+        await self.service.create_job(current_user={"id": "user_1"}, job_type="audio_prepare", payload={})
+        self.mock_db.job_counters.update_one.assert_not_awaited()
+
+        await self.service.record_status_change("processing", "succeeded", user_id="user_1", job_type="audio_prepare")
+        self.assertEqual(
+            self.mock_db.job_counters.update_one.await_args_list,
+            [call({"key": "status"}, {"$inc": {"status_counts.succeeded": 1}}, upsert=True)],
+        )
+
+    async def test_reconcile_active_counts_leaves_out_uncounted_job_types(self):
+        self.service.uncounted_job_types = frozenset({"audio_prepare"})
+        self.mock_db.upload_jobs.aggregate.return_value = _FakeCursor([
+            {"_id": {"user_id": "user_1", "status": "queued"}, "count": 2},
+            {"_id": {"user_id": "user_1", "status": "processing"}, "count": 1},
+        ])
+        self.mock_db.job_counters.update_many = AsyncMock()
+
+        await self.service.reconcile_active_counts()
+
+        match = self.mock_db.upload_jobs.aggregate.call_args.args[0][0]["$match"]
+        self.assertEqual(match["type"], {"$nin": ["audio_prepare"]})
+        status_set, user_set = [call.args for call in self.mock_db.job_counters.update_one.await_args_list]
+        self.assertEqual(status_set[1]["$set"], {"status_counts.processing": 1, "status_counts.queued": 2})
+        self.assertEqual(user_set, ({"key": "user:user_1"}, {"$set": {"active": 3, "queued": 2}}))
+
+class TestBackgroundJobFairShare(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.job_counters.update_one = AsyncMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+            fair_share_weights={"free": 1, "plus": 2, "max": 4},
+        )
+
+        async def fake_claim(claim_filter, *_args, **_kwargs):
+            return {"id": f"job_{claim_filter.get('user_id')}", "user_id": claim_filter.get("user_id")}
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=fake_claim)
+
+    async def test_light_user_is_served_before_bursting_heavy_user(self):
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"priority": 1})
+        self.mock_db.upload_jobs.aggregate = MagicMock()
+        self.mock_db.job_counters.find.return_value = _FakeCursor([
+            {"key": "user:light", "plan": "free"},
+            {"key": "user:heavy", "fair_share_pass": 4.0, "plan": "free"},
+        ])
+        self.mock_db.job_counters.find_one = AsyncMock(return_value={"fair_share_clock": 3.0})
+
+        job = await self.service.claim_next_job()
+
+        self.assertEqual(job["user_id"], "light")
+        self.mock_db.upload_jobs.aggregate.assert_not_called()
+        counter_filter = self.mock_db.job_counters.find.call_args.args[0]
+        self.assertEqual(counter_filter, {"queued": {"$gt": 0}})
+        self.assertEqual(self.mock_db.job_counters.find.call_args.kwargs["limit"], 8)
+        claim_filter = self.mock_db.upload_jobs.find_one_and_update.await_args.args[0]
+        self.assertEqual(
+            claim_filter,
+            {"status": "queued", "run_at": {"$lte": "2026-06-01T00:10:00+00:00"}, "user_id": "light", "priority": 1},
+        )
+        user_charge = next(
+            call.args for call in self.mock_db.job_counters.update_one.await_args_list
+            if call.args[0]["key"].startswith("user:") and "$max" in call.args[1]
+        )
+        self.assertEqual(user_charge, ({"key": "user:light"}, {"$max": {"fair_share_pass": 4.0}}))
+
+    async def test_higher_plan_weight_advances_pass_more_slowly(self):
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"priority": 1})
+        self.mock_db.job_counters.find.return_value = _FakeCursor([{"key": "user:max_user", "plan": "max"}])
+        self.mock_db.job_counters.find_one = AsyncMock(return_value={"fair_share_clock": 2.0})
+
+        await self.service.claim_next_job()
+
+        user_charge = next(
+            call.args for call in self.mock_db.job_counters.update_one.await_args_list
+            if call.args[0]["key"].startswith("user:") and "$max" in call.args[1]
+        )
+        self.assertEqual(user_charge, ({"key": "user:max_user"}, {"$max": {"fair_share_pass": 2.25}}))
+
+    async def test_priority_tier_wins_over_fair_share_pass(self):
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"priority": 0})
+        self.mock_db.job_counters.find.return_value = _FakeCursor([
+            {"key": "user:tagger", "fair_share_pass": 1.0, "plan": "max"},
+            {"key": "user:uploader", "fair_share_pass": 9.0, "plan": "free"},
+        ])
+        self.mock_db.job_counters.find_one = AsyncMock(return_value=None)
+
+        async def fake_claim(claim_filter, *_args, **_kwargs):
+            if claim_filter.get("user_id") != "uploader" or claim_filter.get("priority") != 0:
+                return None
+            return {"id": "job_upload", "user_id": "uploader"}
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=fake_claim)
+
+        job = await self.service.claim_next_job()
+
+        self.assertEqual(job["user_id"], "uploader")
+
+    async def test_user_with_only_future_jobs_is_skipped_until_retry(self):
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"priority": 1})
+        counters = [
+            {"key": "user:scheduled", "fair_share_pass": 0.0, "plan": "free"},
+            {"key": "user:active", "fair_share_pass": 2.0, "plan": "free"},
+        ]
+        self.mock_db.job_counters.find.side_effect = lambda counter_filter, *args, **kwargs: _FakeCursor([
+            doc for doc in counters if doc["key"] not in counter_filter.get("key", {}).get("$nin", [])
+        ])
+        self.mock_db.job_counters.find_one = AsyncMock(return_value=None)
+
+        async def fake_claim(claim_filter, *_args, **_kwargs):
+            # The scheduled user's queued jobs all have run_at in the future.
+            if claim_filter.get("user_id") in ("scheduled", None):
+                return None
+            return {"id": "job_active", "user_id": claim_filter["user_id"]}
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=fake_claim)
+
+        first = await self.service.claim_next_job()
+        self.assertEqual(self.mock_db.job_counters.find.call_args.args[0], {"queued": {"$gt": 0}})
+        self.mock_db.upload_jobs.find_one_and_update.reset_mock()
+        second = await self.service.claim_next_job()
+
+        self.assertEqual((first["user_id"], second["user_id"]), ("active", "active"))
+        self.assertEqual(
+            self.mock_db.job_counters.find.call_args.args[0],
+            {"queued": {"$gt": 0}, "key": {"$nin": ["user:scheduled"]}},
+        )
+        claimed_users = [call.args[0].get("user_id") for call in self.mock_db.upload_jobs.find_one_and_update.await_args_list]
+        self.assertNotIn("scheduled", claimed_users)
+
+        with patch("backend.services.background_jobs.time.monotonic", return_value=time.monotonic() + 60):
+            await self.service.claim_next_job()
+        self.assertEqual(self.mock_db.job_counters.find.call_args.args[0], {"queued": {"$gt": 0}})
+
+    async def test_claim_keeps_per_user_backlog_counter(self):
+        await self.service.record_status_change(None, "queued", user_id="user_1", plan="plus")
+        await self.service.record_status_change("queued", "processing", user_id="user_1")
+
+        user_calls = [
+            call.args for call in self.mock_db.job_counters.update_one.await_args_list
+            if call.args[0]["key"] == "user:user_1"
+        ]
+        self.assertEqual(user_calls[0][1], {"$inc": {"active": 1, "queued": 1}, "$set": {"plan": "plus"}})
+        self.assertEqual(user_calls[1][1], {"$inc": {"queued": -1}})
+
+
+class TestBackgroundJobScheduling(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.job_counters.update_one = AsyncMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+            prerender_job_types={"youtube_upload"},
+            prerender_ahead_seconds=3600,
+        )
+
+    async def test_create_job_stores_run_at_and_claims_only_due_jobs(self):
+        self.mock_db.upload_jobs.insert_one = AsyncMock()
+        job = await self.service.create_job(
+            current_user={"id": "user_1"},
+            job_type="youtube_upload",
+            payload={},
+            run_at="2026-06-01T18:00:00+00:00",
+        )
+        self.assertEqual(job["run_at"], "2026-06-01T18:00:00+00:00")
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"id": "job_due"})
+        await self.service.claim_next_job({"status": "queued"})
+
+        claim_filter = self.mock_db.upload_jobs.find_one_and_update.await_args.args[0]
+        self.assertEqual(claim_filter, {"status": "queued", "run_at": {"$lte": "2026-06-01T00:10:00+00:00"}})
+
+    async def test_idle_worker_prerenders_soonest_scheduled_job_inside_window(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=[None, {"id": "job_later"}])
+
+        job = await self.service.claim_next_job({"status": "queued"})
+
+        self.assertEqual(job["id"], "job_later")
+        call = self.mock_db.upload_jobs.find_one_and_update.await_args
+        prerender_filter = call.args[0]["$and"][1]
+        self.assertEqual(prerender_filter["type"], {"$in": ["youtube_upload"]})
+        self.assertEqual(
+            prerender_filter["run_at"],
+            {"$gt": "2026-06-01T00:10:00+00:00", "$lte": "2026-06-01T01:10:00+00:00"},
+        )
+        self.assertEqual(prerender_filter["prerendered"], {"$ne": True})
+        self.assertEqual(call.kwargs["sort"], [("run_at", 1)])
+
+    async def test_idle_wait_ends_when_soonest_scheduled_job_comes_due(self):
+        self.service.poll_interval_seconds = 30
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"run_at": "2026-06-01T00:10:00.200000+00:00"})
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self.service._wait_for_job_available({"status": "queued", "type": {"$in": ["youtube_upload"]}})
+
+        self.assertLess(loop.time() - started, 1)
+        lookup = self.mock_db.upload_jobs.find_one.await_args
+        self.assertEqual(
+            lookup.args[0],
+            {"status": "queued", "type": {"$in": ["youtube_upload"]}, "run_at": {"$gt": "2026-06-01T00:10:00+00:00"}},
+        )
+        self.assertEqual(lookup.kwargs["sort"], [("run_at", 1)])
+
+    async def test_defer_until_run_at_requeues_prerendered_job_without_worker(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"user_id": "user_1"})
+
+        deferred = await self.service.defer_until_run_at("job_1", message="Scheduled.")
+
+        self.assertTrue(deferred)
+        call = self.mock_db.upload_jobs.find_one_and_update.await_args
+        self.assertEqual(call.args[0], {"id": "job_1", "status": "processing", "worker_id": "worker-test"})
+        self.assertEqual(call.args[1]["$set"]["status"], "queued")
+        self.assertTrue(call.args[1]["$set"]["prerendered"])
+        self.assertIn("worker_id", call.args[1]["$unset"])
+
+
+class TestBackgroundJobProgressBuffer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.upload_jobs.update_one = AsyncMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+            progress_flush_interval_seconds=0.05,
+        )
+
+    async def test_progress_updates_are_coalesced_into_one_delayed_write(self):
+        await self.service.update_job("job_1", progress=41, message="Encoding video... 0%")
+        await self.service.update_job("job_1", progress=50, message="Encoding video... 40%")
+        await self.service.update_job("job_1", progress=55, extra_updates={"encode_progress": 60})
+
+        self.assertEqual(self.mock_db.upload_jobs.update_one.await_count, 1)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(self.mock_db.upload_jobs.update_one.await_count, 2)
+        merged = self.mock_db.upload_jobs.update_one.await_args.args[1]["$set"]
+        self.assertEqual(merged["progress"], 55)
+        self.assertEqual(merged["message"], "Encoding video... 40%")
+        self.assertEqual(merged["encode_progress"], 60)
+
+    async def test_terminal_status_flushes_pending_updates_immediately(self):
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"status": "processing", "user_id": "user_1"})
+        self.mock_db.job_counters.update_one = AsyncMock()
+        await self.service.update_job("job_1", progress=41)
+        await self.service.update_job("job_1", progress=60, extra_updates={"encode_progress": 90})
+        await self.service.update_job("job_1", status="succeeded", progress=100, message="Done.")
+
+        self.assertEqual(self.mock_db.upload_jobs.update_one.await_count, 1)
+        self.assertEqual(self.mock_db.upload_jobs.find_one_and_update.await_count, 1)
+        final = self.mock_db.upload_jobs.find_one_and_update.await_args.args[1]["$set"]
+        self.assertEqual(final["status"], "succeeded")
+        self.assertEqual(final["progress"], 100)
+        self.assertEqual(final["encode_progress"], 90)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.mock_db.upload_jobs.update_one.await_count, 1)
+
+
+    async def test_status_write_waits_for_in_flight_flush_of_running_job(self):
+        clock = {"now": "2026-06-01T00:10:00+00:00"}
+        self.service.now_factory = lambda: clock["now"]
+        self.service._cancel_events["job_1"] = threading.Event()
+        release_flush = asyncio.Event()
+        writes: list[tuple[str, dict, dict]] = []
+
+        async def update_one(update_filter, update):
+            writes.append(("update_one", update_filter, update["$set"]))
+            if len(writes) == 2:
+                await release_flush.wait()
+            return SimpleNamespace(matched_count=1)
+
+        async def find_one_and_update(update_filter, update, **kwargs):
+            writes.append(("find_one_and_update", update_filter, update["$set"]))
+            return {"status": "processing", "user_id": "user_1"}
+
+        self.mock_db.upload_jobs.update_one = AsyncMock(side_effect=update_one)
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=find_one_and_update)
+        self.mock_db.job_counters.update_one = AsyncMock()
+
+        await self.service.update_job("job_1", progress=41)
+        clock["now"] = "2026-06-01T00:10:01+00:00"
+        await self.service.update_job("job_1", progress=60)
+        clock["now"] = "2026-06-01T00:10:02+00:00"
+        await asyncio.sleep(0.08)
+        terminal = asyncio.create_task(self.service.update_job("job_1", status="succeeded", progress=100))
+        await asyncio.sleep(0.02)
+
+        self.assertEqual([kind for kind, _filter, _fields in writes], ["update_one", "update_one"])
+        release_flush.set()
+        await terminal
+
+        self.assertEqual([kind for kind, _filter, _fields in writes], ["update_one", "update_one", "find_one_and_update"])
+        _kind, flush_filter, flushed = writes[1]
+        self.assertEqual(flush_filter, {"id": "job_1", "status": "processing", "worker_id": "worker-test"})
+        self.assertEqual(flushed["progress"], 60)
+        self.assertEqual(flushed["updated_at"], "2026-06-01T00:10:02+00:00")
+        self.assertNotIn("job_1", self.service._job_write_locks)
+
+    async def test_flush_for_job_no_longer_owned_is_not_published(self):
+        self.service._cancel_events["job_1"] = threading.Event()
+        self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=0))
+        listener = MagicMock()
+        self.service.add_update_listener(listener)
+
+        await self.service.update_job("job_1", progress=41)
+
+        listener.assert_not_called()
+
+
+class TestBackgroundJobWorkerPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+            max_concurrency=4,
+            slot_capacity={"render": 1, "llm": 3},
+            job_slot_groups={"youtube_upload": "render", "tag_generation": "llm"},
+        )
+
+    async def test_claim_filter_excludes_job_types_whose_slot_group_is_full(self):
+        self.service._slot_usage["render"] = 1
+
+        claim_filter = self.service._claim_filter()
+
+        self.assertEqual(claim_filter, {"status": "queued", "type": {"$nin": ["youtube_upload"]}})
+
+    async def test_claim_filter_only_offers_configured_claim_types(self):
+        self.service.set_claim_types(["youtube_upload", "tag_generation"])
+        self.service._slot_usage["llm"] = 3
+
+        self.assertEqual(
+            self.service._claim_filter(),
+            {"status": "queued", "type": {"$in": ["youtube_upload"]}},
+        )
+        self.service._slot_usage["render"] = 1
+        self.assertIsNone(self.service._claim_filter())
+
+    async def test_claim_filter_is_none_when_pool_is_saturated(self):
+        self.service.max_concurrency = 1
+        self.service._active_tasks.add(MagicMock())
+
+        self.assertIsNone(self.service._claim_filter())
+
+    async def test_worker_loop_runs_llm_jobs_while_render_job_is_in_flight(self):
+        render_release = asyncio.Event()
+        finished: list[str] = []
+
+        async def render_handler(job):
+            await render_release.wait()
+            finished.append(job["id"])
+
+        async def tag_handler(job):
+            finished.append(job["id"])
+
+        self.service.set_handlers({"youtube_upload": render_handler, "tag_generation": tag_handler})
+        queued = [
+            {"id": "render_1", "type": "youtube_upload"},
+            {"id": "tags_1", "type": "tag_generation"},
+            {"id": "tags_2", "type": "tag_generation"},
+        ]
+        claim_filters = []
+
+        async def fake_claim(claim_filter, *args, **kwargs):
+            claim_filters.append(claim_filter)
+            return queued.pop(0) if queued else None
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=fake_claim)
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"status": "succeeded"})
+
+        worker = asyncio.create_task(self.service.worker_loop())
+        try:
+            for _ in range(50):
+                if finished == ["tags_1", "tags_2"]:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertEqual(finished, ["tags_1", "tags_2"])
+            self.assertEqual(self.service.slot_usage_snapshot()["render"], {"active": 1, "capacity": 1})
+            self.assertIn(
+                {"status": "queued", "type": {"$nin": ["youtube_upload"]}, "run_at": {"$lte": "2026-06-01T00:10:00+00:00"}},
+                claim_filters,
+            )
+            render_release.set()
+            for _ in range(50):
+                if "render_1" in finished:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertIn("render_1", finished)
+        finally:
+            worker.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await worker
+
+
+    async def test_drain_stops_claiming_finishes_short_jobs_and_hands_off_long_encodes(self):
+        render_stopped = asyncio.Event()
+
+        async def render_handler(job):
+            # Stands in for an FFmpeg encode that exits once its cancel event is set.
+            while not self.service.cancel_event_for(job["id"]).is_set():
+                await asyncio.sleep(0.01)
+            render_stopped.set()
+
+        async def tag_handler(_job):
+            await asyncio.sleep(0.05)
+
+        self.service.set_handlers({"youtube_upload": render_handler, "tag_generation": tag_handler})
+        started_at = (datetime.now(timezone.utc) - timedelta(seconds=100)).isoformat()
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor([
+            {"id": "render_1", "stage": "ffmpeg_render", "stage_started_at": started_at, "encode_progress": 10},
+            {"id": "tags_1", "stage": "llm_generate", "stage_started_at": started_at},
+        ])
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"status": "queued"})
+        self.mock_db.job_counters.update_one = AsyncMock()
+        self.service._start_job_task({"id": "render_1", "type": "youtube_upload"})
+        self.service._start_job_task({"id": "tags_1", "type": "tag_generation"})
+        await asyncio.sleep(0)
+
+        summary = await self.service.drain(grace_seconds=5)
+
+        self.assertEqual(summary, {"finished": 1, "handed_off": 1})
+        self.assertTrue(render_stopped.is_set())
+        self.assertIsNone(self.service._claim_filter())
+        handoff = self.mock_db.upload_jobs.update_many.await_args
+        self.assertEqual(handoff.args[0]["id"], {"$in": ["render_1"]})
+        self.assertEqual(handoff.args[0]["worker_id"], "worker-test")
+        self.assertEqual(handoff.args[1]["$set"]["status"], "queued")
+        self.assertNotIn("$inc", handoff.args[1])
+
+
+class TestBackgroundJobDispatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=30,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+            max_concurrency=2,
+        )
+
+    async def test_create_job_wakes_idle_worker_without_waiting_for_poll_interval(self):
+        handled = asyncio.Event()
+
+        async def tag_handler(_job):
+            handled.set()
+
+        self.service.set_handlers({"tag_generation": tag_handler})
+        queued: list[dict] = []
+
+        async def fake_claim(*args, **kwargs):
+            return queued.pop(0) if queued else None
+
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(side_effect=fake_claim)
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"status": "succeeded"})
+        self.mock_db.upload_jobs.insert_one = AsyncMock()
+
+        worker = asyncio.create_task(self.service.worker_loop())
+        try:
+            await asyncio.sleep(0.05)
+            job_doc = await self.service.create_job(
+                current_user={"id": "user_1"},
+                job_type="tag_generation",
+                payload={},
+            )
+            queued.append(job_doc)
+            await asyncio.wait_for(handled.wait(), timeout=1)
+        finally:
+            worker.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await worker
+
+    async def test_watch_queue_changes_falls_back_to_polling_without_replica_set(self):
+        from pymongo.errors import OperationFailure
+
+        self.mock_db.upload_jobs.watch.side_effect = OperationFailure(
+            "The $changeStream stage is only supported on replica sets",
+            code=40573,
+        )
+
+        await asyncio.wait_for(self.service.watch_queue_changes(), timeout=1)
+
+        self.assertFalse(self.service._job_available.is_set())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,218 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.background_jobs import BackgroundJobService
+from backend.services.job_durations import (
+    QUEUE_WAIT_STAGE,
+    TOTAL_RUN_STAGE,
+    JobDurationStats,
+    audio_duration_bucket,
+    feature_keys,
+)
+
+
+class _FakeCursor:
+    def __init__(self, items):
+        self.items = items
+
+    async def to_list(self, _):
+        return self.items
+
+
+def _iso_ago(seconds: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+class TestJobDurationStats(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.job_stage_durations.update_one = AsyncMock()
+        self.stats = JobDurationStats(db=self.mock_db, logger=MagicMock(), sample_limit=50, min_samples=3)
+
+    async def test_record_upserts_capped_samples_at_every_feature_level(self):
+        await self.stats.record("youtube_upload", "ffmpeg_render", 42.5, {"fps": 30, "visual": "gif", "audio": 3})
+
+        keys = [call.args[0]["key"] for call in self.mock_db.job_stage_durations.update_one.await_args_list]
+        self.assertEqual(
+            keys,
+            [
+                "youtube_upload|ffmpeg_render|",
+                "youtube_upload|ffmpeg_render|fps=30|visual=gif",
+                "youtube_upload|ffmpeg_render|fps=30|visual=gif|audio=3",
+            ],
+        )
+        update = self.mock_db.job_stage_durations.update_one.await_args.args[1]
+        self.assertEqual(update["$push"]["samples"], {"$each": [42.5], "$slice": -50})
+        self.assertTrue(self.mock_db.job_stage_durations.update_one.await_args.kwargs["upsert"])
+
+    async def test_percentile_falls_back_to_coarser_key_until_enough_samples(self):
+        self.mock_db.job_stage_durations.find.return_value = _FakeCursor(
+            [
+                {"job_type": "youtube_upload", "stage": "ffmpeg_render", "features": "", "samples": [10, 20, 30, 40]},
+                {"job_type": "youtube_upload", "stage": "ffmpeg_render", "features": "fps=60|visual=video", "samples": [200, 100, 300]},
+                {"job_type": "youtube_upload", "stage": "ffmpeg_render", "features": "fps=60|visual=video|audio=4", "samples": [500]},
+            ]
+        )
+        await self.stats.refresh(force=True)
+
+        features = {"fps": 60, "visual": "video", "audio": 4}
+        self.assertEqual(self.stats.percentile("youtube_upload", "ffmpeg_render", 0.5, features), 200)
+        self.assertEqual(self.stats.percentile("youtube_upload", "ffmpeg_render", 0.5, {"fps": 2, "visual": "image"}), 20)
+        self.assertIsNone(self.stats.percentile("tag_generation", "validate", 0.5))
+
+    async def test_stage_timeout_clamps_learned_p99_and_falls_back_to_static(self):
+        self.stats._samples = {("youtube_upload", "ffmpeg_render", ""): [20.0, 30.0, 50.0]}
+
+        self.assertEqual(self.stats.stage_timeout("youtube_upload", "ffmpeg_render", fallback=720), 150)
+        self.assertEqual(self.stats.stage_timeout("youtube_upload", "youtube_upload", fallback=900), 900)
+        self.stats._samples = {("youtube_upload", "ffmpeg_render", ""): [1.0, 2.0, 3.0]}
+        self.assertEqual(self.stats.stage_timeout("youtube_upload", "ffmpeg_render", fallback=720), 120)
+
+    def test_feature_keys_stop_at_first_missing_level(self):
+        self.assertEqual(feature_keys({"fps": 30}), [""])
+        self.assertEqual(feature_keys({"fps": 30, "visual": "image", "audio": None}), ["", "fps=30|visual=image"])
+        self.assertEqual(audio_duration_bucket(61), 2)
+        self.assertIsNone(audio_duration_bucket(0))
+
+
+class TestBackgroundJobDurationTracking(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.stats = JobDurationStats(db=MagicMock(), logger=MagicMock(), min_samples=3)
+        self.stats.record = AsyncMock()
+        self.service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: datetime.now(timezone.utc).isoformat(),
+            duration_stats=self.stats,
+        )
+
+    async def test_process_job_records_queue_wait_stage_durations_and_total(self):
+        self.mock_db.upload_jobs.update_one = AsyncMock()
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"status": "processing", "user_id": "user_1"})
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"id": "job_1", "status": "succeeded"})
+        self.mock_db.job_counters.update_one = AsyncMock()
+
+        async def handler(job):
+            await self.service.update_job(
+                "job_1",
+                extra_updates={"stage": "ffmpeg_render", "duration_features": {"fps": 30, "visual": "image"}},
+            )
+            await self.service.update_job("job_1", status="succeeded", progress=100)
+
+        self.service.set_handlers({"youtube_upload": handler})
+        await self.service.process_job(
+            {
+                "id": "job_1",
+                "type": "youtube_upload",
+                "stage": "validate",
+                "attempts": 0,
+                "created_at": _iso_ago(50),
+                "run_at": _iso_ago(50),
+                "started_at": _iso_ago(20),
+            }
+        )
+
+        await self.service.flush_duration_samples()
+
+        recorded = [(call.args[0], call.args[1]) for call in self.stats.record.await_args_list]
+        self.assertEqual(
+            recorded,
+            [
+                ("youtube_upload", QUEUE_WAIT_STAGE),
+                ("youtube_upload", "validate"),
+                ("youtube_upload", "ffmpeg_render"),
+                ("youtube_upload", TOTAL_RUN_STAGE),
+            ],
+        )
+        self.assertAlmostEqual(self.stats.record.await_args_list[0].args[2], 30, delta=1)
+        self.assertEqual(self.stats.record.await_args_list[2].args[3], {"fps": 30, "visual": "image"})
+        self.assertEqual(self.service._stage_clocks, {})
+
+    async def test_retried_job_records_stages_but_no_queue_wait_or_total(self):
+        self.mock_db.upload_jobs.update_one = AsyncMock()
+        self.mock_db.upload_jobs.find_one_and_update = AsyncMock(return_value={"status": "processing", "user_id": "user_1"})
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"id": "job_1", "status": "succeeded"})
+        self.mock_db.job_counters.update_one = AsyncMock()
+
+        async def handler(job):
+            await self.service.update_job("job_1", status="succeeded", progress=100)
+
+        self.service.set_handlers({"youtube_upload": handler})
+        await self.service.process_job(
+            {"id": "job_1", "type": "youtube_upload", "stage": "validate", "attempts": 1, "started_at": _iso_ago(5)}
+        )
+
+        await self.service.flush_duration_samples()
+
+        recorded = [call.args[1] for call in self.stats.record.await_args_list]
+        self.assertEqual(recorded, ["validate"])
+
+    async def test_watchdog_uses_learned_timeout_below_static_timeout(self):
+        self.stats.refresh = AsyncMock()
+        self.stats._samples = {("youtube_upload", "ffmpeg_render", "fps=2|visual=image"): [40.0, 50.0, 60.0]}
+        stuck_job = {
+            "id": "job_stuck",
+            "type": "youtube_upload",
+            "status": "processing",
+            "stage": "ffmpeg_render",
+            "attempts": 0,
+            "max_attempts": 2,
+            "worker_id": "other-worker",
+            "duration_features": {"fps": 2, "visual": "image", "audio": 3},
+            "stage_started_at": _iso_ago(400),
+            "last_heartbeat_at": _iso_ago(10),
+            "updated_at": _iso_ago(10),
+        }
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor([stuck_job])
+        self.mock_db.upload_jobs.update_one = AsyncMock(return_value=SimpleNamespace(modified_count=1))
+        self.mock_db.upload_jobs.update_many = AsyncMock(return_value=SimpleNamespace(modified_count=0))
+        self.mock_db.job_counters.update_one = AsyncMock()
+
+        result = await self.service.run_watchdog_pass(
+            default_timeout_seconds=300,
+            stage_timeouts={"ffmpeg_render": 720},
+            worker_dead_seconds=1800,
+        )
+
+        self.assertEqual(result["requeued"], 1)
+        find_filter = self.mock_db.upload_jobs.find.call_args.args[0]
+        cutoff = datetime.fromisoformat(find_filter["$or"][0]["stage_started_at"]["$lt"])
+        self.assertAlmostEqual((datetime.now(timezone.utc) - cutoff).total_seconds(), 180, delta=5)
+
+    async def test_estimate_job_eta_for_queued_and_processing_jobs(self):
+        self.stats._samples = {
+            ("youtube_upload", QUEUE_WAIT_STAGE, ""): [60.0, 60.0, 60.0],
+            ("youtube_upload", TOTAL_RUN_STAGE, ""): [300.0, 300.0, 300.0],
+        }
+
+        queued = self.service.estimate_job_eta(
+            {"type": "youtube_upload", "status": "queued", "created_at": _iso_ago(20), "run_at": _iso_ago(20)}
+        )
+        self.assertAlmostEqual(queued["predicted_wait_seconds"], 40, delta=1)
+        completion = datetime.fromisoformat(queued["estimated_completion_at"])
+        self.assertAlmostEqual((completion - datetime.now(timezone.utc)).total_seconds(), 340, delta=2)
+
+        processing = self.service.estimate_job_eta(
+            {"type": "youtube_upload", "status": "processing", "started_at": _iso_ago(100)}
+        )
+        self.assertEqual(processing["predicted_wait_seconds"], 0)
+        completion = datetime.fromisoformat(processing["estimated_completion_at"])
+        self.assertAlmostEqual((completion - datetime.now(timezone.utc)).total_seconds(), 200, delta=2)
+
+        finished = self.service.sanitize_job_doc({"id": "job_1", "type": "youtube_upload", "status": "succeeded"})
+        self.assertIsNone(finished["predicted_wait_seconds"])
+        self.assertIsNone(finished["estimated_completion_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.background_jobs import BackgroundJobService
+from backend.services.job_events import JobEventHub
+
+
+class _FakeCursor:
+    def __init__(self, items):
+        self.items = items
+
+    async def to_list(self, _):
+        return self.items
+
+
+class TestJobEventHub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        self.job_service = BackgroundJobService(
+            db=self.mock_db,
+            logger=MagicMock(),
+            poll_interval_seconds=1,
+            stale_after_seconds=60,
+            worker_id="worker-test",
+            now_factory=lambda: "2026-06-01T00:10:00+00:00",
+        )
+        self.hub = JobEventHub(
+            db=self.mock_db,
+            logger=MagicMock(),
+            sanitize_job_doc=self.job_service.sanitize_job_doc,
+            queue_size=4,
+        )
+        self.mock_db.upload_jobs.find_one = AsyncMock(
+            return_value={
+                "_id": "oid_1",
+                "id": "job_1",
+                "user_id": "user_1",
+                "status": "processing",
+                "stage": "ffmpeg_render",
+                "progress": 41,
+            }
+        )
+
+    async def test_many_watchers_share_one_load_and_receive_only_changed_fields(self):
+        watchers = [await self.hub.subscribe("job_1") for _ in range(50)]
+
+        self.assertEqual(self.mock_db.upload_jobs.find_one.await_count, 1)
+        self.hub.publish("job_1", {"progress": 50, "encode_progress": 40, "stage": "ffmpeg_render"})
+
+        for _doc, queue in watchers:
+            event, data = queue.get_nowait()
+            self.assertEqual(event, "delta")
+            self.assertEqual(data, {"id": "job_1", "progress": 50, "encode_progress": 40})
+
+    async def test_unchanged_publish_sends_nothing_and_last_watcher_releases_job(self):
+        _doc, queue = await self.hub.subscribe("job_1")
+
+        self.hub.publish("job_1", {"stage": "ffmpeg_render"})
+        self.assertTrue(queue.empty())
+
+        self.hub.unsubscribe("job_1", queue)
+        self.assertEqual(self.hub.watched_job_count(), 0)
+        self.hub.publish("job_1", {"progress": 90})
+        self.assertTrue(queue.empty())
+
+    async def test_slow_watcher_is_resynced_with_snapshot_when_queue_overflows(self):
+        _doc, queue = await self.hub.subscribe("job_1")
+
+        for progress in range(42, 48):
+            self.hub.publish("job_1", {"progress": progress})
+
+        event, data = queue.get_nowait()
+        self.assertEqual(event, "snapshot")
+        self.assertLessEqual(queue.qsize(), 3)
+
+    async def test_change_stream_event_maps_object_id_to_watched_job(self):
+        _doc, queue = await self.hub.subscribe("job_1")
+
+        self.hub.publish_change(
+            {
+                "documentKey": {"_id": "oid_1"},
+                "updateDescription": {"updatedFields": {"status": "succeeded", "progress": 100}},
+            }
+        )
+
+        _event, data = queue.get_nowait()
+        self.assertEqual(data["status"], "succeeded")
+        self.assertEqual(data["progress"], 100)
+
+    async def test_resync_refreshes_all_watched_jobs_in_one_query(self):
+        _doc, queue = await self.hub.subscribe("job_1")
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor(
+            [{"_id": "oid_1", "id": "job_1", "user_id": "user_1", "status": "processing", "stage": "youtube_upload", "progress": 70}]
+        )
+
+        await self.hub.resync()
+
+        self.mock_db.upload_jobs.find.assert_called_once()
+        self.assertEqual(self.mock_db.upload_jobs.find.call_args.args[0], {"id": {"$in": ["job_1"]}})
+        _event, data = queue.get_nowait()
+        self.assertEqual(data["stage"], "youtube_upload")
+        self.assertEqual(data["progress"], 70)
+
+    async def test_job_service_writes_feed_hub_listener(self):
+        self.mock_db.upload_jobs.update_one = AsyncMock()
+        self.job_service.add_update_listener(self.hub.publish)
+        _doc, queue = await self.hub.subscribe("job_1")
+
+        await self.job_service.update_job("job_1", progress=55, extra_updates={"encode_progress": 60})
+
+        _event, data = queue.get_nowait()
+        self.assertEqual(data["progress"], 55)
+        self.assertEqual(data["encode_progress"], 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
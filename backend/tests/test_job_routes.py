@@ -0,0 +1,150 @@
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ["MONGO_URL"] = "mongodb://localhost:27017"
+os.environ["JWT_SECRET_KEY"] = "test_secret"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_EXPIRATION_MINUTES"] = "60"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_123"
+os.environ["GOOGLE_CLIENT_ID"] = "test_client_id"
+os.environ["GOOGLE_CLIENT_SECRET"] = "test_client_secret"
+os.environ["DB_NAME"] = "test_db"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import server
+
+
+class _FakeCursor:
+    def __init__(self, items):
+        self.items = items
+
+    async def to_list(self, _):
+        return self.items
+
+
+class TestJobBatchRoute(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        server.db = self.mock_db
+        self.user = {"id": "user_1", "username": "user"}
+        stats_refresh = patch.object(server.job_duration_stats, "refresh", AsyncMock())
+        stats_refresh.start()
+        self.addCleanup(stats_refresh.stop)
+
+    async def test_batch_uses_one_in_query_scoped_to_user_and_since(self):
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor(
+            [
+                {"id": "job_a", "user_id": "user_1", "status": "processing", "progress": 50, "updated_at": "2026-06-01T00:10:05+00:00"},
+                {"id": "job_b", "user_id": "user_1", "status": "succeeded", "progress": 100, "updated_at": "2026-06-01T00:10:09+00:00"},
+            ]
+        )
+
+        result = await server.get_background_jobs_batch(
+            ids="job_a, job_b,job_c,job_a",
+            since="2026-06-01T00:10:00 00:00",
+            current_user=self.user,
+        )
+
+        self.mock_db.upload_jobs.find.assert_called_once()
+        query, projection = self.mock_db.upload_jobs.find.call_args.args
+        self.assertEqual(query["id"], {"$in": ["job_a", "job_b", "job_c"]})
+        self.assertEqual(query["user_id"], "user_1")
+        self.assertEqual(query["updated_at"], {"$gt": "2026-06-01T00:10:00+00:00"})
+        self.assertEqual(projection["payload"], 0)
+        self.assertEqual([job["id"] for job in result["jobs"]], ["job_a", "job_b"])
+        # The cursor trails the newest update so writes committed out of updated_at order are re-read.
+        self.assertEqual(result["cursor"], "2026-06-01T00:10:04+00:00")
+
+    async def test_batch_keeps_cursor_when_nothing_changed(self):
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor([])
+
+        result = await server.get_background_jobs_batch(
+            ids="job_a",
+            since="2026-06-01T00:10:00Z",
+            current_user=self.user,
+        )
+
+        self.assertEqual(result["jobs"], [])
+        self.assertEqual(result["cursor"], "2026-06-01T00:10:00+00:00")
+
+    async def test_batch_rejects_missing_ids_and_bad_since(self):
+        with self.assertRaises(server.HTTPException) as missing:
+            await server.get_background_jobs_batch(ids=" , ", current_user=self.user)
+        self.assertEqual(missing.exception.status_code, 400)
+
+        with self.assertRaises(server.HTTPException) as bad_since:
+            await server.get_background_jobs_batch(ids="job_a", since="yesterday", current_user=self.user)
+        self.assertEqual(bad_since.exception.status_code, 400)
+
+
+    async def test_batch_reads_jobs_missing_from_hot_collection_from_archive(self):
+        self.mock_db.upload_jobs.find.return_value = _FakeCursor(
+            [{"id": "job_a", "user_id": "user_1", "status": "processing", "updated_at": "2026-06-01T00:10:05+00:00"}]
+        )
+        self.mock_db.upload_jobs_archive.find.return_value = _FakeCursor(
+            [{"id": "job_b", "user_id": "user_1", "status": "succeeded", "updated_at": "2026-05-01T00:00:00+00:00"}]
+        )
+
+        result = await server.get_background_jobs_batch(ids="job_a,job_b", current_user=self.user)
+
+        archive_query = self.mock_db.upload_jobs_archive.find.call_args.args[0]
+        self.assertEqual(archive_query, {"id": {"$in": ["job_b"]}, "user_id": "user_1"})
+        self.assertEqual([job["id"] for job in result["jobs"]], ["job_a", "job_b"])
+
+    async def test_single_job_falls_back_to_archive(self):
+        original_db = server.background_job_service.db
+        server.background_job_service.db = self.mock_db
+        self.addCleanup(setattr, server.background_job_service, "db", original_db)
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value=None)
+        self.mock_db.upload_jobs_archive.find_one = AsyncMock(
+            return_value={"id": "job_old", "user_id": "user_1", "status": "failed", "error": "boom"}
+        )
+
+        result = await server.get_background_job("job_old", current_user=self.user)
+
+        self.assertEqual(result["job"]["status"], "failed")
+        self.assertEqual(result["job"]["error"], "boom")
+        self.assertEqual(
+            self.mock_db.upload_jobs_archive.find_one.await_args.args[0],
+            {"id": "job_old", "user_id": "user_1"},
+        )
+
+
+class TestJobEventsStreamAuth(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_db = MagicMock()
+        server.db = self.mock_db
+        self.user = {"id": "user_1", "username": "user"}
+
+    async def test_stream_token_is_scoped_to_one_job(self):
+        self.mock_db.upload_jobs.find_one = AsyncMock(return_value={"id": "job_a"})
+
+        issued = await server.create_background_job_events_token("job_a", current_user=self.user)
+
+        self.assertEqual(issued["expires_in"], server.JOB_EVENTS_TOKEN_TTL_SECONDS)
+        self.assertEqual(
+            self.mock_db.upload_jobs.find_one.await_args.args[0],
+            {"id": "job_a", "user_id": "user_1"},
+        )
+        user = await server.get_current_user_for_job_stream("job_a", stream_token=issued["stream_token"], credentials=None)
+        self.assertEqual(user, {"id": "user_1"})
+        with self.assertRaises(server.HTTPException) as other_job:
+            await server.get_current_user_for_job_stream("job_b", stream_token=issued["stream_token"], credentials=None)
+        self.assertEqual(other_job.exception.status_code, 401)
+        with self.assertRaises(server.HTTPException):
+            await server._resolve_current_user(issued["stream_token"])
+
+    async def test_session_jwt_is_not_accepted_in_query(self):
+        session_token = server.create_access_token("user_1", "user")
+
+        with self.assertRaises(server.HTTPException) as ctx:
+            await server.get_current_user_for_job_stream("job_a", stream_token=session_token, credentials=None)
+
+        self.assertEqual(ctx.exception.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.render_cache import RenderOutputCache
+
+
+class TestRenderOutputCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.cache = RenderOutputCache(root_dir=self.root / "render_cache", max_bytes=25, logger=MagicMock())
+
+    def _render(self, name: str, data: bytes) -> Path:
+        path = self.root / name
+        path.write_bytes(data)
+        return path
+
+    def test_key_is_stable_across_dict_order_and_changes_with_inputs(self):
+        key = RenderOutputCache.build_key({"audio": "a", "render": {"fps": 30, "scale": 1.0}})
+        self.assertEqual(key, RenderOutputCache.build_key({"render": {"scale": 1.0, "fps": 30}, "audio": "a"}))
+        self.assertNotEqual(key, RenderOutputCache.build_key({"audio": "a", "render": {"fps": 60, "scale": 1.0}}))
+
+    def test_hit_links_cached_render_to_destination_with_metadata(self):
+        source = self._render("job.mp4", b"video-1")
+        self.cache.put("key1", source, {"fps": 30})
+        source.unlink()
+
+        dest = self.root / "out.mp4"
+        dest.write_bytes(b"")
+        metadata = self.cache.get("key1", dest)
+
+        self.assertEqual(metadata, {"fps": 30})
+        self.assertEqual(dest.read_bytes(), b"video-1")
+        dest.unlink()
+        self.assertIsNotNone(self.cache.get("key1", self.root / "again.mp4"))
+        self.assertIsNone(self.cache.get("missing", self.root / "none.mp4"))
+
+    def test_least_recently_used_entries_are_evicted_past_max_bytes(self):
+        self.cache.put("old", self._render("a.mp4", b"x" * 10), {})
+        self.cache.put("used", self._render("b.mp4", b"y" * 10), {})
+        os.utime(self.root / "render_cache" / "old.mp4", (1, 1))
+        os.utime(self.root / "render_cache" / "used.mp4", (2, 2))
+        self.cache.get("used", self.root / "hit.mp4")
+
+        self.cache.put("new", self._render("c.mp4", b"z" * 10), {})
+
+        self.assertFalse((self.root / "render_cache" / "old.mp4").exists())
+        self.assertFalse((self.root / "render_cache" / "old.json").exists())
+        self.assertTrue((self.root / "render_cache" / "used.mp4").exists())
+        self.assertTrue((self.root / "render_cache" / "new.mp4").exists())
+
+    def test_disabled_cache_never_hits(self):
+        cache = RenderOutputCache(root_dir=self.root / "render_cache", max_bytes=0, logger=MagicMock())
+        cache.put("key1", self._render("job.mp4", b"video"), {})
+        self.assertIsNone(cache.get("key1", self.root / "out.mp4"))
+        self.assertFalse((self.root / "render_cache").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
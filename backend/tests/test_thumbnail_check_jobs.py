@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ["MONGO_URL"] = "mongodb://localhost:27017"
+os.environ["JWT_SECRET_KEY"] = "test_secret"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_EXPIRATION_MINUTES"] = "60"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_123"
+os.environ["GOOGLE_CLIENT_ID"] = "test_client_id"
+os.environ["GOOGLE_CLIENT_SECRET"] = "test_client_secret"
+os.environ["DB_NAME"] = "test_db"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from backend import server
+from backend.storage import LocalMediaStorage
+
+
+class TestThumbnailCheckImageStorage(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.storage = LocalMediaStorage(Path(self.temp_dir.name))
+        storage_patch = patch.object(server, "media_storage", self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.user = {"id": "user_1", "username": "user"}
+
+    async def test_uploaded_image_is_stored_by_reference_not_in_payload(self):
+        upload = UploadFile(
+            file=io.BytesIO(b"\x89PNG-thumbnail-bytes"),
+            filename="thumb.png",
+            headers=Headers({"content-type": "image/png"}),
+        )
+        create_job = AsyncMock(side_effect=lambda **kwargs: {"id": kwargs["job_id"], "status": "queued"})
+
+        with patch.object(server, "_guard_heavy_feature", AsyncMock()), \
+                patch.object(server, "_enforce_action_rate_limit"), \
+                patch.object(server, "_create_background_job", create_job):
+            response = await server.check_thumbnail(
+                request=MagicMock(),
+                file=upload,
+                image_file_id="",
+                title="Title",
+                tags="tags",
+                description="desc",
+                llm_provider=None,
+                current_user=self.user,
+            )
+
+        kwargs = create_job.await_args.kwargs
+        payload = kwargs["payload"]
+        self.assertNotIn("image_bytes_b64", payload)
+        self.assertEqual(payload["image_mime"], "image/png")
+        self.assertEqual(payload["image_storage"]["storage_key"], f"{kwargs['job_id']}.input.png")
+        self.assertEqual(self.storage.read_bytes(payload["image_storage"]), b"\x89PNG-thumbnail-bytes")
+        self.assertEqual(response["job"]["id"], kwargs["job_id"])
+
+    async def test_job_reads_stored_image_and_deletes_it_when_finished(self):
+        storage_meta = self.storage.save_bytes(data=b"jpeg-bytes", file_id="job_1.input", file_ext=".jpg")
+        job = {
+            "id": "job_1",
+            "user_id": "user_1",
+            "payload": {
+                "image_file_id": "",
+                "image_storage": storage_meta,
+                "image_mime": "image/jpeg",
+                "title": "Title",
+                "tags": "tags",
+                "description": "desc",
+            },
+        }
+        analysis = {
+            "score": 80,
+            "verdict": "Strong.",
+            "strengths": ["contrast"],
+            "issues": [],
+            "suggestions": ["keep it"],
+            "text_overlay_suggestion": "TYPE BEAT",
+            "branding_suggestion": "badge",
+        }
+        llm_chat_with_image = AsyncMock(return_value=json.dumps(analysis))
+        update_job = AsyncMock()
+
+        with patch.object(server, "llm_chat_with_image", llm_chat_with_image), \
+                patch.object(server, "_update_upload_job", update_job):
+            await server._process_thumbnail_check_job(job)
+
+        self.assertEqual(llm_chat_with_image.await_args.kwargs["image_bytes"], b"jpeg-bytes")
+        self.assertEqual(update_job.await_args.kwargs["status"], "succeeded")
+        self.assertFalse(self.storage.exists(storage_meta))
+        self.assertTrue(update_job.await_args.kwargs["only_if_owned"])
+
+    async def test_run_that_lost_its_lease_keeps_image_for_retry(self):
+        storage_meta = self.storage.save_bytes(data=b"jpeg-bytes", file_id="job_3.input", file_ext=".jpg")
+        job = {"id": "job_3", "user_id": "user_1", "payload": {"image_storage": storage_meta, "title": "Title"}}
+
+        with patch.object(server, "_execute_thumbnail_check_job", AsyncMock(return_value={"score": 80})), \
+                patch.object(server, "_update_upload_job", AsyncMock(return_value=None)):
+            await server._process_thumbnail_check_job(job)
+
+        self.assertTrue(self.storage.exists(storage_meta))
+
+    async def test_archival_deletes_image_of_job_that_never_ran(self):
+        storage_meta = self.storage.save_bytes(data=b"jpeg-bytes", file_id="job_2.input", file_ext=".jpg")
+        archived = [{"id": "job_2", "type": "thumbnail_check", "status": "cancelled", "payload": {"image_storage": storage_meta}}]
+
+        with patch.object(server.background_job_service, "archive_finished_jobs", AsyncMock(return_value=archived)):
+            self.assertEqual(await server._archive_finished_jobs(), 1)
+
+        self.assertFalse(self.storage.exists(storage_meta))
+
+
+if __name__ == "__main__":
+    unittest.main()
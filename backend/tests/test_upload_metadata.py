@@ -0,0 +1,152 @@
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ["MONGO_URL"] = "mongodb://localhost:27017"
+os.environ["JWT_SECRET_KEY"] = "test_secret"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_EXPIRATION_MINUTES"] = "60"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_123"
+os.environ["GOOGLE_CLIENT_ID"] = "test_client_id"
+os.environ["GOOGLE_CLIENT_SECRET"] = "test_client_secret"
+os.environ["DB_NAME"] = "test_db"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from backend import server
+from backend.storage import LocalMediaStorage
+
+
+class TestUploadMediaMetadata(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.storage = LocalMediaStorage(self.root)
+        storage_patch = patch.object(server, "media_storage", self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.user = {"id": "user_1", "username": "user"}
+
+    async def test_save_upload_file_hashes_while_streaming(self):
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        upload = UploadFile(file=io.BytesIO(data), filename="beat.mp3")
+
+        meta = await self.storage.save_upload_file(upload_file=upload, file_id="f1", file_ext=".mp3", max_bytes=10**8)
+
+        self.assertEqual(meta["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.storage.save_bytes(data=data, file_id="f2", file_ext=".mp3")["sha256"], meta["sha256"])
+
+    async def test_audio_and_image_uploads_record_hash_and_probed_metadata(self):
+        audio_bytes = b"ID3" + b"\x00" * 4096
+        image_buffer = io.BytesIO()
+        Image.new("RGB", (640, 360), "red").save(image_buffer, "PNG")
+        mock_db = MagicMock()
+        mock_db.uploads.insert_one = AsyncMock()
+        audio_metadata = {"duration": 184.2, "codec": "mp3", "sample_rate": 44100, "channels": 2}
+
+        with patch.object(server, "db", mock_db), \
+                patch.object(server, "_create_background_job", AsyncMock(return_value={"id": "job_prepare"})), \
+                patch.object(server, "_probe_audio_metadata", return_value=audio_metadata) as probe_audio:
+            await server.upload_audio(
+                file=UploadFile(
+                    file=io.BytesIO(audio_bytes),
+                    filename="beat.mp3",
+                    headers=Headers({"content-type": "audio/mpeg"}),
+                ),
+                current_user=self.user,
+            )
+            await server.upload_image(
+                file=UploadFile(
+                    file=io.BytesIO(image_buffer.getvalue()),
+                    filename="cover.png",
+                    headers=Headers({"content-type": "image/png"}),
+                ),
+                current_user=self.user,
+            )
+
+        probe_audio.assert_called_once()
+        audio_doc, image_doc = [call.args[0] for call in mock_db.uploads.insert_one.await_args_list]
+        self.assertEqual(audio_doc["sha256"], hashlib.sha256(audio_bytes).hexdigest())
+        self.assertEqual(audio_doc["media_metadata"], audio_metadata)
+        self.assertEqual(image_doc["sha256"], hashlib.sha256(image_buffer.getvalue()).hexdigest())
+        self.assertEqual(image_doc["media_metadata"], {"width": 640, "height": 360})
+        self.assertEqual(image_doc["detected_format"], ".png")
+
+    async def test_render_reads_recorded_metadata_instead_of_probing(self):
+        (self.root / "audio_1.mp3").write_bytes(b"audio bytes")
+        (self.root / "image_1.png").write_bytes(b"image bytes")
+        audio_upload = {
+            "id": "audio_1",
+            "storage_key": "audio_1.mp3",
+            "sha256": "a" * 64,
+            "media_metadata": {"duration": 95.5, "codec": "mp3"},
+        }
+        image_upload = {
+            "id": "image_1",
+            "storage_key": "image_1.png",
+            "sha256": "b" * 64,
+            "detected_format": ".png",
+            "media_metadata": {"width": 1920, "height": 1080},
+        }
+        payload = {
+            "title": "My Beat",
+            "remove_watermark": True,
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=2),
+        }
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+
+        with patch("backend.server.render_output_cache", disabled_cache), \
+                patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+                patch("backend.server._compose_still_frame", side_effect=OSError("not an image")), \
+                patch("backend.server._probe_audio_duration_seconds", side_effect=AssertionError("probed audio")), \
+                patch("backend.server._probe_image_dimensions", side_effect=AssertionError("probed image")), \
+                patch("backend.server._sniff_visual_format_path", side_effect=AssertionError("sniffed file")), \
+                patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            mock_ffmpeg.return_value = server.subprocess.CompletedProcess([], 0, "", "")
+            await server._render_youtube_video(audio_upload=audio_upload, image_upload=image_upload, payload=payload)
+
+        self.assertEqual(payload["_media_debug"]["source_audio_duration_seconds"], 95.5)
+        self.assertEqual(payload["_media_debug"]["layout_mode"], "fill_frame")
+
+    async def test_gif_cache_lookup_uses_recorded_metadata_and_hash(self):
+        (self.root / "loop_1.gif").write_bytes(b"GIF89a" + b"\x00" * 64)
+        (self.root / "loop_1.derived.mp4").write_bytes(b"cached mp4")
+        image_upload = {
+            "id": "loop_1",
+            "storage_key": "loop_1.gif",
+            "sha256": "c" * 64,
+            "detected_format": ".gif",
+            "media_metadata": {"width": 480, "height": 270, "nb_frames": 40, "duration": 4.0, "codec": "gif"},
+        }
+        cache_fps = server._resolve_gif_mux_fps(30)
+        signature = server._gif_cache_signature(
+            source_sha256="c" * 64,
+            cache_fps=cache_fps,
+            max_height=server.GIF_TRANSCODE_MAX_HEIGHT,
+        )
+        mock_db = MagicMock()
+        mock_db.uploads.find_one = AsyncMock(
+            return_value={"derived_video": {"storage_key": "loop_1.derived.mp4", "cache_signature": signature}}
+        )
+
+        with patch.object(server, "db", mock_db), \
+                patch("backend.server._probe_gif_metadata", side_effect=AssertionError("probed gif")), \
+                patch("backend.server._file_sha256_hex", side_effect=AssertionError("hashed gif")):
+            cached_path, fps = await server._get_or_create_gif_mp4_cache(image_upload, self.root / "loop_1.gif", user_render_fps=30)
+
+        self.assertEqual(cached_path, self.root / "loop_1.derived.mp4")
+        self.assertEqual(fps, cache_fps)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ["MONGO_URL"] = "mongodb://localhost:27017"
+os.environ["JWT_SECRET_KEY"] = "test_secret"
+os.environ["JWT_ALGORITHM"] = "HS256"
+os.environ["JWT_EXPIRATION_MINUTES"] = "60"
+os.environ["STRIPE_SECRET_KEY"] = "sk_test_123"
+os.environ["GOOGLE_CLIENT_ID"] = "test_client_id"
+os.environ["GOOGLE_CLIENT_SECRET"] = "test_client_secret"
+os.environ["DB_NAME"] = "test_db"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from backend import server
+from backend.storage import LocalMediaStorage
+
+
+class TestVisualNormalization(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.storage = LocalMediaStorage(self.root)
+        storage_patch = patch.object(server, "media_storage", self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.user = {"id": "user_1", "username": "user"}
+
+    async def _upload_gif(self, active_prep_jobs: int = 0):
+        mock_db = MagicMock()
+        mock_db.uploads.insert_one = AsyncMock()
+        mock_db.upload_jobs.count_documents = AsyncMock(return_value=active_prep_jobs)
+        create_job = AsyncMock(side_effect=lambda **kwargs: {"id": "job_norm", "status": "queued"})
+
+        with patch.object(server, "db", mock_db), \
+                patch.object(server, "_probe_gif_metadata", return_value={"width": 320, "height": 240, "nb_frames": 12}), \
+                patch.object(server, "_create_background_job", create_job):
+            response = await server.upload_image(
+                file=UploadFile(
+                    file=io.BytesIO(b"GIF89a" + b"\x00" * 64),
+                    filename="loop.gif",
+                    headers=Headers({"content-type": "image/gif"}),
+                ),
+                current_user=self.user,
+            )
+        return response, create_job, mock_db
+
+    async def test_animated_upload_queues_normalize_job(self):
+        response, create_job, _ = await self._upload_gif()
+
+        kwargs = create_job.await_args.kwargs
+        self.assertEqual(kwargs["job_type"], "visual_normalize")
+        self.assertEqual(kwargs["payload"], {"upload_id": response["file_id"]})
+        self.assertEqual(response["normalize_job_id"], "job_norm")
+        self.assertEqual(server.JOB_SLOT_GROUPS["visual_normalize"], "prep")
+        self.assertEqual(server._job_priority("visual_normalize"), 2)
+
+    async def test_upload_skips_normalize_job_when_user_is_at_prep_cap(self):
+        response, create_job, mock_db = await self._upload_gif(active_prep_jobs=server.UPLOAD_PREP_MAX_ACTIVE_PER_USER)
+
+        create_job.assert_not_awaited()
+        self.assertIsNone(response["normalize_job_id"])
+        count_filter = mock_db.upload_jobs.count_documents.await_args.args[0]
+        self.assertEqual(count_filter["user_id"], "user_1")
+        self.assertIn("visual_normalize", count_filter["type"]["$in"])
+
+    async def test_normalize_job_transcodes_video_without_gif_loop_flag(self):
+        (self.root / "clip_1.mp4").write_bytes(b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64)
+        image_upload = {
+            "id": "clip_1",
+            "user_id": "user_1",
+            "storage_key": "clip_1.mp4",
+            "media_kind": "video",
+            "detected_format": ".mp4",
+            "sha256": "d" * 64,
+            "media_metadata": {"width": 1920, "height": 1080, "nb_frames": 900, "duration": 30.0, "codec": "h264"},
+        }
+        mock_db = MagicMock()
+        mock_db.uploads.find_one = AsyncMock(side_effect=[image_upload, None])
+        mock_db.uploads.update_one = AsyncMock()
+        update_job = AsyncMock()
+        heartbeat = AsyncMock()
+
+        def fake_ffmpeg(command, **kwargs):
+            Path(command[-1]).write_bytes(b"normalized mp4")
+            return server.subprocess.CompletedProcess(command, 0, "", "")
+
+        with patch.object(server, "db", mock_db), \
+                patch.object(server, "_update_upload_job", update_job), \
+                patch.object(server, "_job_heartbeat_loop", heartbeat), \
+                patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+                patch("backend.server._run_ffmpeg_command_with_progress", side_effect=fake_ffmpeg) as mock_ffmpeg:
+            await server._process_visual_normalize_job(
+                {"id": "job_norm", "user_id": "user_1", "payload": {"upload_id": "clip_1"}}
+            )
+
+        command = mock_ffmpeg.call_args.args[0]
+        self.assertNotIn("-ignore_loop", command)
+        self.assertIn("fps=30", command[command.index("-vf") + 1])
+        derived = mock_db.uploads.update_one.await_args.args[1]["$set"]["derived_video"]
+        self.assertEqual((derived["fps"], derived["max_height"]), (30, server.GIF_TRANSCODE_MAX_HEIGHT))
+        self.assertEqual((self.root / "clip_1.derived.mp4").read_bytes(), b"normalized mp4")
+        self.assertEqual(update_job.await_args.kwargs["status"], "succeeded")
+        self.assertTrue(update_job.await_args.kwargs["only_if_owned"])
+        self.assertNotIn("worker_id", update_job.await_args.kwargs["extra_updates"])
+        heartbeat.assert_awaited_once_with("job_norm")
+
+    def test_cached_clip_serves_renders_at_lower_fps_only(self):
+        derived = {
+            "cache_signature": "other",
+            "cache_version": server.GIF_CACHE_VERSION,
+            "source_sha256": "e" * 64,
+            "fps": 15,
+            "max_height": 720,
+        }
+        covers = lambda fps, height=720: server._derived_video_covers(
+            derived, signature="new", source_sha256="e" * 64, cache_fps=fps, max_height=height
+        )
+
+        self.assertTrue(covers(2))
+        self.assertTrue(covers(15))
+        self.assertFalse(covers(30))
+        self.assertFalse(covers(2, height=480))
+
+    async def test_render_muxes_normalized_video_clip_at_clip_fps(self):
+        (self.root / "audio_1.mp3").write_bytes(b"audio bytes")
+        (self.root / "clip_1.mp4").write_bytes(b"original video")
+        (self.root / "clip_1.derived.mp4").write_bytes(b"normalized video")
+        audio_upload = {"id": "audio_1", "storage_key": "audio_1.mp3", "media_metadata": {"duration": 60.0}}
+        image_upload = {
+            "id": "clip_1",
+            "storage_key": "clip_1.mp4",
+            "media_kind": "video",
+            "detected_format": ".mp4",
+            "sha256": "f" * 64,
+            "media_metadata": {"width": 1280, "height": 720, "nb_frames": 300, "duration": 10.0, "codec": "h264"},
+        }
+        mock_db = MagicMock()
+        mock_db.uploads.find_one = AsyncMock(
+            return_value={
+                "derived_video": {
+                    "storage_key": "clip_1.derived.mp4",
+                    "cache_signature": "from upload",
+                    "cache_version": server.GIF_CACHE_VERSION,
+                    "source_sha256": "f" * 64,
+                    "fps": 30,
+                    "max_height": server.GIF_TRANSCODE_MAX_HEIGHT,
+                }
+            }
+        )
+        payload = {
+            "title": "My Beat",
+            **server._normalize_upload_render_settings("16:9", 1.0, None, None, 0.0, 0.0, 0.0, "black", render_fps=60),
+        }
+        disabled_cache = server.RenderOutputCache(root_dir=None, max_bytes=0, logger=MagicMock())
+
+        with patch.object(server, "db", mock_db), \
+                patch("backend.server.render_output_cache", disabled_cache), \
+                patch("backend.server._resolve_ffmpeg_binary", return_value="ffmpeg"), \
+                patch("backend.server._probe_image_dimensions", return_value=(1280, 720)), \
+                patch("backend.server._run_ffmpeg_command_with_progress") as mock_ffmpeg:
+            mock_ffmpeg.return_value = server.subprocess.CompletedProcess([], 0, "", "")
+            await server._render_youtube_video(audio_upload=audio_upload, image_upload=image_upload, payload=payload)
+
+        command = mock_ffmpeg.call_args.args[0]
+        self.assertIn(str(self.root / "clip_1.derived.mp4"), command)
+        self.assertNotIn(str(self.root / "clip_1.mp4"), command)
+        self.assertEqual(command[command.index("-r") + 1], "30")
+        self.assertTrue(payload["_media_debug"]["normalized_visual_clip"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.visualizer import VisualizerFrameRenderer
+
+
+def _sine(frequency: float, seconds: float, amplitude: float = 0.5, sample_rate: int = 22050) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+class TestVisualizerFrameRenderer(unittest.TestCase):
+    def test_frames_cover_track_at_fps_and_stream_as_gray_bytes(self):
+        renderer = VisualizerFrameRenderer(_sine(440, 2.0), fps=30, width=64, height=36, batch_size=7)
+
+        chunks = list(renderer.iter_frames())
+
+        self.assertEqual(renderer.frame_count, 60)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 60 * 64 * 36)
+        tail = b"".join(renderer.iter_frames(start_frame=50, frame_count=20))
+        self.assertEqual(len(tail), 10 * 64 * 36)
+
+    def test_waveform_mask_is_centred_and_scales_with_amplitude(self):
+        quiet = VisualizerFrameRenderer(_sine(440, 1.0, amplitude=0.1), fps=30, width=64, height=100, opacity=1.0)
+        loud = VisualizerFrameRenderer(_sine(440, 1.0, amplitude=0.8), fps=30, width=64, height=100, opacity=1.0)
+
+        quiet_mask = quiet.render_batch(10, 1)[0]
+        loud_mask = loud.render_batch(10, 1)[0]
+
+        self.assertEqual(loud_mask.max(), 255)
+        self.assertGreater((loud_mask > 0).sum(), (quiet_mask > 0).sum() * 4)
+        filled_rows = np.nonzero(loud_mask.any(axis=1))[0]
+        self.assertAlmostEqual((filled_rows.min() + filled_rows.max()) / 2.0, 49.5, delta=1)
+
+    def test_bars_follow_the_spectrum_and_silence_draws_nothing(self):
+        low = VisualizerFrameRenderer(_sine(100, 1.0), fps=30, width=128, height=60, mode="monstercat")
+        high = VisualizerFrameRenderer(_sine(5000, 1.0), fps=30, width=128, height=60, mode="monstercat")
+        silent = VisualizerFrameRenderer(np.zeros(22050, dtype=np.float32), fps=30, width=128, height=60, mode="monstercat")
+
+        low_columns = np.nonzero(low.render_batch(15, 1)[0][-1])[0]
+        high_columns = np.nonzero(high.render_batch(15, 1)[0][-1])[0]
+
+        self.assertLess(low_columns.mean(), high_columns.mean())
+        self.assertFalse(silent.render_batch(0, 4).any())
+
+    def test_opacity_sets_mask_value(self):
+        renderer = VisualizerFrameRenderer(_sine(440, 1.0), fps=30, width=32, height=32, opacity=0.5)
+
+        self.assertEqual(set(np.unique(renderer.render_batch(5, 1))), {0, 128})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Standalone background job worker.
+
+    python -m backend.worker --types youtube_upload,tag_generation
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+
+try:
+    from backend import server
+except ImportError:
+    import server
+
+
+logger = logging.getLogger("backend.worker")
+
+
+def _parse_job_types(raw: str | None) -> list[str]:
+    return [item.strip() for item in str(raw or "").split(",") if item.strip()]
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run SendMyBeat background jobs outside the API process.")
+    parser.add_argument(
+        "--types",
+        default="",
+        help="Comma-separated job types to claim (default: every registered type).",
+    )
+    parser.add_argument(
+        "--no-watchdog",
+        action="store_true",
+        help="Do not run the stale-job watchdog in this process.",
+    )
+    parser.add_argument(
+        "--spotlight",
+        action="store_true",
+        help="Also run the Spotlight cache refresh loop (enable in exactly one process).",
+    )
+    return parser
+
+
+async def run_worker(*, job_types: list[str], run_watchdog: bool, run_spotlight: bool) -> None:
+    server._validate_security_configuration()
+    server._log_youtube_render_timeout_configuration()
+    server.background_job_service.set_claim_types(job_types)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    logger.info(
+        "Standalone job worker %s starting types=%s watchdog=%s spotlight=%s",
+        server.background_job_service.worker_id,
+        ",".join(job_types) or "all",
+        run_watchdog,
+        run_spotlight,
+    )
+    await server._start_background_loops(run_watchdog=run_watchdog, run_spotlight=run_spotlight)
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Standalone job worker %s stopping", server.background_job_service.worker_id)
+        await server._stop_background_loops()
+        server.client.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    job_types = _parse_job_types(args.types)
+    unknown_types = sorted(set(job_types) - set(server.background_job_service.handlers))
+    if unknown_types:
+        parser.error(f"Unknown job types: {', '.join(unknown_types)}")
+    asyncio.run(
+        run_worker(
+            job_types=job_types,
+            run_watchdog=not args.no_watchdog,
+            run_spotlight=args.spotlight,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -280,6 +280,11 @@ const Dashboard = ({ setIsAuthenticated }) => {
   const [joiningTagsLoading, setJoiningTagsLoading] = useState(false);
   const [joiningTagsProgress, setJoiningTagsProgress] = useState(0);
   const joinProgressIntervalRef = useRef(null);
+  const jobWatchersRef = useRef(new Map());
+  const jobPollTimerRef = useRef(null);
+  const jobPollInFlightRef = useRef(false);
+  const jobPollCursorRef = useRef(null);
+  const jobPollFailuresRef = useRef(0);
   const dashboardParallaxRef = useRef(null);
 
   const analyticsPlan = subscriptionStatus?.plan || "free";
@@ -402,6 +407,11 @@ const Dashboard = ({ setIsAuthenticated }) => {
       clearInterval(joinProgressIntervalRef.current);
       joinProgressIntervalRef.current = null;
     }
+    if (jobPollTimerRef.current) {
+      window.clearTimeout(jobPollTimerRef.current);
+      jobPollTimerRef.current = null;
+    }
+    jobWatchersRef.current.clear();
   }, []);
 
   useEffect(() => {
@@ -571,24 +581,80 @@ const Dashboard = ({ setIsAuthenticated }) => {
     toast.success("Logged out successfully");
   };
 
-  const pollBackgroundJobUntilDone = async (jobId, { intervalMs = 2500, maxAttempts = 240 } = {}) => {
-    for (let attempt = 0; attempt < maxAttempts; attempt += 1) {
-      const response = await axios.get(`${API}/jobs/${jobId}`);
-      const job = response?.data?.job;
-      if (!job) {
-        throw new Error("Job status response missing job data");
+  // Every job the dashboard is waiting on is refreshed by one batched GET /jobs?ids=...&since=... request.
+  const runBackgroundJobBatchPoll = async () => {
+    jobPollTimerRef.current = null;
+    const watchers = jobWatchersRef.current;
+    if (!watchers.size) return;
+    jobPollInFlightRef.current = true;
+    try {
+      const requestedIds = new Set(watchers.keys());
+      const params = { ids: Array.from(requestedIds).join(",") };
+      if (jobPollCursorRef.current) {
+        params.since = jobPollCursorRef.current;
       }
-      if (job.status === "succeeded") {
-        return job.result;
+      const response = await axios.get(`${API}/jobs`, { params });
+      const hasNewWatchers = Array.from(watchers.keys()).some((jobId) => !requestedIds.has(jobId));
+      jobPollCursorRef.current = hasNewWatchers ? null : (response?.data?.cursor || jobPollCursorRef.current);
+      (response?.data?.jobs || []).forEach((job) => {
+        const watcher = watchers.get(job?.id);
+        if (!watcher) return;
+        if (job.status === "succeeded") {
+          watchers.delete(job.id);
+          watcher.resolve(job.result);
+        } else if (job.status === "failed" || job.status === "cancelled") {
+          watchers.delete(job.id);
+          watcher.reject(new Error(job.error || "Background job failed"));
+        }
+      });
+      jobPollFailuresRef.current = 0;
+    } catch (error) {
+      // Network errors, 5xx, 408 and 429 are retried with backoff until each watcher's deadline;
+      // any other error response means the batch can never succeed.
+      const status = error?.response?.status;
+      const transient = !status || status >= 500 || status === 408 || status === 429;
+      if (transient) {
+        jobPollFailuresRef.current += 1;
+      } else {
+        watchers.forEach((watcher) => watcher.reject(error));
+        watchers.clear();
       }
-      if (job.status === "failed") {
-        throw new Error(job.error || "Background job failed");
+    } finally {
+      jobPollInFlightRef.current = false;
+    }
+    const now = Date.now();
+    watchers.forEach((watcher, jobId) => {
+      if (now > watcher.deadline) {
+        watchers.delete(jobId);
+        watcher.reject(new Error("Background job timed out"));
       }
-      await new Promise((resolve) => window.setTimeout(resolve, intervalMs));
+    });
+    if (watchers.size && !jobPollTimerRef.current) {
+      const intervalMs = Math.min(...Array.from(watchers.values()).map((watcher) => watcher.intervalMs));
+      const backoffMs = Math.min(intervalMs * 2 ** jobPollFailuresRef.current, 30000);
+      jobPollTimerRef.current = window.setTimeout(runBackgroundJobBatchPoll, Math.max(intervalMs, backoffMs));
     }
-    throw new Error("Background job timed out");
   };
 
+  const pollBackgroundJobUntilDone = (jobId, { intervalMs = 2500, maxAttempts = 240 } = {}) => (
+    new Promise((resolve, reject) => {
+      jobWatchersRef.current.set(jobId, {
+        resolve,
+        reject,
+        intervalMs,
+        deadline: Date.now() + intervalMs * maxAttempts,
+      });
+      // A newly watched job may have finished before the current cursor, so the next poll reads every id.
+      jobPollCursorRef.current = null;
+      if (!jobPollInFlightRef.current) {
+        if (jobPollTimerRef.current) {
+          window.clearTimeout(jobPollTimerRef.current);
+        }
+        jobPollTimerRef.current = window.setTimeout(runBackgroundJobBatchPoll, 0);
+      }
+    })
+  );
+
   const getApiErrorMessage = (error, fallback) => {
     const detail = error?.response?.data?.detail;
     if (typeof detail === "string") return detail;
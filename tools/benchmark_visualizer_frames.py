@@ -0,0 +1,64 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.services.visualizer import VISUALIZER_SAMPLE_RATE, VisualizerFrameRenderer, decode_audio_samples
+
+
+def _synthetic_track(seconds: float, sample_rate: int = VISUALIZER_SAMPLE_RATE) -> np.ndarray:
+    """A swept tone with a pulsing envelope, so both modes draw changing geometry."""
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    frequency = 60.0 + (4000.0 - 60.0) * (t / max(seconds, 1e-6))
+    phase = 2 * np.pi * np.cumsum(frequency) / sample_rate
+    envelope = 0.35 + 0.3 * np.sin(2 * np.pi * 2.0 * t) ** 2
+    return (envelope * np.sin(phase)).astype(np.float32)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time visualizer frame generation without encoding.")
+    parser.add_argument("--audio", help="Audio file to decode with ffmpeg (default: synthetic sweep)")
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    parser.add_argument("--seconds", type=float, default=180.0, help="Synthetic track length")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--layer-scale", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.audio:
+        decode_started = time.perf_counter()
+        samples = decode_audio_samples(args.ffmpeg, args.audio)
+        print(f"decoded {len(samples) / VISUALIZER_SAMPLE_RATE:.1f}s of audio in {time.perf_counter() - decode_started:.2f}s")
+    else:
+        samples = _synthetic_track(args.seconds)
+
+    for mode in ("circle", "monstercat"):
+        renderer = VisualizerFrameRenderer(
+            samples,
+            fps=args.fps,
+            width=max(2, args.width // max(1, args.layer_scale)),
+            height=max(2, args.height // max(1, args.layer_scale)),
+            mode=mode,
+            batch_size=args.batch_size,
+        )
+        started = time.perf_counter()
+        total_bytes = sum(len(chunk) for chunk in renderer.iter_frames())
+        elapsed = time.perf_counter() - started
+        print(
+            f"{mode:<10} {renderer.frame_count} frames {renderer.width}x{renderer.height} "
+            f"in {elapsed:.2f}s ({renderer.frame_count / max(elapsed, 1e-9):.0f} fps, "
+            f"{total_bytes / max(elapsed, 1e-9) / 1e6:.0f} MB/s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())